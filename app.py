@@ -14,9 +14,11 @@ from frontend.auth import is_logged_in, logout
 from frontend.login_page import render_login_page
 
 from backend.config import initialize_directories, ADMIN_EMAIL
+from backend.index_worker import start_index_worker
 
 # --- DIRECTORY AND DB SETUP ---
 initialize_directories()
+start_index_worker()
 st.set_page_config(page_title="헬스케어 5070", page_icon="🤗", layout="centered", initial_sidebar_state="expanded")
 conn = init_db()
 logged_in = is_logged_in()
@@ -0,0 +1,188 @@
+"""Process-wide async execution of chatbot agent requests.
+
+Streamlit runs each session's script in its own thread; a synchronous agent run holds
+that thread for the whole multi-call LLM loop. AgentRunner instead runs the agent's
+async generators (ArticleGenerator.astream_agent) on one background event loop:
+
+- at most AGENT_MAX_CONCURRENCY runs are in flight; the rest wait in per-user queues
+  that are served round-robin, so one user sending many questions cannot starve others;
+- a run that exceeds AGENT_TIMEOUT_SECONDS is cancelled and reports an error event;
+- the caller's iterator cancels its job when it is closed early, which is what happens
+  when Streamlit stops the script because the user navigated away or re-ran the page.
+
+Queue depth, running jobs and queue wait times are exposed through stats() for the
+admin page.
+"""
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from backend.config import AGENT_MAX_CONCURRENCY, AGENT_TIMEOUT_SECONDS
+
+# Marks the end of a job's event stream.
+_END = object()
+# How often a waiting caller is told its queue position (also lets Streamlit stop the script).
+QUEUE_STATUS_INTERVAL = 1.0
+
+
+class AgentJob:
+    def __init__(self, runner, user_id, factory):
+        self.runner = runner
+        self.user_id = user_id
+        self.factory = factory
+        self.events = queue.Queue()
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished = False
+        self.cancelled = False
+        self.task = None
+
+    def cancel(self):
+        """Cancels the job whether it is still queued or already running."""
+        if self.finished or self.cancelled:
+            return
+        self.cancelled = True
+        self.runner.loop.call_soon_threadsafe(self.runner._cancel, self)
+
+
+class AgentRunner:
+    def __init__(self, max_concurrency=AGENT_MAX_CONCURRENCY, timeout=AGENT_TIMEOUT_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        # Everything below is only touched from the event loop thread.
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._wait_times = deque(maxlen=500)
+        self._counts = {'completed': 0, 'failed': 0, 'timed_out': 0, 'cancelled': 0}
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="agent-runner", daemon=True)
+        self._thread.start()
+
+    # --- called from Streamlit script threads ---
+
+    def submit(self, user_id, factory):
+        """Queues `factory()` (an async iterator of event dicts) for user_id; returns the AgentJob."""
+        job = AgentJob(self, user_id, factory)
+        self.loop.call_soon_threadsafe(self._enqueue, job)
+        return job
+
+    def stream(self, user_id, factory):
+        """Submits a job and yields its events in the calling thread.
+
+        While the job waits for a free slot, a {'type': 'status'} event with the queue
+        position is yielded every QUEUE_STATUS_INTERVAL seconds. Closing the iterator
+        early cancels the job.
+        """
+        job = self.submit(user_id, factory)
+        try:
+            while True:
+                try:
+                    event = job.events.get(timeout=QUEUE_STATUS_INTERVAL)
+                except queue.Empty:
+                    if job.started_at is None:
+                        yield {'type': 'status', 'text': f"요청이 많아 대기 중입니다. (대기 {self.queue_depth()}건)"}
+                    continue
+                if event is _END:
+                    return
+                yield event
+        finally:
+            job.cancel()
+
+    def queue_depth(self):
+        return self._queued
+
+    def stats(self):
+        """Snapshot of the queue, taken on the event loop thread."""
+        return asyncio.run_coroutine_threadsafe(self._stats(), self.loop).result(timeout=5)
+
+    # --- event loop side ---
+
+    async def _stats(self):
+        waits = np.array(self._wait_times, dtype='float64')
+        return {
+            'running': self._running,
+            'queued': self.queue_depth(),
+            'max_concurrency': self.max_concurrency,
+            'timeout_seconds': self.timeout,
+            'wait_avg_seconds': float(waits.mean()) if len(waits) else 0.0,
+            'wait_p95_seconds': float(np.percentile(waits, 95)) if len(waits) else 0.0,
+            **self._counts,
+        }
+
+    def _enqueue(self, job):
+        if job.cancelled:
+            return
+        self._queues.setdefault(job.user_id, deque()).append(job)
+        self._queued += 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Starts queued jobs while slots are free, taking one job per user in turn."""
+        while self._running < self.max_concurrency and self._queues:
+            user_id, jobs = self._queues.popitem(last=False)
+            job = jobs.popleft()
+            self._queued -= 1
+            if jobs:
+                # The user goes to the back of the rotation with its remaining jobs.
+                self._queues[user_id] = jobs
+            self._running += 1
+            job.started_at = time.monotonic()
+            self._wait_times.append(job.started_at - job.submitted_at)
+            job.task = self.loop.create_task(self._run(job))
+
+    def _cancel(self, job):
+        jobs = self._queues.get(job.user_id)
+        if jobs and job in jobs:
+            jobs.remove(job)
+            self._queued -= 1
+            if not jobs:
+                del self._queues[job.user_id]
+            self._counts['cancelled'] += 1
+            job.events.put(_END)
+        elif job.task is not None:
+            job.task.cancel()
+
+    async def _drain(self, job):
+        async for event in job.factory():
+            job.events.put(event)
+
+    async def _run(self, job):
+        try:
+            await asyncio.wait_for(self._drain(job), timeout=self.timeout)
+            self._counts['completed'] += 1
+        except asyncio.TimeoutError:
+            self._counts['timed_out'] += 1
+            logging.warning(f"[Agent Runner] request of user {job.user_id} timed out after {self.timeout}s.")
+            job.events.put({'type': 'error', 'text': "답변 생성 시간이 초과되었습니다. 잠시 후 다시 시도해 주세요."})
+        except asyncio.CancelledError:
+            self._counts['cancelled'] += 1
+            logging.info(f"[Agent Runner] request of user {job.user_id} was cancelled.")
+        except Exception as e:
+            self._counts['failed'] += 1
+            logging.error(f"[Agent Runner] request of user {job.user_id} failed: {e}")
+            job.events.put({'type': 'error', 'text': str(e)})
+        finally:
+            job.finished = True
+            self._running -= 1
+            job.events.put(_END)
+            self._dispatch()
+
+
+_agent_runner = None
+_agent_runner_lock = threading.Lock()
+
+
+def get_agent_runner():
+    """Returns the process-wide AgentRunner, starting its event loop thread on first use."""
+    global _agent_runner
+    with _agent_runner_lock:
+        if _agent_runner is None:
+            _agent_runner = AgentRunner()
+        return _agent_runner
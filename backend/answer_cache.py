@@ -0,0 +1,168 @@
+"""Semantic answer cache for the chatbot agent.
+
+Answers that were grounded in retrieved articles are stored in the `answer_cache`
+table with the question embedding and their source article ids. Each process keeps a
+small in-memory FAISS inner-product index over those embeddings; a new question whose
+cosine similarity to a stored one reaches ANSWER_CACHE_SIMILARITY gets the stored
+answer without running the LangGraph loop.
+
+The key is the question alone, so questions whose meaning depends on the conversation
+bypass the cache: follow-ups ("그럼 운동은?"), references to earlier turns or things
+named before ("그 약은 언제 먹나요?", "아까 말씀하신"), questions about the user
+themselves ("제가 먹는 약도 괜찮나요?") and very short questions. Standalone questions
+are cached whether or not the user has earlier turns.
+
+Entries expire after ANSWER_CACHE_TTL_HOURS and are deleted when one of their source
+articles is re-indexed (RAGProcessor) or when the admin purges the cache. Every change
+to the table bumps a generation value in app_settings, which makes the other processes
+reload their index.
+"""
+import re
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import faiss
+
+from backend.config import DB_PATH, ANSWER_CACHE_SIMILARITY, ANSWER_CACHE_TTL_HOURS
+from backend.database import (
+    ANSWER_CACHE_GENERATION_SETTING,
+    get_app_setting,
+    save_answer_cache_entry,
+    get_answer_cache_embeddings,
+    get_answer_cache_entry,
+    record_answer_cache_hit,
+    delete_answer_cache_entries,
+)
+from backend.rag_processor import get_shared_vector_store
+
+# Questions that lean on the previous turn ("그럼 운동은?") cannot be answered from a cache keyed
+# on the question alone.
+_FOLLOW_UP = re.compile(r'^\s*(그럼|그러면|그렇다면|그건|그게|그거|그것|이거|이건|이것|저거|저건|아까|방금|위에|위의|거기|또|그리고|근데|그런데)')
+# References anywhere in the question to something said before ("그 약", "앞에서 말한") or to the
+# user's own situation ("제가 먹는 약"), which the cached answer of another user cannot know.
+_CONTEXT_REFERENCE = re.compile(
+    r'(^|\s)(그|이|저|해당|위|앞|말씀하신|말한|얘기한|언급한)\s+(약|음식|운동|병|질환|증상|검사|치료|방법|내용|것|거|기사)'
+    r'|아까|방금|앞에서|앞서|위에서|말씀하신|말씀해\s*주신|그\s*중|그중|둘\s*중|두\s*가지\s*중'
+    r'|(^|\s)(제가|저는|저도|제\s|저희|내가|나는|나도|내\s|우리\s*(엄마|아빠|어머니|아버지|부모님|남편|아내))'
+)
+MIN_QUESTION_CHARS = 6
+
+
+def is_cacheable_question(question: str) -> bool:
+    """True for standalone questions; short, follow-up or context-dependent questions bypass the cache."""
+    question = (question or '').strip()
+    return (len(question) >= MIN_QUESTION_CHARS and not _FOLLOW_UP.match(question)
+            and not _CONTEXT_REFERENCE.search(question))
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold=ANSWER_CACHE_SIMILARITY, ttl_hours=ANSWER_CACHE_TTL_HOURS, db_path=None):
+        self.threshold = threshold
+        self.ttl = timedelta(hours=ttl_hours)
+        self.db_path = db_path or DB_PATH
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _embed(self, question):
+        vector = np.asarray(get_shared_vector_store().embed_query(question), dtype='float32').reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _sync(self, conn, dim):
+        """Reloads the in-memory index when another process (or a purge) changed the table."""
+        generation = get_app_setting(conn, ANSWER_CACHE_GENERATION_SETTING)
+        if self._index is not None and self._index.d == dim and generation == self._generation:
+            return
+        cutoff = datetime.now() - self.ttl
+        delete_answer_cache_entries(conn, created_before=cutoff)
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        rows = [(entry_id, np.frombuffer(blob, dtype='float32')) for entry_id, blob in get_answer_cache_embeddings(conn, cutoff)]
+        rows = [(entry_id, vector) for entry_id, vector in rows if len(vector) == dim]
+        if rows:
+            index.add_with_ids(np.stack([vector for _, vector in rows]),
+                               np.array([entry_id for entry_id, _ in rows], dtype='int64'))
+        self._index = index
+        self._generation = get_app_setting(conn, ANSWER_CACHE_GENERATION_SETTING)
+        logging.info(f"[Answer Cache] loaded {index.ntotal} cached answers.")
+
+    def lookup(self, question):
+        """Returns the cached entry (question, answer, similarity, ...) for a near-identical question, or None."""
+        if not is_cacheable_question(question):
+            return None
+        vector = self._embed(question)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with self._lock:
+                self._sync(conn, vector.shape[1])
+                if self._index.ntotal == 0:
+                    self.misses += 1
+                    return None
+                similarities, ids = self._index.search(vector, 1)
+            similarity, entry_id = float(similarities[0][0]), int(ids[0][0])
+            entry = get_answer_cache_entry(conn, entry_id) if similarity >= self.threshold else None
+            if entry is None or datetime.fromisoformat(str(entry['created_at'])) < datetime.now() - self.ttl:
+                self.misses += 1
+                return None
+            record_answer_cache_hit(conn, entry_id)
+            self.hits += 1
+            logging.info(f"[Answer Cache] hit (similarity {similarity:.3f}) for '{question}' -> '{entry['question']}'")
+            return {**entry, 'similarity': similarity}
+        finally:
+            conn.close()
+
+    def store(self, question, answer, article_ids, index_version=None):
+        """Caches an answer grounded in `article_ids`; ungrounded or context-dependent answers are skipped."""
+        if not article_ids or not is_cacheable_question(question):
+            return None
+        vector = self._embed(question)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with self._lock:
+                self._sync(conn, vector.shape[1])
+                entry_id = save_answer_cache_entry(conn, question, answer, vector[0].tobytes(), index_version, article_ids)
+                self._index.add_with_ids(vector, np.array([entry_id], dtype='int64'))
+                self._generation = get_app_setting(conn, ANSWER_CACHE_GENERATION_SETTING)
+            return entry_id
+        finally:
+            conn.close()
+
+    def purge(self):
+        """Deletes every cached answer (admin action)."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with self._lock:
+                deleted = delete_answer_cache_entries(conn, all_entries=True)
+                self._index = None
+            return deleted
+        finally:
+            conn.close()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': self._index.ntotal if self._index is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'threshold': self.threshold,
+            'ttl_hours': self.ttl.total_seconds() / 3600,
+        }
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """Returns the process-wide SemanticAnswerCache."""
+    global _answer_cache
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = SemanticAnswerCache()
+        return _answer_cache
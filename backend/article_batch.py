@@ -0,0 +1,79 @@
+"""Batch generation of AI articles for every article in the 'AI 기사 생성 대기' state.
+
+All pending articles are rewritten through one chain with bounded concurrency
+(ArticleGenerator.generate_new_articles). Successful results are saved as they
+complete, in small transactional chunks of SAVE_CHUNK_SIZE, so a crash or a stopped
+run keeps the finished articles and a rerun only generates the rest.
+Progress is reported per finished article through `on_progress`.
+"""
+import logging
+
+from backend.config import ARTICLE_BATCH_CONCURRENCY
+from backend.database import init_db, get_articles_with_filter, count_articles_with_filter, save_generated_articles
+
+PENDING_STATUS = 'AI 기사 생성 대기'
+# Finished articles are written every this many results (and at the end of the run).
+SAVE_CHUNK_SIZE = 5
+
+
+def split_generated_article(text, fallback_title):
+    """Splits model output into (title, content); the first line is the title."""
+    text = (text or '').strip()
+    if '\n' in text:
+        title, content = text.split('\n', 1)
+        return title.strip().strip('#* '), content.strip()
+    return fallback_title, text
+
+
+def get_pending_articles(conn, limit=None):
+    """Articles that are age-relevant and have no generated version yet, newest first."""
+    return get_articles_with_filter(conn, status=PENDING_STATUS, sort_order='최신순', limit=limit)
+
+
+def count_pending_articles(conn):
+    """Number of pending articles (a COUNT query, for the admin page)."""
+    return count_articles_with_filter(conn, status=PENDING_STATUS)
+
+
+def generate_pending_articles(generator, limit=None, max_concurrency=ARTICLE_BATCH_CONCURRENCY, on_progress=None):
+    """Generates and saves AI articles for all pending articles.
+
+    on_progress(done, total, article, error) is called as each article finishes
+    (error is None on success). Returns {'total', 'saved', 'failures': [(article_id, title, error)]}.
+    """
+    conn = init_db()
+    try:
+        pending = get_pending_articles(conn, limit).to_dict('records')
+    finally:
+        conn.close()
+    if not pending:
+        return {'total': 0, 'saved': 0, 'failures': []}
+
+    results, saved, failures = [], [], []
+    conn = init_db()
+    try:
+        for done, (position, output) in enumerate(generator.generate_new_articles(pending, max_concurrency), 1):
+            article = pending[position]
+            error = None
+            if isinstance(output, Exception):
+                error = str(output) or type(output).__name__
+            elif not (output or '').strip():
+                error = "AI 모델로부터 아무런 내용을 받지 못했습니다."
+            else:
+                title, content = split_generated_article(output, article['title'])
+                results.append({'article_id': article['id'], 'generated_title': title, 'generated_content': content})
+                if len(results) >= SAVE_CHUNK_SIZE:
+                    saved += save_generated_articles(conn, results)
+                    results = []
+            if error:
+                failures.append((article['id'], article['title'], error))
+                logging.warning(f"[Article Batch] article {article['id']} failed: {error}")
+            if on_progress:
+                on_progress(done, len(pending), article, error)
+    finally:
+        # Also on an interrupted run, so every finished article is kept.
+        if results:
+            saved += save_generated_articles(conn, results)
+        conn.close()
+    logging.info(f"[Article Batch] saved {len(saved)} of {len(pending)} articles ({len(failures)} failed).")
+    return {'total': len(pending), 'saved': len(saved), 'failures': failures}
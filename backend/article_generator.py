@@ -2,28 +2,114 @@
 
 import os
 import sys
-from typing import TypedDict, Annotated, Sequence
+import asyncio
+import logging
+import threading
+from functools import lru_cache
+from typing import TypedDict, Annotated, Sequence, Optional
 import operator
+import openai
 
 # LangChain imports
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain.agents import Tool
-from langchain.tools.retriever import create_retriever_tool
-from langchain_core.runnables import Runnable
-from langchain_core.messages import BaseMessage, FunctionMessage
+from langchain_core.tools import StructuredTool
+from langchain_core.runnables import Runnable, RunnableLambda
+from langchain_core.messages import BaseMessage, FunctionMessage, ToolMessage
 
 # LangGraph imports
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode, tools_condition
 
 # Local imports
-from backend.rag_processor import RAGProcessor
+from backend.rag_processor import get_shared_vector_store
+from backend.answer_cache import get_answer_cache
+from backend.conversation_memory import ConversationMemory
+from backend.model_providers import get_chat_model, get_model_provider
+from backend.config import (
+    ANSWER_CACHE_ENABLED,
+    CHAT_MEMORY_SUMMARY_MAX_TOKENS,
+    ARTICLE_BATCH_CONCURRENCY,
+    ARTICLE_BATCH_MAX_ATTEMPTS,
+)
+
+# Transient OpenAI errors worth retrying in batch jobs (429s, timeouts, dropped connections, 5xx).
+RETRYABLE_MODEL_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
 
 # Add the parent directory to the system path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+NEW_ARTICLE_PROMPT = """
+        당신은 50대-70대 독자를 위한 건강 전문 작가입니다.
+        아래 주어진 원본 기사의 제목과 내용을 바탕으로, 독자들이 이해하기 쉽고 실용적인 정보를 얻을 수 있도록 새로운 건강 기사를 작성해 주세요.
+
+        - **목표**: 원본 기사의 핵심 정보를 유지하되, 더 친절하고 부드러운 어조로 설명합니다.
+        - **형식**: 독자가 읽기 편하도록 문단을 나누고, 중요한 부분은 강조해 주세요.
+        - **내용**: 전문 용어는 쉽게 풀어서 설명하고, 일상 생활에서 실천할 수 있는 팁을 포함하면 좋습니다.
+        - **분량**: 원본 기사와 비슷하거나 약간 더 상세하게 작성해 주세요.
+        - **출력**: 제목과 내용을 포함한 완결된 기사 형식으로 작성해 주세요. (예: "새로운 제목\n\n첫 번째 문단...")
+
+        ---
+        **원본 기사 제목**: {title}
+        ---
+        **원본 기사 내용**:
+        {content}
+        ---
+
+        이제 위의 내용을 바탕으로 새로운 기사를 작성해 주세요.
+        """
+
+SHORT_SCRIPT_PROMPT = """
+        당신은 50-70대 시청자를 위한 건강 정보 영상의 전문 작가입니다.
+        주어진 기사 내용을 바탕으로, 친절하고 이해하기 쉬운 톤으로 영상 대본을 작성해 주세요.
+        대본은 약 150-200 단어 길이로 요약되어야 합니다.
+        장면 전환이나 시간 표시 없이, 오직 나레이션 대본만 작성해 주세요.
+        **대본은 반드시 한국어로 작성해야 합니다.**
+
+        기사 내용:
+        ---
+        {article_content}
+        ---
+
+        이제 영상 대본을 작성해 주세요.
+        """
+# generate_short_script returns this instead of raising when the model call fails.
+SCRIPT_FAILURE_MESSAGE = "스크립트 생성에 실패했습니다."
+
+
+def get_article_chain() -> Runnable:
+    """Shared prompt | LLM | parser chain for rewriting articles (built on first use)."""
+    return _build_article_chain(get_model_provider())
+
+
+def get_script_chain() -> Runnable:
+    """Shared prompt | LLM | parser chain for short video scripts (built on first use)."""
+    return _build_script_chain(get_model_provider())
+
+
+@lru_cache(maxsize=None)
+def _build_article_chain(provider) -> Runnable:
+    # Use a non-tool-bound LLM for this simple chain. The retry wraps the model call itself,
+    # so it also applies per item in batch_as_completed.
+    article_llm = get_chat_model(temperature=0.7).with_retry(
+        retry_if_exception_type=RETRYABLE_MODEL_ERRORS,
+        wait_exponential_jitter=True,
+        stop_after_attempt=ARTICLE_BATCH_MAX_ATTEMPTS,
+    )
+    return ChatPromptTemplate.from_template(NEW_ARTICLE_PROMPT) | article_llm | StrOutputParser()
+
+
+@lru_cache(maxsize=None)
+def _build_script_chain(provider) -> Runnable:
+    return ChatPromptTemplate.from_template(SHORT_SCRIPT_PROMPT) | get_chat_model() | StrOutputParser()
+
+
 # --- 1. Define Agent State ---
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], operator.add]
@@ -36,7 +122,8 @@ class Agent:
 
     def _build_graph(self, tools):
         graph = StateGraph(AgentState)
-        graph.add_node("call_model", self.call_model)
+        # Both sync and async entry points, so `astream` awaits the model instead of using a thread.
+        graph.add_node("call_model", RunnableLambda(self.call_model, afunc=self.acall_model))
         tool_node = ToolNode(tools)
         graph.add_node("call_tool", tool_node)
         graph.add_conditional_edges(
@@ -55,29 +142,70 @@ class Agent:
         response = self.llm.invoke(state['messages'])
         return {'messages': [response]}
 
+    async def acall_model(self, state: AgentState):
+        response = await self.llm.ainvoke(state['messages'])
+        return {'messages': [response]}
+
 # --- Main Class ---
 class ArticleGenerator:
-    def __init__(self):
-        self.api_key = os.environ.get("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
-        
-        # Bind tools to the LLM
-        self.llm = ChatOpenAI(model="gpt-3.5-turbo", api_key=self.api_key)
-        self.agent = self._create_agent()
+    def __init__(self, index_path=None, use_answer_cache=ANSWER_CACHE_ENABLED):
+        # Models come from the configured provider (OpenAI, or the offline fake / cassettes) and
+        # are shared process-wide. The agent, its vector store and the conversation memory are
+        # built on first use, so article/script generation never loads the search index.
+        self.index_path = index_path
+        self.use_answer_cache = use_answer_cache
+        self._agent = None
+        self._memory = None
+        self._lock = threading.Lock()
+
+    @property
+    def vector_store(self):
+        return get_shared_vector_store(self.index_path)
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self._create_agent()
+        return self._agent
+
+    @property
+    def memory(self):
+        if self._memory is None:
+            # Older turns are summarized by a plain (tool-less) model with a bounded output.
+            self._memory = ConversationMemory(get_chat_model(temperature=0, max_tokens=CHAT_MEMORY_SUMMARY_MAX_TOKENS))
+        return self._memory
 
     def _create_agent(self):
         """Creates the LangGraph agent."""
         
         # 1. Create Tools
-        rag_processor = RAGProcessor()
-        vector_store = rag_processor.load_vector_store()
-        retriever = vector_store.as_retriever()
-        
-        retriever_tool = create_retriever_tool(
-            retriever,
-            "health_info_search",
-            "Searches and returns relevant health information from a database of articles. Use this for any questions about health topics, conditions, treatments, etc."
+        vector_store = self.vector_store
+
+        def _health_info_search(query: str, recent_days: Optional[int] = None,
+                                age_relevant_only: bool = False, keyword: Optional[str] = None):
+            filters = {}
+            if recent_days:
+                filters['recent_days'] = recent_days
+            if age_relevant_only:
+                filters['age_relevant_only'] = True
+            if keyword:
+                filters['keywords'] = [keyword]
+            docs = vector_store.search(query, k=4, filters=filters or None)
+            # The artifact (source article ids) is kept on the ToolMessage for the answer cache.
+            return "\n\n".join(doc.page_content for doc in docs), [doc.metadata.get('article_id') for doc in docs]
+
+        retriever_tool = StructuredTool.from_function(
+            func=_health_info_search,
+            name="health_info_search",
+            response_format="content_and_artifact",
+            description=(
+                "Searches and returns relevant health information from a database of articles. Use this for any questions about health topics, conditions, treatments, etc. "
+                "Optional filters: recent_days (only articles crawled within N days, e.g. for '최근' questions), "
+                "age_relevant_only (only articles for people in their 50s-70s), "
+                "keyword (only articles tagged with a topic such as '전립선', '골다공증', '고혈압', '치매')."
+            ),
         )
         
         def _article_generator_func(input_str: str) -> str:
@@ -90,16 +218,28 @@ class ArticleGenerator:
         )
 
         tools = [retriever_tool, article_gen_tool]
-        self.llm = self.llm.bind_tools(tools)
+        # Bind tools to the LLM
+        self.llm = get_chat_model().bind_tools(tools)
 
         # 2. Create Agent
         agent = Agent(self.llm, tools)
         return agent.graph
 
-    def run_agent(self, user_input: str, chat_history: list = []):
-        """Runs the agent with the given user input and chat history."""
-        
+    def _build_messages(self, user_input: str, chat_history: list, user_id: Optional[int] = None):
+        """Builds the prompt messages within the conversation memory budget.
+
+        With a user_id the history is read from the database (recent turns plus the
+        rolling summary of older ones); otherwise the given chat_history is trimmed.
+        Only runs on an answer-cache miss and never calls the LLM (see ConversationMemory.load).
+        """
         messages = []
+        if user_id is not None:
+            summary, chat_history = self.memory.load(user_id, current_input=user_input)
+            if summary:
+                messages.append({"role": "system", "content": f"이전 대화 요약:\n{summary}"})
+        else:
+            chat_history = self.memory.trim_history(chat_history)
+
         # Convert chat history to BaseMessages
         for role, content in chat_history:
             if role == 'user':
@@ -109,80 +249,165 @@ class ArticleGenerator:
         
         # Add current user input
         messages.append({"role": "user", "content": user_input})
+        return messages
+
+    def _lookup_cached_answer(self, user_input: str):
+        """Near-identical standalone questions reuse an earlier grounded answer."""
+        if not self.use_answer_cache:
+            return None
+        try:
+            cached = get_answer_cache().lookup(user_input)
+            return cached['answer'] if cached else None
+        except Exception as e:
+            logging.warning(f"Answer cache lookup failed: {e}")
+            return None
+
+    def _cache_answer(self, user_input: str, answer: str, source_article_ids: list):
+        if not self.use_answer_cache:
+            return
+        try:
+            get_answer_cache().store(user_input, answer, source_article_ids, self.vector_store.version)
+        except Exception as e:
+            logging.warning(f"Failed to cache the answer: {e}")
+
+    def on_answer_saved(self, user_id: Optional[int]):
+        """Summarizes turns that left the memory window in the background.
+
+        Call it after the answer has been stored with save_chat_message, so the fold
+        sees the finished exchange instead of a dangling question.
+        """
+        if user_id is not None:
+            self.memory.schedule_fold(user_id)
+
+    @staticmethod
+    def _source_article_ids(messages):
+        return [
+            article_id
+            for message in messages if isinstance(message, ToolMessage) and message.artifact
+            for article_id in message.artifact if article_id is not None
+        ]
 
+    def run_agent(self, user_input: str, chat_history: list = [], user_id: Optional[int] = None):
+        """Runs the agent with the given user input and chat history (or the stored history of user_id)."""
+        cached_answer = self._lookup_cached_answer(user_input)
+        if cached_answer:
+            return cached_answer
+
+        messages = self._build_messages(user_input, chat_history, user_id)
         # The prompt is now implicitly handled by the agent's structure and the bound LLM
         response = self.agent.invoke({"messages": messages})
         
         # Extract the last AI message as the final output
-        return response['messages'][-1].content
+        answer = response['messages'][-1].content
+        self._cache_answer(user_input, answer, self._source_article_ids(response['messages']))
+        return answer
 
-    def generate_new_article(self, title: str, content: str) -> str:
+    async def arun_agent(self, user_input: str, chat_history: list = [], user_id: Optional[int] = None):
+        """Async variant of run_agent (LangGraph `ainvoke`)."""
+        cached_answer = await asyncio.to_thread(self._lookup_cached_answer, user_input)
+        if cached_answer:
+            return cached_answer
+
+        messages = await asyncio.to_thread(self._build_messages, user_input, chat_history, user_id)
+        response = await self.agent.ainvoke({"messages": messages})
+        answer = response['messages'][-1].content
+        await asyncio.to_thread(self._cache_answer, user_input, answer, self._source_article_ids(response['messages']))
+        return answer
+
+    def stream_agent(self, user_input: str, chat_history: list = [], user_id: Optional[int] = None):
+        """Streaming variant of run_agent.
+
+        Yields event dicts as the LangGraph run progresses:
+            {'type': 'status', 'text': ...}   tool calls and their results
+            {'type': 'token', 'text': ...}    answer tokens from the model
+            {'type': 'done', 'answer': ...}   the final answer (also for cached answers)
         """
-        Generates a new article based on the original title and content,
-        targeting a 50-70 year old audience.
+        cached_answer = self._lookup_cached_answer(user_input)
+        if cached_answer:
+            yield {'type': 'status', 'text': "이전에 답변한 비슷한 질문을 찾았습니다."}
+            yield {'type': 'token', 'text': cached_answer}
+            yield {'type': 'done', 'answer': cached_answer}
+            return
+
+        messages = self._build_messages(user_input, chat_history, user_id)
+        run = {'answer': "", 'tool_messages': []}
+        # "messages" streams LLM tokens as they arrive; "updates" reports each finished node.
+        for mode, payload in self.agent.stream({"messages": messages}, stream_mode=["messages", "updates"]):
+            yield from self._stream_events(mode, payload, run)
+
+        self._cache_answer(user_input, run['answer'], self._source_article_ids(run['tool_messages']))
+        yield {'type': 'done', 'answer': run['answer']}
+
+    async def astream_agent(self, user_input: str, chat_history: list = [], user_id: Optional[int] = None):
+        """Async variant of stream_agent (LangGraph `astream`) for the AgentRunner event loop.
+
+        The answer-cache and memory lookups are blocking SQLite/embedding calls, so they
+        run in worker threads to keep the loop free for other users' requests.
         """
-        prompt_template_str = """
-        당신은 50대-70대 독자를 위한 건강 전문 작가입니다.
-        아래 주어진 원본 기사의 제목과 내용을 바탕으로, 독자들이 이해하기 쉽고 실용적인 정보를 얻을 수 있도록 새로운 건강 기사를 작성해 주세요.
+        cached_answer = await asyncio.to_thread(self._lookup_cached_answer, user_input)
+        if cached_answer:
+            yield {'type': 'status', 'text': "이전에 답변한 비슷한 질문을 찾았습니다."}
+            yield {'type': 'token', 'text': cached_answer}
+            yield {'type': 'done', 'answer': cached_answer}
+            return
 
-        - **목표**: 원본 기사의 핵심 정보를 유지하되, 더 친절하고 부드러운 어조로 설명합니다.
-        - **형식**: 독자가 읽기 편하도록 문단을 나누고, 중요한 부분은 강조해 주세요.
-        - **내용**: 전문 용어는 쉽게 풀어서 설명하고, 일상 생활에서 실천할 수 있는 팁을 포함하면 좋습니다.
-        - **분량**: 원본 기사와 비슷하거나 약간 더 상세하게 작성해 주세요.
-        - **출력**: 제목과 내용을 포함한 완결된 기사 형식으로 작성해 주세요. (예: "새로운 제목\n\n첫 번째 문단...")
+        messages = await asyncio.to_thread(self._build_messages, user_input, chat_history, user_id)
+        run = {'answer': "", 'tool_messages': []}
+        async for mode, payload in self.agent.astream({"messages": messages}, stream_mode=["messages", "updates"]):
+            for event in self._stream_events(mode, payload, run):
+                yield event
 
-        ---
-        **원본 기사 제목**: {title}
-        ---
-        **원본 기사 내용**:
-        {content}
-        ---
+        await asyncio.to_thread(self._cache_answer, user_input, run['answer'], self._source_article_ids(run['tool_messages']))
+        yield {'type': 'done', 'answer': run['answer']}
 
-        이제 위의 내용을 바탕으로 새로운 기사를 작성해 주세요.
+    def _stream_events(self, mode, payload, run):
+        """Turns one LangGraph stream item into chatbot events; collects the answer into `run`."""
+        if mode == "messages":
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") == "call_model" and isinstance(chunk.content, str) and chunk.content:
+                yield {'type': 'token', 'text': chunk.content}
+            return
+        for node, update in payload.items():
+            for message in (update or {}).get('messages', []):
+                if node == "call_model":
+                    for tool_call in getattr(message, 'tool_calls', None) or []:
+                        query = tool_call['args'].get('query', '')
+                        yield {'type': 'status', 'text': f"건강 기사 검색 중: {query}" if query else "도구 실행 중..."}
+                    if not getattr(message, 'tool_calls', None):
+                        run['answer'] = message.content
+                elif isinstance(message, ToolMessage):
+                    run['tool_messages'].append(message)
+                    if message.artifact is not None:
+                        yield {'type': 'status', 'text': f"관련 기사 {len(message.artifact)}건을 찾았습니다."}
+
+    def generate_new_article(self, title: str, content: str) -> str:
+        """
+        Generates a new article based on the original title and content,
+        targeting a 50-70 year old audience.
         """
-        
-        prompt = ChatPromptTemplate.from_template(prompt_template_str)
-        output_parser = StrOutputParser()
-        
-        # Use a non-tool-bound LLM for this simple chain
-        article_llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.7, api_key=self.api_key)
-        chain: Runnable = prompt | article_llm | output_parser
-        
         try:
-            new_article = chain.invoke({"title": title, "content": content})
+            new_article = get_article_chain().invoke({"title": title, "content": content})
             return new_article.strip()
         except Exception as e:
             print(f"New article generation with LangChain failed: {e}")
             # Return a user-friendly error message in Korean
             return "죄송합니다, AI 기사 생성 중 예상치 못한 오류가 발생했습니다. 잠시 후 다시 시도해 주세요."
 
-    def generate_short_script(self, content):
-        """Generates a short video script from the article content using LangChain."""
-        prompt_template_str = """
-        당신은 50-70대 시청자를 위한 건강 정보 영상의 전문 작가입니다.
-        주어진 기사 내용을 바탕으로, 친절하고 이해하기 쉬운 톤으로 영상 대본을 작성해 주세요.
-        대본은 약 150-200 단어 길이로 요약되어야 합니다.
-        장면 전환이나 시간 표시 없이, 오직 나레이션 대본만 작성해 주세요.
-        **대본은 반드시 한국어로 작성해야 합니다.**
-
-        기사 내용:
-        ---
-        {article_content}
-        ---
+    def generate_new_articles(self, articles, max_concurrency: int = ARTICLE_BATCH_CONCURRENCY):
+        """Rewrites many articles with at most `max_concurrency` requests in flight.
 
-        이제 영상 대본을 작성해 주세요.
+        `articles` is a list of dicts with 'title' and 'content'. Yields (position, text)
+        as each one finishes; a failed item yields its exception instead of text.
+        Rate-limit, timeout and connection errors are retried with exponential backoff.
         """
-        
-        prompt = ChatPromptTemplate.from_template(prompt_template_str)
-        output_parser = StrOutputParser()
-        
-        # Use a non-tool-bound LLM for this simple chain
-        script_llm = ChatOpenAI(model="gpt-3.5-turbo", api_key=self.api_key)
-        chain: Runnable = prompt | script_llm | output_parser
-        
+        inputs = [{"title": article['title'], "content": article['content']} for article in articles]
+        yield from get_article_chain().batch_as_completed(inputs, config={'max_concurrency': max_concurrency}, return_exceptions=True)
+
+    def generate_short_script(self, content):
+        """Generates a short video script from the article content using LangChain."""
         try:
-            script = chain.invoke({"article_content": content})
+            script = get_script_chain().invoke({"article_content": content})
             return script.strip()
         except Exception as e:
             print(f"Script generation with LangChain failed: {e}")
-            return "스크립트 생성에 실패했습니다."
+            return SCRIPT_FAILURE_MESSAGE
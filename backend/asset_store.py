@@ -0,0 +1,195 @@
+"""Content-addressed store for the assets a video is made from.
+
+Scene images, narration audio and intro sentences are saved under ASSET_STORE_DIR as
+<kind>/<hh>/<key><ext>, where the key is a hash of the provider, its parameters and
+the input text (prompt, sentence, headline). Producing a video again for the same
+article, e.g. after changing the caption style or the Ken Burns motion, finds every
+asset already on disk and makes no API calls. Encoded scene segments (kind 'segment')
+are stored the same way, keyed by everything the scene is rendered from, so only
+changed scenes are encoded again.
+
+The `asset_cache` table tracks size and last use of each file and `video_assets`
+records which assets each saved video was made from. When the store grows beyond
+ASSET_STORE_MAX_MB, assets that no existing video refers to are deleted, least
+recently used first; deleting a video releases its references.
+
+A render only records its references when the video is saved, so assets created or
+used within ASSET_STORE_EVICTION_GRACE_MINUTES are never evicted: the files an
+in-flight render has made or is about to read stay on disk until it finishes.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from backend.config import DB_PATH, ASSET_STORE_DIR, ASSET_STORE_MAX_MB, ASSET_STORE_EVICTION_GRACE_MINUTES
+from backend.database import (
+    save_asset_entry,
+    record_asset_hit,
+    add_video_assets,
+    get_asset_eviction_candidates,
+    delete_asset_entries,
+    get_asset_cache_stats,
+)
+
+
+class AssetStore:
+    def __init__(self, root=None, max_bytes=None, db_path=None, grace_minutes=ASSET_STORE_EVICTION_GRACE_MINUTES):
+        self.root = root or ASSET_STORE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else ASSET_STORE_MAX_MB * 1024 * 1024
+        self.db_path = db_path or DB_PATH
+        self.grace = timedelta(minutes=grace_minutes)
+        self.hits = 0
+        self.misses = 0
+        # get() runs from the render thread pool, so the counters are updated under a lock.
+        self._stats_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    @staticmethod
+    def key(kind, provider, params, text) -> str:
+        payload = {'kind': kind, 'provider': provider, 'params': params, 'text': text}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+    def _relative_path(self, kind, key, ext):
+        return os.path.join(kind, key[:2], f"{key}{ext}")
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def get(self, kind, key, ext):
+        """Returns the absolute path of a stored asset, or None."""
+        relative_path = self._relative_path(kind, key, ext)
+        path = os.path.join(self.root, relative_path)
+        if not os.path.exists(path):
+            with self._stats_lock:
+                self.misses += 1
+            return None
+        conn = self._connect()
+        try:
+            # Files written by another process (or before the table existed) are registered on first use.
+            save_asset_entry(conn, key, kind, relative_path, os.path.getsize(path))
+            record_asset_hit(conn, key)
+        finally:
+            conn.close()
+        with self._stats_lock:
+            self.hits += 1
+        return path
+
+    def get_or_create(self, kind, provider, params, text, ext, create, asset_keys=None):
+        """Returns the path of the asset for (provider, params, text), calling `create(path)` on a miss.
+
+        `create` writes the file at the given (temporary) path and returns False, or raises,
+        when it could not; nothing is stored then and None is returned. The key of a
+        returned asset is appended to `asset_keys`.
+        """
+        key = self.key(kind, provider, params, text)
+        path = self.get(kind, key, ext)
+        if path is None:
+            relative_path = self._relative_path(kind, key, ext)
+            path = os.path.join(self.root, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp{ext}"
+            try:
+                if create(tmp_path) is False or not os.path.exists(tmp_path):
+                    return None
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            conn = self._connect()
+            try:
+                save_asset_entry(conn, key, kind, relative_path, os.path.getsize(path))
+            finally:
+                conn.close()
+            self.evict()
+        if asset_keys is not None:
+            asset_keys.append(key)
+        return path
+
+    def get_or_create_text(self, kind, provider, params, text, create, asset_keys=None):
+        """Like get_or_create for a string result; `create()` returns the text (falsy: not stored)."""
+        def write(path):
+            value = create()
+            if not value:
+                return False
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(value)
+
+        path = self.get_or_create(kind, provider, params, text, '.txt', write, asset_keys)
+        if path is None:
+            return None
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    def add_references(self, video_id, asset_keys):
+        conn = self._connect()
+        try:
+            add_video_assets(conn, video_id, asset_keys)
+        finally:
+            conn.close()
+
+    def evict(self):
+        """Deletes unreferenced assets not used within the grace window, least recently used first,
+        until the store fits max_bytes."""
+        with self._evict_lock:
+            conn = self._connect()
+            try:
+                excess = get_asset_cache_stats(conn)['size_bytes'] - self.max_bytes
+                if excess <= 0:
+                    return 0
+                used_before = datetime.now() - self.grace
+                evicted = []
+                for key, relative_path, size_bytes in get_asset_eviction_candidates(conn, used_before):
+                    if excess <= 0:
+                        break
+                    # The entry goes first and only if it is still unused, so an asset another
+                    # process has just picked up keeps its file.
+                    if not delete_asset_entries(conn, [key], used_before):
+                        continue
+                    try:
+                        os.remove(os.path.join(self.root, relative_path))
+                    except FileNotFoundError:
+                        pass
+                    evicted.append(key)
+                    excess -= size_bytes
+            finally:
+                conn.close()
+        if excess > 0:
+            logging.info(f"[Asset Store] evicted {len(evicted)} assets; {excess / 1024 / 1024:.0f} MB over the limit "
+                         f"remain in assets used within the last {self.grace} or referenced by videos.")
+        else:
+            logging.info(f"[Asset Store] evicted {len(evicted)} assets.")
+        return len(evicted)
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            stats = get_asset_cache_stats(conn)
+        finally:
+            conn.close()
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            **stats,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+
+_asset_store = None
+_asset_store_lock = threading.Lock()
+
+
+def get_asset_store():
+    """Returns the process-wide AssetStore."""
+    global _asset_store
+    with _asset_store_lock:
+        if _asset_store is None:
+            _asset_store = AssetStore()
+        return _asset_store
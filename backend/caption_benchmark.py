@@ -0,0 +1,129 @@
+"""Speed of the caption renderer against the previous implementation.
+
+    python -m backend.caption_benchmark
+    python -m backend.caption_benchmark --font /usr/share/fonts/truetype/nanum/NanumGothicBold.ttf --repeat 5
+
+The captions are sentences of the newest articles, or built-in samples when the
+database is empty. Pixel equality with the legacy full-frame layer is checked by
+tests/test_captions.py.
+"""
+import os
+import re
+import sqlite3
+import argparse
+import textwrap
+import time
+
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw, ImageFont
+
+from backend.config import DB_PATH
+from backend.captions import (
+    FONT_SIZE, MARGIN, LINE_SPACING, CAPTION_BOX_ALPHA, CAPTION_BOTTOM_PAD, CAPTION_MAX_CHARS,
+    CaptionRenderer, find_font_path,
+)
+
+W, H = 1280, 720
+SAMPLE_CAPTIONS = [
+    "안녕하세요! 오늘은 사과가 심장 건강에 어떤 도움을 주는지 함께 알아보겠습니다",
+    "하루 30분 걷기만으로도 혈압을 낮추는 데 도움이 됩니다",
+    "전문가들은 정기적인 건강검진이 당뇨 예방에 중요하다고 강조합니다",
+    "짧은 자막",
+    "줄바꿈이\n있는 자막",
+    "띄어쓰기없이아주길게이어지는문장은단어중간에서줄이바뀌어야합니다그래도상자밖으로나가면안됩니다",
+]
+
+
+def render_caption_legacy(text, font_path, width=W, height=H):
+    """The renderer as it was: font lookup and load per call, full-frame measuring and output."""
+    find_font_path(bold=True)
+    font = ImageFont.truetype(font_path, FONT_SIZE) if font_path else ImageFont.load_default()
+
+    dummy = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(dummy)
+
+    wrapper = textwrap.TextWrapper(width=CAPTION_MAX_CHARS, break_long_words=True, replace_whitespace=False)
+    lines = [line for para in text.split("\n") for line in (wrapper.wrap(para) if para else [""])]
+
+    line_heights, max_line_w = [], 0
+    for line in lines:
+        bbox = draw.textbbox((0, 0), line, font=font)
+        line_heights.append(bbox[3] - bbox[1])
+        max_line_w = max(max_line_w, bbox[2] - bbox[0])
+
+    text_block_h = sum(line_heights) + LINE_SPACING * max(0, len(lines) - 1)
+    box_pad_x, box_pad_y = 28, 24
+    box_w = min(max_line_w + box_pad_x * 2, width - MARGIN * 2)
+    box_h = text_block_h + box_pad_y * 2
+    box_x = (width - box_w) // 2
+    box_y = height - CAPTION_BOTTOM_PAD - box_h
+
+    img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle([(box_x, box_y), (box_x + box_w, box_y + box_h)], radius=24, fill=(0, 0, 0, CAPTION_BOX_ALPHA))
+    cur_y = box_y + box_pad_y
+    for i, line in enumerate(lines):
+        lw = draw.textbbox((0, 0), line, font=font)[2] - draw.textbbox((0, 0), line, font=font)[0]
+        draw.text(((width - lw) // 2, cur_y), line, font=font, fill=(255, 255, 255, 255))
+        cur_y += line_heights[i] + LINE_SPACING
+    return np.array(img)
+
+
+def load_captions(db_path=DB_PATH, limit=50):
+    """Caption-sized sentences of the newest articles, or the built-in samples."""
+    captions = []
+    if os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute("SELECT content FROM articles ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        except sqlite3.OperationalError:
+            rows = []
+        finally:
+            conn.close()
+        for (content,) in rows:
+            captions += [s.strip() for s in re.split(r'[.!?…]+', content or '') if 5 <= len(s.strip()) <= 120][:3]
+    return captions or SAMPLE_CAPTIONS
+
+
+def run_caption_benchmark(captions, font_path=None, repeat=3):
+    """Times both renderers over `captions`; returns a DataFrame."""
+    # cache_size=0: measures rendering, not cache hits.
+    renderer = CaptionRenderer(W, H, font_path, cache_size=0)
+    cropped_pixels = [rgba.shape[0] * rgba.shape[1] for rgba, _ in map(renderer.render, captions)]
+
+    def timed(render):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for text in captions:
+                render(text)
+        return (time.perf_counter() - start) / (repeat * len(captions))
+
+    rows = []
+    for name, render, pixels in (
+        ('legacy_full_frame', lambda text: render_caption_legacy(text, font_path), [W * H]),
+        ('cropped', renderer.render, cropped_pixels),
+    ):
+        seconds = timed(render)
+        rows.append({
+            'renderer': name,
+            'captions': len(captions),
+            'ms_per_caption': round(seconds * 1000, 3),
+            'captions_per_s': round(1 / seconds, 1),
+            'output_pixels_avg': int(np.mean(pixels)),
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    bundled_font = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fonts', 'NanumGothic-Regular.ttf')
+    default_font = find_font_path(bold=True) or bundled_font
+    parser = argparse.ArgumentParser(description="Benchmark caption rendering.")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--font', default=default_font if os.path.exists(default_font) else None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    result = run_caption_benchmark(load_captions(args.db), args.font, args.repeat)
+    print(f"font: {args.font or 'Pillow default'}")
+    print(result.to_string(index=False))
@@ -0,0 +1,115 @@
+"""Caption rendering for the generated videos.
+
+A caption is a rounded, semi-transparent box with centered white text near the bottom
+of the frame. CaptionRenderer returns only the box area (an RGBA array) and its
+position in the frame instead of a full-frame transparent layer, so the compositor
+blends about a tenth of the pixels it used to. The output is pixel-identical to the full-frame
+version cropped to that area, which tests/test_captions.py checks (`python -m pytest tests`).
+
+Fonts are looked up and loaded once per process, text is measured on a 1×1 scratch
+surface, each line is measured once, and rendered captions are kept in an LRU cache
+(re-rendering a video in the same process reuses them).
+"""
+import os
+import logging
+import textwrap
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+FONT_SIZE = 36
+MARGIN = 60
+LINE_SPACING = 12
+CAPTION_BOX_ALPHA = 180
+CAPTION_BOTTOM_PAD = 80
+CAPTION_MAX_CHARS = 30
+BOX_PAD_X, BOX_PAD_Y = 28, 24
+BOX_RADIUS = 24
+
+
+def find_font_path(bold=False):
+    """Korean font for captions (NanumGothic / Noto / Apple SD Gothic first), or None."""
+    candidates = []
+    if os.name == "nt":  # Windows
+        candidates += [
+            "C:/Windows/Fonts/NanumGothicBold.ttf" if bold else "C:/Windows/Fonts/NanumGothic.ttf",
+            "C:/Windows/Fonts/malgunbd.ttf" if bold else "C:/Windows/Fonts/malgun.ttf",
+        ]
+    else:  # Linux/Mac
+        candidates += [
+            "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf" if bold else "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+            "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+            "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+        ]
+    for path in candidates:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=None)
+def load_font(font_path=None, size=FONT_SIZE):
+    """Loads a font once per process; without a path, Pillow's default font is used."""
+    if font_path:
+        return ImageFont.truetype(font_path, size)
+    logging.warning("[Captions] 한글 폰트를 찾지 못해 기본 폰트를 사용합니다. 자막 품질이 낮아질 수 있습니다.")
+    return ImageFont.load_default()
+
+
+def wrap_caption(text):
+    wrapper = textwrap.TextWrapper(width=CAPTION_MAX_CHARS, break_long_words=True, replace_whitespace=False)
+    return [line for para in text.split("\n") for line in (wrapper.wrap(para) if para else [""])]
+
+
+class CaptionRenderer:
+    def __init__(self, width, height, font_path=None, cache_size=256):
+        """font_path: usually find_font_path(bold=True); None uses Pillow's default font."""
+        self.W, self.H = width, height
+        self.font = load_font(font_path)
+        # Text is only measured here; textbbox does not depend on the surface size.
+        self._measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        self.render = lru_cache(maxsize=cache_size)(self._render)
+
+    def _render(self, text):
+        """Returns (rgba uint8 array, (x, y)): the caption's pixels and their top-left position in the frame."""
+        lines = wrap_caption(text)
+        bboxes = [self._measure.textbbox((0, 0), line, font=self.font) for line in lines]
+        line_widths = [bbox[2] - bbox[0] for bbox in bboxes]
+        line_heights = [bbox[3] - bbox[1] for bbox in bboxes]
+
+        text_block_h = sum(line_heights) + LINE_SPACING * max(0, len(lines) - 1)
+        box_w = min(max(line_widths, default=0) + BOX_PAD_X * 2, self.W - MARGIN * 2)
+        box_h = text_block_h + BOX_PAD_Y * 2
+        box_x = (self.W - box_w) // 2
+        box_y = self.H - CAPTION_BOTTOM_PAD - box_h
+
+        # Line positions, and the area covered by the box and the glyphs (a long word can overflow the box).
+        origins, cur_y = [], box_y + BOX_PAD_Y
+        left, top, right, bottom = box_x, box_y, box_x + box_w + 1, box_y + box_h + 1
+        for line, bbox, line_w, line_h in zip(lines, bboxes, line_widths, line_heights):
+            tx = (self.W - line_w) // 2
+            origins.append((tx, cur_y))
+            left, top = min(left, tx + bbox[0]), min(top, cur_y + bbox[1])
+            right, bottom = max(right, tx + bbox[2]), max(bottom, cur_y + bbox[3])
+            cur_y += line_h + LINE_SPACING
+        left, top = max(0, left), max(0, top)
+        right, bottom = min(self.W, right), min(self.H, bottom)
+
+        img = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
+        draw.rounded_rectangle([(box_x - left, box_y - top), (box_x + box_w - left, box_y + box_h - top)],
+                               radius=BOX_RADIUS, fill=(0, 0, 0, CAPTION_BOX_ALPHA))
+        for line, (tx, ty) in zip(lines, origins):
+            draw.text((tx - left, ty - top), line, font=self.font, fill=(255, 255, 255, 255))
+
+        rgba = np.array(img)
+        rgba.flags.writeable = False  # shared through the cache
+        return rgba, (left, top)
+
+    def render_frame(self, text):
+        """The caption as a full-frame RGBA layer (transparent outside the caption)."""
+        rgba, (x, y) = self.render(text)
+        frame = np.zeros((self.H, self.W, 4), dtype=np.uint8)
+        frame[y:y + rgba.shape[0], x:x + rgba.shape[1]] = rgba
+        return frame
@@ -0,0 +1,131 @@
+"""Offline comparison of the chunkers in backend/chunking.py on the article database.
+
+For each strategy it reports chunk count, embedding-token spend and article-level
+retrieval quality (hit@k / MRR) on an exact in-memory index:
+
+    python -m backend.chunk_eval --limit 300 --k 4
+    python -m backend.chunk_eval --embeddings hashing      # no API key, lexical proxy only
+
+Queries come from a CSV with `query` and `article_id` columns when `--queries` is given;
+otherwise one body sentence is sampled per article (title excluded), which measures
+whether a chunk keeps enough context to be found from part of its own text.
+"""
+import argparse
+import logging
+import sqlite3
+import random
+import numpy as np
+import pandas as pd
+import faiss
+from langchain.docstore.document import Document
+
+from backend.config import DB_PATH
+from backend.chunking import CHUNKERS, count_tokens, split_sentences
+from backend.model_providers import HashingEmbeddings, get_embeddings
+
+MIN_QUERY_CHARS = 20
+
+
+def load_articles(db_path=DB_PATH, limit=None):
+    """Loads articles the same way RAGProcessor does (generated text preferred)."""
+    conn = sqlite3.connect(db_path)
+    query = """
+    SELECT
+        a.id as article_id,
+        COALESCE(ga.generated_title, a.title) as title,
+        COALESCE(ga.generated_content, a.content) as content
+    FROM articles a
+    LEFT JOIN generated_articles ga ON a.id = ga.article_id
+    WHERE COALESCE(ga.generated_content, a.content) IS NOT NULL
+    ORDER BY a.id DESC
+    """
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    df = pd.read_sql_query(query, conn)
+    conn.close()
+    return df
+
+
+def sample_queries(articles_df, seed=0):
+    """Picks one sufficiently long body sentence per article as a query."""
+    rng = random.Random(seed)
+    rows = []
+    for _, row in articles_df.iterrows():
+        candidates = [s for s in split_sentences(row['content']) if len(s) >= MIN_QUERY_CHARS]
+        if candidates:
+            rows.append({'query': rng.choice(candidates), 'article_id': row['article_id']})
+    return pd.DataFrame(rows, columns=['query', 'article_id'])
+
+
+def evaluate_chunker(name, documents, queries_df, embeddings, k=4):
+    """Chunks, embeds and searches with one strategy; returns a metrics dict."""
+    chunks = CHUNKERS[name]().split_documents(documents)
+    chunk_tokens = np.array([count_tokens(chunk.page_content) for chunk in chunks])
+
+    vectors = np.array(embeddings.embed_documents([chunk.page_content for chunk in chunks]), dtype='float32')
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    chunk_articles = np.array([chunk.metadata['article_id'] for chunk in chunks])
+
+    query_vectors = np.array(embeddings.embed_documents(queries_df['query'].tolist()), dtype='float32')
+    # Over-fetch so k distinct articles can be ranked even when one article has many chunks.
+    _, found = index.search(query_vectors, min(len(chunks), k * 5))
+
+    hits, reciprocal_ranks = 0, []
+    for expected, row in zip(queries_df['article_id'], found):
+        ranked = list(dict.fromkeys(chunk_articles[i] for i in row if i >= 0))[:k]
+        if expected in ranked:
+            hits += 1
+            reciprocal_ranks.append(1.0 / (ranked.index(expected) + 1))
+        else:
+            reciprocal_ranks.append(0.0)
+
+    return {
+        'chunker': name,
+        'chunks': len(chunks),
+        'chunks_per_article': round(len(chunks) / max(1, len(documents)), 2),
+        'embedding_tokens': int(chunk_tokens.sum()),
+        'tokens_avg': round(float(chunk_tokens.mean()), 1),
+        'tokens_p95': int(np.percentile(chunk_tokens, 95)),
+        'tokens_max': int(chunk_tokens.max()),
+        f'hit@{k}': round(hits / max(1, len(queries_df)), 4),
+        'mrr': round(float(np.mean(reciprocal_ranks)), 4),
+    }
+
+
+def run_chunk_eval(articles_df, queries_df=None, embeddings=None, k=4, chunkers=None):
+    """Evaluates every chunker on the same articles and queries. Returns a DataFrame."""
+    documents = [
+        Document(page_content=row['content'], metadata={'title': row['title'], 'article_id': row['article_id']})
+        for _, row in articles_df.iterrows() if row['content']
+    ]
+    if queries_df is None:
+        queries_df = sample_queries(articles_df)
+    if embeddings is None:
+        embeddings = get_embeddings()
+
+    rows = []
+    for name in chunkers or CHUNKERS:
+        rows.append(evaluate_chunker(name, documents, queries_df, embeddings, k))
+        logging.info(f"[Chunk Eval] {rows[-1]}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare RAG chunking strategies on the article database.")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--limit', type=int, default=300, help="Number of most recent articles to use")
+    parser.add_argument('--queries', default=None, help="CSV with 'query' and 'article_id' columns")
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--embeddings', choices=['openai', 'hashing'], default='openai')
+    parser.add_argument('--chunkers', nargs='*', choices=list(CHUNKERS), default=None)
+    args = parser.parse_args()
+
+    articles = load_articles(args.db, args.limit)
+    queries = pd.read_csv(args.queries) if args.queries else None
+    result = run_chunk_eval(
+        articles, queries,
+        embeddings=HashingEmbeddings() if args.embeddings == 'hashing' else None,
+        k=args.k, chunkers=args.chunkers,
+    )
+    print(result.to_string(index=False))
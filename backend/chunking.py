@@ -0,0 +1,171 @@
+"""Chunking strategies for the RAG index.
+
+Each chunker turns article-level LangChain Documents (metadata: title, article_id)
+into embedding-sized chunks. RAGProcessor picks one by name from CHUNKERS
+(admin setting 'rag_chunker', default DEFAULT_RAG_CHUNKER), and
+backend/chunk_eval.py compares them offline.
+"""
+import re
+import logging
+from functools import lru_cache
+from typing import List
+
+from langchain.docstore.document import Document
+from langchain.text_splitter import CharacterTextSplitter
+
+EMBEDDING_MODEL = 'text-embedding-ada-002'
+
+# 문장 경계:
+#  - 문장부호(+닫는 따옴표/괄호) 뒤 공백 또는 줄 끝
+#  - 종결어미 뒤 문장부호 다음에 띄어쓰기 없이 이어지는 한글 ('올랐다.그리고'; '3.5%' 같은 숫자는 제외)
+#  - 문장부호 없이 종결어미(다/요/죠/까)로 끝나는 줄
+#  - 문장부호 없이 줄 중간에서 끝나는 대표적인 종결형(습니다, 했다, 이다, 해요 등) 뒤 공백
+_SENTENCE_END = re.compile(
+    r'[.!?…]+["\'”’」』)\]]*(?=\s|$)'
+    r'|(?<=[다요죠까])[.!?…]+(?=[가-힣])'
+    r'|(?<=[다요죠까])(?=\s*$)'
+    r'|(?<=니다|[었았였했겠됐]다|이다|한다|는다|된다|세요|[어아해]요|까요)(?=\s)'
+)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(EMBEDDING_MODEL)
+    except Exception as e:
+        logging.warning(f"tiktoken encoding unavailable ({e}); estimating token counts from text length.")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Counts embedding-model tokens (cl100k_base); estimates ~1 token per Hangul syllable offline."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text.encode('utf-8')) // 3)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Splits Korean news text into sentences, treating each line as a hard boundary."""
+    sentences = []
+    for line in text.splitlines():
+        start = 0
+        for match in _SENTENCE_END.finditer(line):
+            sentence = line[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        tail = line[start:].strip()
+        if tail:
+            sentences.append(tail)
+    return sentences
+
+
+class CharacterChunker:
+    """The original fixed-size splitter (1000 characters, 200 overlap), kept for comparison."""
+
+    name = 'character'
+
+    def __init__(self, chunk_size=1000, chunk_overlap=200):
+        self.splitter = CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        return self.splitter.split_documents(documents)
+
+
+class KoreanSentenceChunker:
+    """Packs whole sentences into chunks of at most `max_tokens` embedding tokens.
+
+    Sentences are never cut unless a single sentence exceeds the budget. Each chunk is
+    prefixed with the article title so short chunks still carry their topic, and a
+    trailing chunk smaller than `min_tokens` is merged into the previous one when it fits.
+    """
+
+    name = 'korean_sentence'
+
+    def __init__(self, max_tokens=350, min_tokens=60, overlap_sentences=0, title_prefix=True):
+        self.max_tokens = max_tokens
+        self.min_tokens = min_tokens
+        self.overlap_sentences = overlap_sentences
+        self.title_prefix = title_prefix
+
+    def _prefix(self, document: Document) -> str:
+        title = document.metadata.get('title')
+        return f"[{title}]\n" if self.title_prefix and title else ""
+
+    def _split_long_sentence(self, sentence: str, budget: int) -> List[str]:
+        encoding = _get_encoding()
+        if encoding is None:
+            # Matches the offline estimate in count_tokens: one Hangul syllable (3 UTF-8 bytes) per token
+            return [sentence[i:i + budget] for i in range(0, len(sentence), budget)]
+        # Cut at token boundaries, moved back to the last complete character: a Hangul syllable
+        # (3 UTF-8 bytes) can span two tokens, and decoding half of it would yield U+FFFD.
+        data = sentence.encode('utf-8')
+        token_ends, offset = [], 0
+        for token in encoding.encode(sentence):
+            offset += len(encoding.decode_single_token_bytes(token))
+            token_ends.append(offset)
+        pieces, start = [], 0
+        for i in range(budget - 1, len(token_ends) + budget - 1, budget):
+            end = token_ends[min(i, len(token_ends) - 1)]
+            while start < end < len(data) and (data[end] & 0xC0) == 0x80:  # UTF-8 continuation byte
+                end -= 1
+            if end <= start:  # a single character wider than the budget: keep it whole
+                end = start + 1
+                while end < len(data) and (data[end] & 0xC0) == 0x80:
+                    end += 1
+            if end > start:
+                pieces.append(data[start:end].decode('utf-8'))
+                start = end
+        if start < len(data):
+            pieces.append(data[start:].decode('utf-8'))
+        return [piece for piece in pieces if piece.strip()]
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        chunks = []
+        for document in documents:
+            prefix = self._prefix(document)
+            budget = max(1, self.max_tokens - count_tokens(prefix))
+
+            groups, current, current_tokens = [], [], 0
+            for sentence in split_sentences(document.page_content):
+                n_tokens = count_tokens(sentence)
+                pieces = [(sentence, n_tokens)] if n_tokens <= budget else [
+                    (piece, count_tokens(piece)) for piece in self._split_long_sentence(sentence, budget)
+                ]
+                for piece, piece_tokens in pieces:
+                    if current and current_tokens + piece_tokens > budget:
+                        groups.append(current)
+                        current = current[-self.overlap_sentences:] if self.overlap_sentences else []
+                        current_tokens = sum(t for _, t in current)
+                    current.append((piece, piece_tokens))
+                    current_tokens += piece_tokens
+            if current:
+                if groups and current_tokens < self.min_tokens and \
+                        sum(t for _, t in groups[-1]) + current_tokens <= budget:
+                    groups[-1].extend(current)
+                else:
+                    groups.append(current)
+
+            for chunk_index, group in enumerate(groups):
+                text = prefix + " ".join(piece for piece, _ in group)
+                chunks.append(Document(
+                    page_content=text,
+                    metadata={**document.metadata, 'chunk_index': chunk_index,
+                              'n_tokens': sum(t for _, t in group) + count_tokens(prefix)},
+                ))
+        return chunks
+
+
+CHUNKERS = {
+    CharacterChunker.name: CharacterChunker,
+    KoreanSentenceChunker.name: KoreanSentenceChunker,
+}
+
+
+def get_chunker(name: str):
+    if name not in CHUNKERS:
+        logging.warning(f"Unknown chunker '{name}'. Using '{KoreanSentenceChunker.name}'.")
+        name = KoreanSentenceChunker.name
+    return CHUNKERS[name]()
@@ -13,13 +13,98 @@ else:
 UPLOAD_DIR = os.path.join(data_dir, 'uploaded_videos')
 FAISS_INDEX_DIR = os.path.join(data_dir, 'faiss_index')
 GENERATED_VIDEOS_DIR = os.path.join(data_dir, 'generated_videos')
+ASSET_STORE_DIR = os.path.join(data_dir, 'asset_store')
 DB_PATH = os.path.join(data_dir, 'health_dongA.db')
 
+# FAISS 인덱스 기본 프리셋 (flat / hnsw / ivf_flat / ivf_pq). 관리자 포털에서 변경할 수 있습니다.
+DEFAULT_FAISS_INDEX_PRESET = os.environ.get("FAISS_INDEX_PRESET", "flat")
+
+# 기사 청킹 방식 (korean_sentence / character). 관리자 포털에서 변경할 수 있으며, 변경 후 전체 재구축이 필요합니다.
+DEFAULT_RAG_CHUNKER = os.environ.get("RAG_CHUNKER", "korean_sentence")
+
+# 챗봇 검색 방식 (hybrid / vector / lexical)과 재정렬 모델 (none / cross_encoder). 관리자 포털에서 변경할 수 있습니다.
+DEFAULT_RAG_RETRIEVAL_MODE = os.environ.get("RAG_RETRIEVAL_MODE", "hybrid")
+DEFAULT_RAG_RERANKER = os.environ.get("RAG_RERANKER", "none")
+# cross_encoder 재정렬에 사용할 로컬 모델 (sentence-transformers 설치 필요)
+RERANKER_MODEL = os.environ.get("RERANKER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+
+# 챗봇 질문 임베딩/검색 결과 캐시 (항목 수, 유효 시간(초))
+QUERY_CACHE_MAX_ENTRIES = int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", "1024"))
+QUERY_CACHE_TTL_SECONDS = int(os.environ.get("QUERY_CACHE_TTL_SECONDS", "3600"))
+
+# 챗봇 답변 캐시: 이전 질문과의 코사인 유사도가 기준 이상이면 저장된 답변을 재사용합니다.
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIMILARITY = float(os.environ.get("ANSWER_CACHE_SIMILARITY", "0.95"))
+ANSWER_CACHE_TTL_HOURS = int(os.environ.get("ANSWER_CACHE_TTL_HOURS", "72"))
+
+# 챗봇 대화 기억: 최근 대화는 토큰 예산 안에서 그대로, 그 이전 대화는 요약으로 전달합니다.
+CHAT_MEMORY_MAX_TOKENS = int(os.environ.get("CHAT_MEMORY_MAX_TOKENS", "1500"))
+CHAT_MEMORY_SUMMARY_FOLD_TOKENS = int(os.environ.get("CHAT_MEMORY_SUMMARY_FOLD_TOKENS", "600"))
+CHAT_MEMORY_SUMMARY_MAX_TOKENS = int(os.environ.get("CHAT_MEMORY_SUMMARY_MAX_TOKENS", "400"))
+
+# 모델 제공자 (openai / fake / record / replay). fake는 키 없이 동작하는 결정적 로컬 모델이고,
+# record는 실제 응답을 카세트로 저장하며 replay는 저장된 카세트만 사용합니다.
+MODEL_PROVIDER = os.environ.get("MODEL_PROVIDER", "openai")
+MODEL_CASSETTE_DIR = os.environ.get("MODEL_CASSETTE_DIR", os.path.join(data_dir, 'model_cassettes'))
+# fake 모델 호출마다 추가할 지연 시간(ms). API 지연을 흉내 낸 처리량 측정에 사용합니다.
+FAKE_MODEL_LATENCY_MS = float(os.environ.get("FAKE_MODEL_LATENCY_MS", "0"))
+# OpenAI API 호출이 함께 쓰는 HTTP 연결 풀 크기와 요청 제한 시간(초)
+OPENAI_HTTP_MAX_CONNECTIONS = int(os.environ.get("OPENAI_HTTP_MAX_CONNECTIONS", "20"))
+OPENAI_HTTP_TIMEOUT_SECONDS = float(os.environ.get("OPENAI_HTTP_TIMEOUT_SECONDS", "120"))
+
+# AI 기사 일괄 생성: 동시에 보낼 최대 요청 수와 요청당 최대 시도 횟수(속도 제한 시 재시도)
+ARTICLE_BATCH_CONCURRENCY = int(os.environ.get("ARTICLE_BATCH_CONCURRENCY", "4"))
+ARTICLE_BATCH_MAX_ATTEMPTS = int(os.environ.get("ARTICLE_BATCH_MAX_ATTEMPTS", "5"))
+
+# 영상 제작 시 장면 이미지/TTS/인트로 문장 생성을 동시에 요청할 최대 개수 (제공자별)
+VIDEO_IMAGE_CONCURRENCY = int(os.environ.get("VIDEO_IMAGE_CONCURRENCY", "3"))
+VIDEO_TTS_CONCURRENCY = int(os.environ.get("VIDEO_TTS_CONCURRENCY", "4"))
+VIDEO_LLM_CONCURRENCY = int(os.environ.get("VIDEO_LLM_CONCURRENCY", "2"))
+
+# 영상 에셋 저장소(이미지/음성/인트로 문장)의 최대 크기(MB). 넘으면 어떤 영상도 참조하지 않는 에셋부터
+# 오래 사용되지 않은 순서로 삭제합니다.
+ASSET_STORE_MAX_MB = int(os.environ.get("ASSET_STORE_MAX_MB", "2048"))
+# 이 시간(분) 안에 만들어졌거나 사용된 에셋은 삭제하지 않습니다. 제작 중인 영상이 아직 참조를 저장하지 않은
+# 에셋을 지우지 않도록, 가장 오래 걸리는 영상 제작 시간보다 길게 잡습니다.
+ASSET_STORE_EVICTION_GRACE_MINUTES = int(os.environ.get("ASSET_STORE_EVICTION_GRACE_MINUTES", "120"))
+
+# 영상 인코딩 기본값 (관리자 포털에서 바꾼 값이 우선합니다).
+# 프로필: draft | fast | balanced | quality. PER_SCENE이면 장면별로 인코딩한 세그먼트를 에셋 저장소에 보관하고
+# 재인코딩 없이 이어 붙입니다 (다시 만들 때 바뀐 장면만 인코딩).
+VIDEO_ENCODE_PROFILE = os.environ.get("VIDEO_ENCODE_PROFILE", "fast")
+VIDEO_ENCODE_PER_SCENE = os.environ.get("VIDEO_ENCODE_PER_SCENE", "true").lower() in ("1", "true", "yes")
+
+# 영상 제작 작업 큐: 작업자가 큐를 확인하는 간격, 진행 중인 작업의 heartbeat 간격과 이 시간(초) 동안
+# heartbeat가 없으면 작업자가 죽은 것으로 보고 다시 대기열에 넣는 기준, 작업당 최대 시도 횟수.
+# 실패한 작업은 RETRY_BACKOFF초 뒤에 다시 시도하며, 시도할 때마다 대기 시간이 두 배로 늘어납니다.
+# EMBEDDED면 관리자 포털 프로세스 안에서도 작업자 하나를 실행합니다 (`python -m backend.worker`로 추가 실행 가능).
+VIDEO_JOB_POLL_SECONDS = float(os.environ.get("VIDEO_JOB_POLL_SECONDS", "2"))
+VIDEO_JOB_HEARTBEAT_SECONDS = float(os.environ.get("VIDEO_JOB_HEARTBEAT_SECONDS", "10"))
+VIDEO_JOB_STALE_SECONDS = float(os.environ.get("VIDEO_JOB_STALE_SECONDS", "120"))
+VIDEO_JOB_MAX_ATTEMPTS = int(os.environ.get("VIDEO_JOB_MAX_ATTEMPTS", "3"))
+VIDEO_JOB_RETRY_BACKOFF_SECONDS = float(os.environ.get("VIDEO_JOB_RETRY_BACKOFF_SECONDS", "30"))
+VIDEO_WORKER_EMBEDDED = os.environ.get("VIDEO_WORKER_EMBEDDED", "true").lower() in ("1", "true", "yes")
+
+# 챗봇 요청 실행: 동시에 처리할 최대 요청 수와 요청당 제한 시간(초)
+AGENT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", "4"))
+AGENT_TIMEOUT_SECONDS = float(os.environ.get("AGENT_TIMEOUT_SECONDS", "120"))
+
+# 기사 저장 후 검색 인덱스에 반영되기까지의 대기 시간(초).
+# 마지막 변경 후 DEBOUNCE 동안 새 변경이 없거나, 가장 오래된 변경이 MAX_DELAY를 넘기면 반영합니다.
+INDEX_REFRESH_DEBOUNCE_SECONDS = int(os.environ.get("INDEX_REFRESH_DEBOUNCE_SECONDS", "30"))
+INDEX_REFRESH_MAX_DELAY_SECONDS = int(os.environ.get("INDEX_REFRESH_MAX_DELAY_SECONDS", "300"))
+INDEX_REFRESH_POLL_SECONDS = int(os.environ.get("INDEX_REFRESH_POLL_SECONDS", "10"))
+
+# 인덱스 스냅샷 보관 개수와, 실행 중인 챗봇이 새 스냅샷을 확인하는 주기(초)
+INDEX_SNAPSHOTS_TO_KEEP = int(os.environ.get("INDEX_SNAPSHOTS_TO_KEEP", "3"))
+INDEX_SWAP_CHECK_SECONDS = int(os.environ.get("INDEX_SWAP_CHECK_SECONDS", "5"))
+
 # 애플리케이션 시작 시 디렉토리들이 존재하는지 확인하고 없으면 생성
 def initialize_directories():
     os.makedirs(UPLOAD_DIR, exist_ok=True)
     os.makedirs(FAISS_INDEX_DIR, exist_ok=True)
     os.makedirs(GENERATED_VIDEOS_DIR, exist_ok=True)
+    os.makedirs(ASSET_STORE_DIR, exist_ok=True)
 
 # 관리자 문의 메일 주소 (환경 변수에서 우선적으로 가져옵니다.)
 ADMIN_EMAIL = os.environ.get("ADMIN_EMAIL", "ozoops5911@gmail.com")
@@ -0,0 +1,173 @@
+"""Token-bounded conversation memory for the chatbot agent.
+
+The agent prompt gets at most CHAT_MEMORY_MAX_TOKENS of the most recent turns verbatim.
+Older turns are folded into a rolling summary stored per user in `chat_summaries`,
+together with the id of the last chat_history row it covers, so each fold only
+summarizes the turns that fell out of the window since the previous one.
+
+Turns that left the window are folded once they add up to
+CHAT_MEMORY_SUMMARY_FOLD_TOKENS (until then they stay in the prompt), which keeps the
+prompt size roughly constant however long the conversation gets, and costs one small
+summarization call every few turns instead of one per turn.
+
+The fold never runs on the answer path: load() only reads the stored summary and
+turns, and the chat page calls schedule_fold() (through ArticleGenerator) once the
+answer has been saved, which summarizes in a background thread. Until that fold has
+committed, the older turns stay in the prompt, so it is bounded by
+max_tokens + fold_tokens plus the turns of one answer.
+"""
+import sqlite3
+import logging
+import threading
+
+from langchain.prompts import ChatPromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+
+from backend.config import DB_PATH, CHAT_MEMORY_MAX_TOKENS, CHAT_MEMORY_SUMMARY_FOLD_TOKENS
+from backend.chunking import count_tokens
+from backend.database import get_chat_messages_after, get_chat_summary, save_chat_summary
+
+# Turns older than this many tokens (per fold) are dropped instead of summarized, e.g. on the
+# first fold of a long pre-existing history.
+MAX_FOLD_INPUT_TOKENS = 4000
+
+SUMMARY_PROMPT = """
+당신은 건강 상담 챗봇의 대화 기록을 정리하는 역할입니다.
+아래의 기존 요약과 새로 추가된 대화를 합쳐, 이후 답변에 필요한 내용만 담은 하나의 요약으로 갱신해 주세요.
+
+- 사용자의 나이대, 건강 상태, 복용 약, 관심 주제처럼 계속 참고해야 할 정보는 반드시 남깁니다.
+- 이미 답한 질문은 질문과 답의 핵심만 짧게 적습니다.
+- 인사말이나 반복되는 내용은 생략합니다.
+- 한국어로, 10문장 이내로 작성합니다.
+
+기존 요약:
+{summary}
+
+새로 추가된 대화:
+{conversation}
+
+갱신된 요약:
+"""
+
+
+# Users whose fold is running in this process, so repeated questions do not start duplicate folds.
+_folding_users = set()
+_folding_lock = threading.Lock()
+
+
+def _message_tokens(role, content):
+    # Role and message framing cost a few tokens per message in the chat format.
+    return count_tokens(content or '') + 4
+
+
+def _format_turns(turns):
+    return "\n".join(f"{'사용자' if role == 'user' else '챗봇'}: {content}" for _, role, content in turns)
+
+
+class ConversationMemory:
+    def __init__(self, llm, db_path=None, max_tokens=CHAT_MEMORY_MAX_TOKENS,
+                 fold_tokens=CHAT_MEMORY_SUMMARY_FOLD_TOKENS):
+        self.db_path = db_path or DB_PATH
+        self.max_tokens = max_tokens
+        self.fold_tokens = fold_tokens
+        self.summarizer = ChatPromptTemplate.from_template(SUMMARY_PROMPT) | llm | StrOutputParser()
+
+    def window(self, turns):
+        """Splits (id, role, content) turns into (older, recent); recent fits in max_tokens.
+
+        Recent starts on a user turn, so the prompt never opens with a reply to a question it lacks.
+        """
+        budget, start = self.max_tokens, len(turns)
+        while start > 0:
+            cost = _message_tokens(turns[start - 1][1], turns[start - 1][2])
+            # The newest turn is always kept, even when it alone exceeds the budget.
+            if cost > budget and start < len(turns):
+                break
+            budget -= cost
+            start -= 1
+        while start < len(turns) - 1 and turns[start][1] != 'user':
+            start += 1
+        return turns[:start], turns[start:]
+
+    def trim_history(self, chat_history):
+        """Bounds an in-memory [(role, content), ...] history to the token budget (no summary)."""
+        _, recent = self.window([(None, role, content) for role, content in chat_history])
+        return [(role, content) for _, role, content in recent]
+
+    def _fold(self, conn, user_id, summary, older):
+        """Merges `older` turns into the stored summary and advances its watermark."""
+        turns, tokens = [], 0
+        for turn in reversed(older):
+            tokens += _message_tokens(turn[1], turn[2])
+            if tokens > MAX_FOLD_INPUT_TOKENS:
+                logging.info(f"[Chat Memory] dropping {len(older) - len(turns)} old turns of user {user_id} without summarizing.")
+                break
+            turns.insert(0, turn)
+        if turns:
+            summary = self.summarizer.invoke({
+                'summary': summary or "(없음)",
+                'conversation': _format_turns(turns),
+            }).strip()
+        save_chat_summary(conn, user_id, summary or "", older[-1][0])
+        logging.info(f"[Chat Memory] folded {len(older)} turns of user {user_id} into the summary "
+                     f"({count_tokens(summary or '')} tokens).")
+        return summary
+
+    def _stored(self, conn, user_id, current_input=None):
+        """Returns (summary, turns after the summary watermark), without a trailing `current_input`."""
+        stored = get_chat_summary(conn, user_id) or {'summary': None, 'summarized_up_to': 0}
+        turns = get_chat_messages_after(conn, user_id, stored['summarized_up_to'])
+        if turns and current_input is not None and turns[-1][1] == 'user' and turns[-1][2] == current_input:
+            turns = turns[:-1]
+        return stored['summary'], turns
+
+    def _fold_due(self, older):
+        return bool(older) and sum(_message_tokens(role, content) for _, role, content in older) >= self.fold_tokens
+
+    def load(self, user_id, current_input=None):
+        """Returns (summary, [(role, content), ...]) to put in front of the current question.
+
+        The chat page saves the question before running the agent, so a trailing user
+        message equal to `current_input` is left out of the history. Never calls the LLM:
+        turns that left the window stay in until schedule_fold() has summarized them.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            summary, turns = self._stored(conn, user_id, current_input)
+            older, recent = self.window(turns)
+            # Older turns that would start the prompt with a reply are dropped like in window().
+            while older and older[0][1] != 'user':
+                older = older[1:]
+            return summary or None, [(role, content) for _, role, content in older + recent]
+        finally:
+            conn.close()
+
+    def fold(self, user_id):
+        """Folds the turns that left the window into the summary when they reach fold_tokens."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            summary, turns = self._stored(conn, user_id)
+            older, _ = self.window(turns)
+            if self._fold_due(older):
+                self._fold(conn, user_id, summary, older)
+        finally:
+            conn.close()
+
+    def schedule_fold(self, user_id):
+        """Runs fold() in a background thread, at most one per user at a time."""
+        with _folding_lock:
+            if user_id in _folding_users:
+                return
+            _folding_users.add(user_id)
+
+        def _run():
+            try:
+                self.fold(user_id)
+            except Exception as e:
+                # The turns stay unsummarized and are retried after the next answer.
+                logging.warning(f"[Chat Memory] summarization failed for user {user_id}: {e}")
+            finally:
+                with _folding_lock:
+                    _folding_users.discard(user_id)
+
+        threading.Thread(target=_run, name=f"chat-memory-fold-{user_id}", daemon=True).start()
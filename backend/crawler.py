@@ -10,7 +10,7 @@ import sys
 # 현재 파일의 디렉토리를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from database import init_db
+from database import init_db, enqueue_index_update
 
 class DongACrawler:
     def __init__(self):
@@ -125,6 +125,7 @@ class DongACrawler:
             return 0, 0
         c = conn.cursor()
         new_articles, age_relevant_count = 0, 0
+        new_article_ids = []
         for article in articles:
             try:
                 c.execute("SELECT id FROM articles WHERE url = ?", (article['url'],))
@@ -143,6 +144,7 @@ class DongACrawler:
                         article['keywords']
                     ))
                     new_articles += 1
+                    new_article_ids.append(c.lastrowid)
                     if article['is_age_relevant']:
                         age_relevant_count += 1
             except sqlite3.IntegrityError:
@@ -150,5 +152,6 @@ class DongACrawler:
             except Exception as e:
                 print(f"Error saving article {article.get('url')}: {e}")
                 continue
+        enqueue_index_update(conn, new_article_ids, commit=False)
         conn.commit()
         return new_articles, age_relevant_count
\ No newline at end of file
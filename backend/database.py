@@ -1,12 +1,17 @@
 import sqlite3
 import pandas as pd
 import os
+import time
+import json
 from datetime import datetime
 from passlib.context import CryptContext
 from backend.config import DB_PATH
 
 DB_FILE = DB_PATH
 
+# app_settings key that changes whenever answer_cache rows are added or removed
+ANSWER_CACHE_GENERATION_SETTING = 'answer_cache_generation'
+
 # --- Password Hashing ---
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
@@ -47,6 +52,44 @@ def update_schema(conn):
         if "no such table" not in str(e):
             raise e
 
+    try:
+        c.execute("PRAGMA table_info(video_encode_stats)")
+        columns = [info[1] for info in c.fetchall()]
+        for column in ('segments', 'reused_segments'):
+            if columns and column not in columns:
+                c.execute(f"ALTER TABLE video_encode_stats ADD COLUMN {column} INTEGER DEFAULT 0")
+                conn.commit()
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise e
+
+    try:
+        c.execute("PRAGMA table_info(video_jobs)")
+        columns = [info[1] for info in c.fetchall()]
+        if columns and 'manifest' not in columns:
+            c.execute("ALTER TABLE video_jobs ADD COLUMN manifest TEXT")
+            conn.commit()
+        if columns and 'not_before' not in columns:
+            c.execute("ALTER TABLE video_jobs ADD COLUMN not_before TIMESTAMP")
+            conn.commit()
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_video_jobs_active_article'")
+        if columns and not c.fetchone():
+            # 기사 하나에 대기/진행 중인 작업은 하나뿐입니다. 이전에 중복으로 쌓인 작업은 가장 오래된 것만 남깁니다.
+            c.execute("""
+                UPDATE video_jobs SET state = 'failed', stage = '실패', error = '같은 기사의 중복 작업', finished_at = ?
+                WHERE state IN ('queued', 'running') AND id NOT IN (
+                    SELECT MIN(id) FROM video_jobs WHERE state IN ('queued', 'running') GROUP BY article_id
+                )
+            """, (datetime.now(),))
+            c.execute("""
+                CREATE UNIQUE INDEX idx_video_jobs_active_article ON video_jobs(article_id)
+                WHERE state IN ('queued', 'running')
+            """)
+            conn.commit()
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise e
+
 def init_db():
     conn = sqlite3.connect(DB_FILE, check_same_thread=False)
     c = conn.cursor()
@@ -123,11 +166,543 @@ def init_db():
         FOREIGN KEY(user_id) REFERENCES users(id)
     )
     """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS chat_summaries (
+        user_id INTEGER PRIMARY KEY,
+        summary TEXT NOT NULL,
+        summarized_up_to INTEGER NOT NULL,
+        updated_at TIMESTAMP,
+        FOREIGN KEY(user_id) REFERENCES users(id)
+    )
+    """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS index_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        article_id INTEGER NOT NULL,
+        enqueued_at TIMESTAMP
+    )
+    """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS answer_cache (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        answer TEXT NOT NULL,
+        embedding BLOB NOT NULL,
+        index_version TEXT,
+        hit_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP,
+        last_hit_at TIMESTAMP
+    )
+    """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS answer_cache_sources (
+        entry_id INTEGER NOT NULL,
+        article_id INTEGER NOT NULL,
+        FOREIGN KEY(entry_id) REFERENCES answer_cache(id)
+    )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_answer_cache_sources_article ON answer_cache_sources(article_id)")
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS asset_cache (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        path TEXT NOT NULL,
+        size_bytes INTEGER NOT NULL,
+        hit_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP,
+        last_used_at TIMESTAMP
+    )
+    """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS video_assets (
+        video_id INTEGER NOT NULL,
+        asset_key TEXT NOT NULL,
+        PRIMARY KEY (video_id, asset_key),
+        FOREIGN KEY(video_id) REFERENCES videos(id)
+    )
+    """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS video_encode_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id INTEGER,
+        profile TEXT NOT NULL,
+        mode TEXT NOT NULL,
+        frames INTEGER,
+        seconds REAL,
+        size_bytes INTEGER,
+        segments INTEGER DEFAULT 0,
+        reused_segments INTEGER DEFAULT 0,
+        created_at TIMESTAMP
+    )
+    """)
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS video_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        article_id INTEGER,
+        title TEXT,
+        article_json TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER DEFAULT 0,
+        max_attempts INTEGER DEFAULT 3,
+        worker_id TEXT,
+        progress REAL DEFAULT 0,
+        stage TEXT,
+        error TEXT,
+        video_id INTEGER,
+        manifest TEXT,
+        not_before TIMESTAMP,
+        created_at TIMESTAMP,
+        started_at TIMESTAMP,
+        heartbeat_at TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_video_jobs_state ON video_jobs(state, id)")
+
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS app_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
     
     update_schema(conn)
     conn.commit()
     return conn
 
+# --- App Settings Functions ---
+def get_app_setting(conn, key, default=None):
+    """Returns a stored admin setting value, or `default` when it is not set."""
+    c = conn.cursor()
+    c.execute("SELECT value FROM app_settings WHERE key = ?", (key,))
+    row = c.fetchone()
+    return row[0] if row else default
+
+def set_app_setting(conn, key, value):
+    """Creates or updates an admin setting value."""
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO app_settings (key, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """, (key, value, datetime.now()))
+    conn.commit()
+
+# --- Vector Index Queue Functions ---
+def enqueue_index_update(conn, article_ids, commit=True):
+    """Queues articles whose text changed so the background worker re-embeds them."""
+    now = datetime.now()
+    conn.executemany(
+        "INSERT INTO index_queue (article_id, enqueued_at) VALUES (?, ?)",
+        [(int(article_id), now) for article_id in article_ids],
+    )
+    if commit:
+        conn.commit()
+
+def get_index_queue_stats(conn):
+    """Returns the pending count and the ages (seconds) of the oldest and newest queued items."""
+    query = """
+        SELECT
+            COUNT(*) AS pending,
+            (julianday('now', 'localtime') - julianday(MIN(enqueued_at))) * 86400 AS oldest_age_seconds,
+            (julianday('now', 'localtime') - julianday(MAX(enqueued_at))) * 86400 AS newest_age_seconds
+        FROM index_queue
+    """
+    return pd.read_sql_query(query, conn).iloc[0].to_dict()
+
+def fetch_index_queue(conn, limit=200):
+    """Returns up to `limit` queued (queue_id, article_id) pairs, oldest first."""
+    c = conn.cursor()
+    c.execute("SELECT id, article_id FROM index_queue ORDER BY id LIMIT ?", (int(limit),))
+    return c.fetchall()
+
+def delete_index_queue_items(conn, queue_ids=None, up_to_id=None):
+    """Removes processed queue items, either by id or everything up to a watermark id."""
+    c = conn.cursor()
+    if queue_ids:
+        c.executemany("DELETE FROM index_queue WHERE id = ?", [(int(qid),) for qid in queue_ids])
+    if up_to_id is not None:
+        c.execute("DELETE FROM index_queue WHERE id <= ?", (int(up_to_id),))
+    conn.commit()
+
+def get_index_queue_watermark(conn):
+    """Returns the highest queue id currently present (0 when the queue is empty)."""
+    c = conn.cursor()
+    c.execute("SELECT COALESCE(MAX(id), 0) FROM index_queue")
+    return c.fetchone()[0]
+
+# --- Answer Cache Functions ---
+def save_answer_cache_entry(conn, question, answer, embedding, index_version, article_ids):
+    """Stores an agent answer with its question embedding (float32 bytes) and source articles."""
+    c = conn.cursor()
+    c.execute(
+        "INSERT INTO answer_cache (question, answer, embedding, index_version, created_at) VALUES (?, ?, ?, ?, ?)",
+        (question, answer, embedding, index_version, datetime.now()),
+    )
+    entry_id = c.lastrowid
+    c.executemany(
+        "INSERT INTO answer_cache_sources (entry_id, article_id) VALUES (?, ?)",
+        [(entry_id, int(article_id)) for article_id in set(article_ids)],
+    )
+    _bump_answer_cache_generation(conn)
+    conn.commit()
+    return entry_id
+
+def _bump_answer_cache_generation(conn):
+    """Tells processes holding an in-memory answer-cache index to reload it."""
+    conn.execute("""
+        INSERT INTO app_settings (key, value, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """, (ANSWER_CACHE_GENERATION_SETTING, str(time.time_ns()), datetime.now()))
+
+def get_answer_cache_embeddings(conn, created_after=None):
+    """Returns (entry_id, embedding bytes) of cached answers created after `created_after`."""
+    c = conn.cursor()
+    c.execute(
+        "SELECT id, embedding FROM answer_cache WHERE created_at > ? ORDER BY id",
+        (created_after or datetime.min,),
+    )
+    return c.fetchall()
+
+def get_answer_cache_entry(conn, entry_id):
+    """Returns a cached answer as a dictionary, or None if it was purged."""
+    c = conn.cursor()
+    c.execute("SELECT id, question, answer, index_version, created_at FROM answer_cache WHERE id = ?", (int(entry_id),))
+    row = c.fetchone()
+    if row:
+        return {'id': row[0], 'question': row[1], 'answer': row[2], 'index_version': row[3], 'created_at': row[4]}
+    return None
+
+def record_answer_cache_hit(conn, entry_id):
+    """Counts a reuse of a cached answer."""
+    c = conn.cursor()
+    c.execute(
+        "UPDATE answer_cache SET hit_count = hit_count + 1, last_hit_at = ? WHERE id = ?",
+        (datetime.now(), int(entry_id)),
+    )
+    conn.commit()
+
+def delete_answer_cache_entries(conn, article_ids=None, created_before=None, all_entries=False):
+    """Deletes cached answers citing `article_ids`, created before a time, or all of them. Returns the count."""
+    c = conn.cursor()
+    if all_entries:
+        c.execute("SELECT id FROM answer_cache")
+    elif article_ids:
+        placeholders = ','.join('?' * len(article_ids))
+        c.execute(
+            f"SELECT DISTINCT entry_id FROM answer_cache_sources WHERE article_id IN ({placeholders})",
+            [int(article_id) for article_id in article_ids],
+        )
+    elif created_before is not None:
+        c.execute("SELECT id FROM answer_cache WHERE created_at <= ?", (created_before,))
+    else:
+        return 0
+    ids = [(row[0],) for row in c.fetchall()]
+    if ids:
+        c.executemany("DELETE FROM answer_cache_sources WHERE entry_id = ?", ids)
+        c.executemany("DELETE FROM answer_cache WHERE id = ?", ids)
+        _bump_answer_cache_generation(conn)
+        conn.commit()
+    return len(ids)
+
+def get_answer_cache_count(conn):
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM answer_cache")
+    return c.fetchone()[0]
+
+def get_answer_cache_summary(conn, limit=50):
+    """Returns the most reused cached answers for the admin portal."""
+    query = """
+        SELECT id, question, hit_count, created_at, last_hit_at, index_version
+        FROM answer_cache
+        ORDER BY hit_count DESC, created_at DESC
+        LIMIT ?
+    """
+    return pd.read_sql_query(query, conn, params=(int(limit),))
+
+# --- Video Asset Cache Functions ---
+def save_asset_entry(conn, key, kind, path, size_bytes):
+    """Registers (or refreshes) a stored asset file; `path` is relative to the asset store root."""
+    now = datetime.now()
+    conn.execute("""
+        INSERT INTO asset_cache (key, kind, path, size_bytes, created_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET path = excluded.path, size_bytes = excluded.size_bytes,
+            last_used_at = excluded.last_used_at
+    """, (key, kind, path, int(size_bytes), now, now))
+    conn.commit()
+
+def record_asset_hit(conn, key):
+    """Marks a cached asset as used (LRU order) and counts the reuse."""
+    conn.execute(
+        "UPDATE asset_cache SET hit_count = hit_count + 1, last_used_at = ? WHERE key = ?",
+        (datetime.now(), key),
+    )
+    conn.commit()
+
+def add_video_assets(conn, video_id, asset_keys):
+    """Records which cached assets a video was made from; referenced assets are never evicted."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO video_assets (video_id, asset_key) VALUES (?, ?)",
+        [(int(video_id), key) for key in set(asset_keys)],
+    )
+    conn.commit()
+
+def get_asset_eviction_candidates(conn, used_before=None):
+    """Returns (key, path, size_bytes) of assets no existing video refers to, least recently used first.
+
+    With `used_before`, assets created or used since then are left out.
+    """
+    c = conn.cursor()
+    c.execute("""
+        SELECT key, path, size_bytes FROM asset_cache
+        WHERE key NOT IN (
+            SELECT va.asset_key FROM video_assets va JOIN videos v ON v.id = va.video_id
+        )
+        AND (? IS NULL OR last_used_at < ?)
+        ORDER BY last_used_at
+    """, (used_before, used_before))
+    return c.fetchall()
+
+def delete_asset_entries(conn, keys, used_before=None):
+    """Deletes asset entries; with `used_before`, only those not used since then. Returns the deleted keys."""
+    deleted = []
+    for key in keys:
+        c = conn.execute(
+            "DELETE FROM asset_cache WHERE key = ? AND (? IS NULL OR last_used_at < ?)",
+            (key, used_before, used_before),
+        )
+        if c.rowcount:
+            deleted.append(key)
+    conn.commit()
+    return deleted
+
+def get_asset_cache_stats(conn):
+    """Returns the number and total size of cached assets, and how many of them videos refer to."""
+    c = conn.cursor()
+    c.execute("""
+        SELECT COUNT(*), COALESCE(SUM(size_bytes), 0),
+               (SELECT COUNT(DISTINCT asset_key) FROM video_assets)
+        FROM asset_cache
+    """)
+    count, size_bytes, referenced = c.fetchone()
+    return {'assets': count, 'size_bytes': size_bytes, 'referenced': referenced}
+
+# --- Video Encode Stats Functions ---
+def save_video_encode_stat(conn, video_id, stats):
+    """Records how long encoding a video took and how large the file is (stats from backend.video_encoder)."""
+    conn.execute("""
+        INSERT INTO video_encode_stats (video_id, profile, mode, frames, seconds, size_bytes, segments, reused_segments, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (video_id, stats['profile'], stats['mode'], int(stats['frames']), float(stats['seconds']),
+          int(stats['size_bytes']), int(stats.get('segments', 0)), int(stats.get('reused_segments', 0)), datetime.now()))
+    conn.commit()
+
+def get_video_encode_summary(conn):
+    """Average encode speed, output size and reused scene segments per encoding profile and mode.
+
+    encode_fps counts encoded frames only; frames of reused segments cost no encoding.
+    """
+    query = """
+        SELECT profile, mode, COUNT(*) AS videos,
+               ROUND(SUM(frames) / SUM(seconds), 1) AS encode_fps,
+               ROUND(AVG(seconds), 1) AS avg_seconds,
+               ROUND(AVG(size_bytes) / 1048576.0, 2) AS avg_size_mb,
+               SUM(reused_segments) || ' / ' || SUM(segments) AS reused_segments,
+               MAX(created_at) AS last_encoded
+        FROM video_encode_stats
+        GROUP BY profile, mode
+        ORDER BY last_encoded DESC
+    """
+    return pd.read_sql_query(query, conn)
+
+# --- Video Job Queue Functions ---
+# state: queued -> running -> completed | failed. A running job whose heartbeat stops (worker crashed or
+# was killed) is put back in the queue by the next claim, until it has used up max_attempts.
+# `manifest` (JSON) holds the results of the stages already completed, so a retry resumes after them.
+# An article has at most one queued or running job (unique partial index idx_video_jobs_active_article).
+def enqueue_video_job(conn, article, max_attempts=3):
+    """Queues video production for `article` (id, title, content, crawled_date) and returns the job id.
+
+    If the article already has a queued or running job, that job's id is returned instead.
+    """
+    c = conn.cursor()
+    while True:
+        c.execute("""
+            INSERT INTO video_jobs (article_id, title, article_json, state, max_attempts, stage, created_at)
+            VALUES (?, ?, ?, 'queued', ?, ?, ?)
+            ON CONFLICT(article_id) WHERE state IN ('queued', 'running') DO NOTHING
+        """, (article['id'], article['title'], json.dumps(article, ensure_ascii=False, default=str),
+              int(max_attempts), '대기 중', datetime.now()))
+        conn.commit()
+        if c.rowcount:
+            return c.lastrowid
+        c.execute("SELECT id FROM video_jobs WHERE article_id = ? AND state IN ('queued', 'running')",
+                  (article['id'],))
+        row = c.fetchone()
+        if row:
+            return row[0]
+        # The conflicting job finished in between; queue a new one.
+
+def claim_video_job(conn, worker_id, stale_seconds):
+    """Reclaims jobs with a stale heartbeat, then marks the oldest queued job as running for `worker_id`.
+
+    Jobs waiting out a retry backoff (not_before in the future) are skipped.
+
+    Returns the claimed job as a dict (with the decoded 'article'), or None when the queue is empty.
+    """
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        stale = """state = 'running' AND
+            (julianday('now', 'localtime') - julianday(heartbeat_at)) * 86400 > ?"""
+        c.execute(f"""
+            UPDATE video_jobs SET state = 'failed', finished_at = ?,
+                error = '작업자 응답 없음 (heartbeat timeout), 재시도 횟수 초과'
+            WHERE {stale} AND attempts >= max_attempts
+        """, (datetime.now(), float(stale_seconds)))
+        c.execute(f"""
+            UPDATE video_jobs SET state = 'queued', worker_id = NULL, stage = '재시도 대기 중',
+                error = '작업자 응답 없음 (heartbeat timeout)'
+            WHERE {stale}
+        """, (float(stale_seconds),))
+
+        now = datetime.now()
+        c.execute("""
+            SELECT id FROM video_jobs
+            WHERE state = 'queued' AND (not_before IS NULL OR julianday(not_before) <= julianday(?))
+            ORDER BY id LIMIT 1
+        """, (now,))
+        row = c.fetchone()
+        if row:
+            c.execute("""
+                UPDATE video_jobs SET state = 'running', worker_id = ?, attempts = attempts + 1,
+                    progress = 0, stage = '시작', started_at = ?, heartbeat_at = ?
+                WHERE id = ?
+            """, (worker_id, now, now, row[0]))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return get_video_job(conn, row[0]) if row else None
+
+def get_video_job(conn, job_id):
+    """Returns a job as a dict (with the decoded 'article'), or None."""
+    c = conn.cursor()
+    c.execute("SELECT * FROM video_jobs WHERE id = ?", (int(job_id),))
+    row = c.fetchone()
+    if row is None:
+        return None
+    job = dict(zip([column[0] for column in c.description], row))
+    job['article'] = json.loads(job['article_json'])
+    job['manifest'] = json.loads(job['manifest']) if job['manifest'] else {}
+    return job
+
+def save_video_job_manifest(conn, job_id, worker_id, manifest, commit=True):
+    """Stores the completed-stage manifest of a running job (only while `worker_id` owns it).
+
+    With commit=False the update joins the caller's transaction. Returns False when the
+    job no longer belongs to `worker_id`.
+    """
+    c = conn.cursor()
+    c.execute(
+        "UPDATE video_jobs SET manifest = ?, heartbeat_at = ? WHERE id = ? AND worker_id = ? AND state = 'running'",
+        (json.dumps(manifest, ensure_ascii=False), datetime.now(), int(job_id), worker_id),
+    )
+    if commit:
+        conn.commit()
+    return c.rowcount > 0
+
+def retry_video_job(conn, job_id, reset_manifest=False):
+    """Queues a failed job again with a fresh set of attempts.
+
+    Its manifest is kept, so it resumes after the completed stages, unless `reset_manifest`
+    is set (the job then starts over from the script). Returns False if the job is not
+    failed or its article already has another queued or running job.
+    """
+    c = conn.cursor()
+    c.execute("""
+        UPDATE video_jobs SET state = 'queued', attempts = 0, stage = '재시도 대기 중', finished_at = NULL,
+            not_before = NULL, manifest = CASE WHEN ? THEN NULL ELSE manifest END
+        WHERE id = ? AND state = 'failed' AND NOT EXISTS (
+            SELECT 1 FROM video_jobs other
+            WHERE other.article_id = video_jobs.article_id AND other.state IN ('queued', 'running')
+        )
+    """, (bool(reset_manifest), int(job_id)))
+    conn.commit()
+    return c.rowcount > 0
+
+def update_video_job_progress(conn, job_id, worker_id, progress=None, stage=None):
+    """Refreshes the heartbeat (and progress/stage) of a running job.
+
+    Returns False when the job no longer belongs to `worker_id` (e.g. it was reclaimed).
+    """
+    c = conn.cursor()
+    c.execute("""
+        UPDATE video_jobs SET heartbeat_at = ?, progress = COALESCE(?, progress), stage = COALESCE(?, stage)
+        WHERE id = ? AND worker_id = ? AND state = 'running'
+    """, (datetime.now(), progress, stage, int(job_id), worker_id))
+    conn.commit()
+    return c.rowcount > 0
+
+def complete_video_job(conn, job_id, worker_id, video_id):
+    """Marks a running job completed. Returns False when the job no longer belongs to `worker_id`."""
+    c = conn.cursor()
+    c.execute("""
+        UPDATE video_jobs SET state = 'completed', progress = 1, stage = '완료', error = NULL,
+            video_id = ?, finished_at = ?
+        WHERE id = ? AND worker_id = ? AND state = 'running'
+    """, (video_id, datetime.now(), int(job_id), worker_id))
+    conn.commit()
+    return c.rowcount > 0
+
+def fail_video_job(conn, job_id, worker_id, error, backoff_seconds=0):
+    """Records a failed attempt: the job is queued again, or marked failed after max_attempts.
+
+    A requeued job is not claimed before backoff_seconds * 2^(attempts - 1) seconds have
+    passed. Returns False when the job no longer belongs to `worker_id`.
+    """
+    now = datetime.now()
+    c = conn.cursor()
+    c.execute("""
+        UPDATE video_jobs SET
+            state = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+            stage = CASE WHEN attempts < max_attempts THEN '재시도 대기 중' ELSE '실패' END,
+            finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE ? END,
+            not_before = CASE WHEN attempts < max_attempts
+                THEN strftime('%Y-%m-%d %H:%M:%f', ?, '+' || (? * (1 << MAX(attempts - 1, 0))) || ' seconds')
+                ELSE NULL END,
+            worker_id = NULL, error = ?
+        WHERE id = ? AND worker_id = ? AND state = 'running'
+    """, (now, now, float(backoff_seconds), str(error)[:2000], int(job_id), worker_id))
+    conn.commit()
+    return c.rowcount > 0
+
+def get_video_jobs(conn, limit=20):
+    """Returns the most recent jobs, newest first."""
+    query = """
+        SELECT id, article_id, title, state, progress, stage, attempts, max_attempts, worker_id, error, video_id,
+               manifest, created_at, started_at, finished_at, not_before,
+               (julianday('now', 'localtime') - julianday(heartbeat_at)) * 86400 AS heartbeat_age_seconds
+        FROM video_jobs
+        ORDER BY id DESC
+        LIMIT ?
+    """
+    return pd.read_sql_query(query, conn, params=(int(limit),))
+
+def get_video_job_counts(conn):
+    """Returns the number of jobs per state."""
+    c = conn.cursor()
+    c.execute("SELECT state, COUNT(*) FROM video_jobs GROUP BY state")
+    return dict(c.fetchall())
+
 # --- User Management Functions ---
 def add_user(conn, email, password):
     """Adds a new user to the database with a hashed password."""
@@ -165,6 +740,34 @@ def get_chat_history(conn, user_id):
     history = c.fetchall()
     return [{"id": id, "role": role, "content": content, "timestamp": timestamp} for id, role, content, timestamp in history]
 
+def get_chat_messages_after(conn, user_id, after_id=0):
+    """Returns a user's chat messages with id > after_id as (id, role, content), oldest first."""
+    c = conn.cursor()
+    c.execute(
+        "SELECT id, role, content FROM chat_history WHERE user_id = ? AND id > ? ORDER BY id ASC",
+        (user_id, int(after_id or 0)),
+    )
+    return c.fetchall()
+
+def get_chat_summary(conn, user_id):
+    """Returns the rolling conversation summary of a user and the last chat_history id it covers."""
+    c = conn.cursor()
+    c.execute("SELECT summary, summarized_up_to FROM chat_summaries WHERE user_id = ?", (user_id,))
+    row = c.fetchone()
+    return {'summary': row[0], 'summarized_up_to': row[1]} if row else None
+
+def save_chat_summary(conn, user_id, summary, summarized_up_to):
+    """Creates or replaces a user's rolling conversation summary."""
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO chat_summaries (user_id, summary, summarized_up_to, updated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            summary = excluded.summary,
+            summarized_up_to = excluded.summarized_up_to,
+            updated_at = excluded.updated_at
+    """, (user_id, summary, int(summarized_up_to), datetime.now()))
+    conn.commit()
+
 def delete_chat_history_item(conn, message_id):
     """Deletes a single chat message."""
     c = conn.cursor()
@@ -175,6 +778,7 @@ def delete_all_chat_history(conn, user_id):
     """Deletes all chat history for a user."""
     c = conn.cursor()
     c.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
+    c.execute("DELETE FROM chat_summaries WHERE user_id = ?", (user_id,))
     conn.commit()
 
 # --- View History Functions ---
@@ -223,6 +827,15 @@ def delete_all_history(conn, user_id):
     conn.commit()
 
 # --- Article and Video Functions ---
+def _article_status_condition(status):
+    if status == 'AI 기사 생성 대기':
+        return "AND g.id IS NULL"
+    elif status == '영상 제작 대기':
+        return "AND g.id IS NOT NULL AND v.id IS NULL"
+    elif status == '제작 완료':
+        return "AND v.id IS NOT NULL"
+    return ""
+
 def get_articles_with_filter(conn, status='전체', sort_order='최신순', limit=20):
     base_query = """
         SELECT a.* 
@@ -232,22 +845,28 @@ def get_articles_with_filter(conn, status='전체', sort_order='최신순', limi
         WHERE a.is_age_relevant = 1
     """
     
-    filter_conditions = ""
-    if status == 'AI 기사 생성 대기':
-        filter_conditions = "AND g.id IS NULL"
-    elif status == '영상 제작 대기':
-        filter_conditions = "AND g.id IS NOT NULL AND v.id IS NULL"
-    elif status == '제작 완료':
-        filter_conditions = "AND v.id IS NOT NULL"
+    filter_conditions = _article_status_condition(status)
 
     order_clause = "ORDER BY a.crawled_date DESC" if sort_order == '최신순' else "ORDER BY a.crawled_date ASC"
     
-    limit_clause = f"LIMIT {limit}"
+    limit_clause = f"LIMIT {int(limit)}" if limit is not None else ""
 
     query = f"{base_query} {filter_conditions} {order_clause} {limit_clause}"
     
     return pd.read_sql_query(query, conn)
 
+def count_articles_with_filter(conn, status='전체'):
+    """Counts the articles get_articles_with_filter would return, without loading them."""
+    c = conn.cursor()
+    c.execute(f"""
+        SELECT COUNT(DISTINCT a.id)
+        FROM articles a
+        LEFT JOIN generated_articles g ON a.id = g.article_id
+        LEFT JOIN videos v ON a.id = v.article_id
+        WHERE a.is_age_relevant = 1 {_article_status_condition(status)}
+    """)
+    return c.fetchone()[0]
+
 def get_produced_videos(conn):
     conn.row_factory = sqlite3.Row
     return pd.read_sql_query("""
@@ -304,8 +923,38 @@ def save_generated_article(conn, article_data):
         article_data['generated_content'],
         datetime.now()
     ))
+    generated_id = c.lastrowid
+    enqueue_index_update(conn, [article_data['article_id']], commit=False)
     conn.commit()
-    return c.lastrowid
+    return generated_id
+
+def save_generated_articles(conn, articles):
+    """Inserts many generated articles in one transaction and queues them for re-indexing.
+
+    Articles that already have a generated version (e.g. made by a concurrent run) are
+    skipped. Returns the ids of the articles that were inserted.
+    """
+    now = datetime.now()
+    inserted = []
+    with conn:
+        c = conn.cursor()
+        for article_data in articles:
+            c.execute("""
+                INSERT INTO generated_articles (article_id, generated_title, generated_content, created_date)
+                SELECT ?, ?, ?, ?
+                WHERE NOT EXISTS (SELECT 1 FROM generated_articles WHERE article_id = ?)
+            """, (
+                article_data['article_id'],
+                article_data['generated_title'],
+                article_data['generated_content'],
+                now,
+                article_data['article_id'],
+            ))
+            if c.rowcount:
+                inserted.append(article_data['article_id'])
+        if inserted:
+            enqueue_index_update(conn, inserted, commit=False)
+    return inserted
 
 def get_generated_article(conn, article_id):
     query = "SELECT * FROM generated_articles WHERE article_id = ? ORDER BY created_date DESC LIMIT 1"
@@ -324,6 +973,7 @@ def delete_video(conn, video_id):
     if video_path:
         # Delete the record from the database
         c.execute("DELETE FROM videos WHERE id = ?", (video_id,))
+        c.execute("DELETE FROM video_assets WHERE video_id = ?", (video_id,))
         conn.commit()
         return video_path
     return None
@@ -0,0 +1,86 @@
+"""Recall-vs-latency benchmark for the FAISS index presets in rag_processor.
+
+Runs on a synthetic clustered corpus so it needs no API key and can be executed
+on the deployment machine before switching presets:
+
+    python -m backend.index_benchmark --vectors 20000 --dim 1536
+"""
+import argparse
+import time
+import logging
+import numpy as np
+import pandas as pd
+import faiss
+
+from backend.rag_processor import INDEX_PRESETS, resolve_index_factory, build_faiss_index, apply_search_params
+
+# Query-time values swept per preset (the first entry is the coarsest / fastest)
+SEARCH_PARAM_SWEEP = {
+    'flat': [{}],
+    'hnsw': [{'efSearch': v} for v in (16, 32, 64, 128)],
+    'ivf_flat': [{'nprobe': v} for v in (1, 4, 8, 16, 32)],
+    'ivf_pq': [{'nprobe': v} for v in (4, 8, 16, 32, 64)],
+}
+
+
+def make_synthetic_corpus(n_vectors, dim, n_queries, n_clusters=100, seed=0):
+    """Generates topic-clustered vectors resembling embedded article chunks, plus held-out queries."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype('float32')
+    assign = rng.integers(0, n_clusters, n_vectors + n_queries)
+    data = centers[assign] + 0.35 * rng.normal(size=(n_vectors + n_queries, dim)).astype('float32')
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data[:n_vectors], data[n_vectors:]
+
+
+def run_benchmark(n_vectors=20000, dim=1536, n_queries=200, k=4, presets=None):
+    """Builds every preset on the same corpus and measures recall@k against exact search.
+
+    Latency is measured one query at a time, the way the chatbot retriever calls the index.
+    Returns a DataFrame with one row per (preset, search params) combination.
+    """
+    corpus, queries = make_synthetic_corpus(n_vectors, dim, n_queries)
+    exact = faiss.IndexFlatL2(dim)
+    exact.add(corpus)
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for preset_name in presets or INDEX_PRESETS:
+        factory = resolve_index_factory(preset_name, n_vectors, dim)
+        start = time.perf_counter()
+        index = build_faiss_index(corpus, factory)
+        build_s = time.perf_counter() - start
+        size_mb = faiss.serialize_index(index).nbytes / (1024 * 1024)
+
+        for params in SEARCH_PARAM_SWEEP[preset_name]:
+            apply_search_params(index, params)
+            latencies, hits = [], 0
+            for qi in range(n_queries):
+                t0 = time.perf_counter()
+                _, found = index.search(queries[qi:qi + 1], k)
+                latencies.append((time.perf_counter() - t0) * 1000)
+                hits += len(set(found[0]) & set(truth[qi]))
+            rows.append({
+                'preset': preset_name,
+                'factory': factory,
+                'search_params': ', '.join(f"{key}={value}" for key, value in params.items()) or '-',
+                f'recall@{k}': round(hits / (n_queries * k), 4),
+                'latency_ms_avg': round(float(np.mean(latencies)), 3),
+                'latency_ms_p95': round(float(np.percentile(latencies, 95)), 3),
+                'index_mb': round(size_mb, 1),
+                'build_s': round(build_s, 2),
+            })
+            logging.info(f"[Index Benchmark] {rows[-1]}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index presets on a synthetic corpus.")
+    parser.add_argument('--vectors', type=int, default=20000)
+    parser.add_argument('--dim', type=int, default=1536)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--presets', nargs='*', choices=list(INDEX_PRESETS), default=None)
+    args = parser.parse_args()
+    result = run_benchmark(args.vectors, args.dim, args.queries, args.k, args.presets)
+    print(result.to_string(index=False))
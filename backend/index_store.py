@@ -0,0 +1,721 @@
+"""On-disk storage for the RAG vector index.
+
+The FAISS index is written as `index.faiss` and read back memory-mapped, so every
+process that opens the same file shares its pages through the OS page cache. Chunk
+texts and metadata live in a SQLite file (`docstore.sqlite`) that is queried per
+search hit instead of unpickling the whole docstore into memory.
+
+Per-chunk filter columns (crawl date, age relevance, keywords) are kept in a columnar
+sidecar (`metadata.npz`) with precomputed ID bitmaps, so filtered searches are pushed
+into FAISS through an IDSelectorBitmap instead of over-fetching and filtering in Python.
+
+The docstore also carries an FTS5 table over Korean character bigrams of each chunk
+(`chunks_fts`, rowid = FAISS position) for the lexical half of hybrid retrieval.
+
+Both files live in immutable, versioned snapshot directories (see SnapshotStore).
+Incremental updates publish a new snapshot that appends vectors and tombstones the
+chunks of re-indexed articles (`deleted = 1`); searches skip tombstoned chunks and a
+full rebuild compacts them away.
+"""
+import os
+import re
+import json
+import pickle
+import sqlite3
+import logging
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import faiss
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+from langchain_community.docstore.base import Docstore
+from langchain.docstore.document import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+
+from backend.config import INDEX_SNAPSHOTS_TO_KEEP, DB_PATH
+
+INDEX_FILE = 'index.faiss'
+DOCSTORE_FILE = 'docstore.sqlite'
+MANIFEST_FILE = 'manifest.json'
+METADATA_FILE = 'metadata.npz'
+LEGACY_PICKLE_FILE = 'index.pkl'
+SNAPSHOTS_DIR = 'snapshots'
+CURRENT_FILE = 'CURRENT'
+WRITER_LOCK_FILE = '.writer.lock'
+STAGING_PREFIX = '.staging-'
+STAGING_MAX_AGE_SECONDS = 3600
+# Chunk metadata fields behind ChunkMetadata's filter columns
+FILTER_FIELDS = ('crawled_date', 'is_age_relevant', 'keywords')
+
+# Zero-copy read of the vector codes: IO_FLAG_MMAP maps the file, IO_FLAG_MMAP_IFC keeps
+# flat codes in the mapping instead of copying them to the heap (faiss >= 1.9).
+MMAP_READ_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, 'IO_FLAG_MMAP_IFC', 0) | faiss.IO_FLAG_READ_ONLY
+
+_LEXICAL_TOKEN = re.compile(r'[가-힣]+|[0-9a-z]+')
+
+# Serializes snapshot writers (index worker, admin rebuild) within the process.
+_snapshot_write_lock = threading.RLock()
+# Nesting depth of SnapshotStore.writer() per root, only touched while holding _snapshot_write_lock.
+_writer_depth: Dict[str, int] = {}
+
+
+def lexical_terms(text: str) -> List[str]:
+    """Terms for the FTS index: Hangul runs become character bigrams, Latin/digit runs stay whole.
+
+    Bigrams match Korean words regardless of attached particles ('전립선에' shares '전립', '립선'
+    with '전립선') and still cover two-syllable terms such as '치매' that a trigram index cannot.
+    """
+    terms = []
+    for token in _LEXICAL_TOKEN.findall(text.lower()):
+        if '가' <= token[0] <= '힣' and len(token) > 1:
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+class SQLiteDocstore(Docstore):
+    """Read-mostly docstore backed by a SQLite file, keyed by the chunk's FAISS position."""
+
+    def __init__(self, path: str, readonly: bool = True):
+        self.path = path
+        uri = f"file:{path}?mode=ro" if readonly else f"file:{path}"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+
+    def search(self, search: str) -> Union[str, Document]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, metadata FROM chunks WHERE faiss_id = ?", (int(search),)
+            ).fetchone()
+        if row is None:
+            return f"ID {search} not found."
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def search_many(self, ids: Iterable[int]) -> Dict[int, Document]:
+        """Fetches several live (non-tombstoned) chunks in one query; returns {faiss_id: Document}."""
+        ids = [int(i) for i in ids]
+        if not ids:
+            return {}
+        placeholders = ','.join('?' * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT faiss_id, content, metadata FROM chunks WHERE deleted = 0 AND faiss_id IN ({placeholders})",
+                ids,
+            ).fetchall()
+        return {faiss_id: Document(page_content=content, metadata=json.loads(metadata))
+                for faiss_id, content, metadata in rows}
+
+    def lexical_search(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """BM25-ranked live chunk ids for `query`; returns [(faiss_id, bm25 score)], best first."""
+        terms = set(lexical_terms(query))
+        if not terms:
+            return []
+        match = ' OR '.join(f'"{term}"' for term in terms)
+        try:
+            with self._lock:
+                return self._conn.execute(
+                    """
+                    SELECT f.rowid, bm25(chunks_fts) AS score
+                    FROM chunks_fts f JOIN chunks c ON c.faiss_id = f.rowid
+                    WHERE chunks_fts MATCH ? AND c.deleted = 0
+                    ORDER BY score LIMIT ?
+                    """,
+                    (match, k),
+                ).fetchall()
+        except sqlite3.OperationalError as e:
+            # Snapshots written before the FTS table existed; the next index update adds it.
+            logging.debug(f"Lexical search unavailable for {self.path}: {e}")
+            return []
+
+    def deleted_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks WHERE deleted = 1").fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks WHERE deleted = 0").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+def _pack_bits(mask) -> np.ndarray:
+    """Packs a boolean mask into FAISS IDSelectorBitmap layout (id i -> bit i % 8 of byte i // 8)."""
+    return np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+
+
+def _parse_keywords(value) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(keyword).strip() for keyword in value if str(keyword).strip()]
+    return [keyword.strip() for keyword in str(value or '').split(',') if keyword.strip()]
+
+
+def _article_filter_fields(db_path: Optional[str], article_ids: Iterable[int]) -> Dict[int, dict]:
+    """FILTER_FIELDS of the given articles from the app database, keyed by article id ({} if unavailable)."""
+    article_ids = sorted({int(a) for a in article_ids if a is not None and int(a) >= 0})
+    if not db_path or not article_ids or not os.path.exists(db_path):
+        return {}
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(
+                f"SELECT id, crawled_date, is_age_relevant, keywords FROM articles "
+                f"WHERE id IN ({','.join('?' * len(article_ids))})", article_ids
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.warning(f"Could not read article metadata from {db_path}: {e}")
+        return {}
+    return {
+        article_id: {'crawled_date': str(crawled_date) if crawled_date else None,
+                     'is_age_relevant': bool(is_age_relevant), 'keywords': _parse_keywords(keywords)}
+        for article_id, crawled_date, is_age_relevant, keywords in rows
+    }
+
+
+def _crawled_day(value) -> int:
+    """Date ordinal of a crawled_date value, or -1 when it is missing or unparsable."""
+    try:
+        return datetime.fromisoformat(str(value)).toordinal()
+    except (TypeError, ValueError):
+        return -1
+
+
+class ChunkMetadata:
+    """Columnar filter metadata for every FAISS position of a snapshot.
+
+    `crawled_days` holds date ordinals (-1 if unknown); `age_relevant`, `live` and one bitmap
+    per keyword are packed bitsets, so combining filters is a few numpy ANDs over ntotal / 8
+    bytes and the result is handed to FAISS as-is.
+
+    `filterable` is False when the filter fields of an old snapshot could not be backfilled
+    (no articles table); searches then ignore filters instead of returning nothing.
+    """
+
+    def __init__(self, article_ids, crawled_days, age_relevant, live, keyword_bits: Dict[str, np.ndarray],
+                 filterable: bool = True):
+        self.article_ids = np.asarray(article_ids, dtype='int64')
+        self.crawled_days = np.asarray(crawled_days, dtype='int32')
+        self.age_relevant = age_relevant
+        self.live = live
+        self.keyword_bits = keyword_bits
+        self.filterable = filterable
+        self._recent_cache = (None, None)
+
+    @property
+    def ntotal(self) -> int:
+        return len(self.article_ids)
+
+    @classmethod
+    def from_documents(cls, documents: List[Document], live=None) -> 'ChunkMetadata':
+        """Builds the columns from chunk metadata; the i-th document is FAISS position i."""
+        metas = [doc.metadata if doc is not None else {} for doc in documents]
+        keyword_masks = {}
+        for i, meta in enumerate(metas):
+            for keyword in _parse_keywords(meta.get('keywords')):
+                keyword_masks.setdefault(keyword, np.zeros(len(metas), dtype=bool))[i] = True
+        return cls(
+            article_ids=[int(meta.get('article_id') or -1) for meta in metas],
+            crawled_days=[_crawled_day(meta.get('crawled_date')) for meta in metas],
+            age_relevant=_pack_bits([bool(meta.get('is_age_relevant')) for meta in metas]),
+            live=_pack_bits([doc is not None for doc in documents] if live is None else live),
+            keyword_bits={keyword: _pack_bits(mask) for keyword, mask in keyword_masks.items()},
+        )
+
+    @classmethod
+    def from_docstore(cls, conn, ntotal: int, articles_db: Optional[str] = None) -> 'ChunkMetadata':
+        """Rebuilds the columns from a docstore, for snapshots written before the sidecar existed.
+
+        Chunks indexed before the filter fields were stored in their metadata are backfilled
+        from the `articles` table of `articles_db`.
+        """
+        documents = [None] * ntotal
+        live = np.zeros(ntotal, dtype=bool)
+        for faiss_id, content, metadata, deleted in conn.execute(
+                "SELECT faiss_id, content, metadata, deleted FROM chunks"):
+            if faiss_id < ntotal:
+                documents[faiss_id] = Document(page_content=content, metadata=json.loads(metadata))
+                live[faiss_id] = not deleted
+
+        incomplete = [i for i, doc in enumerate(documents)
+                      if doc is not None and live[i] and not all(field in doc.metadata for field in FILTER_FIELDS)]
+        if not incomplete:
+            return cls.from_documents(documents, live=live)
+        articles = _article_filter_fields(articles_db, (documents[i].metadata.get('article_id') for i in incomplete))
+        missing = 0
+        for i in incomplete:
+            fields = articles.get(int(documents[i].metadata.get('article_id') or -1))
+            if fields is None:
+                missing += 1
+            else:
+                documents[i].metadata = {**fields, **documents[i].metadata}
+        metadata = cls.from_documents(documents, live=live)
+        if not articles:
+            logging.warning(f"{len(incomplete)} chunks have no filter metadata and the articles table is unavailable; "
+                            f"filtered searches on this snapshot will ignore the filters.")
+            metadata.filterable = False
+        else:
+            logging.info(f"Backfilled filter metadata of {len(incomplete) - missing} chunks from the articles table"
+                         f"{f'; {missing} chunks of deleted articles only match unfiltered searches' if missing else ''}.")
+        return metadata
+
+    @classmethod
+    def load(cls, path: str) -> 'ChunkMetadata':
+        with np.load(path, allow_pickle=False) as data:
+            keyword_names = [str(name) for name in data['keyword_names']]
+            return cls(
+                data['article_ids'], data['crawled_days'], data['age_relevant'], data['live'],
+                dict(zip(keyword_names, data['keyword_bits'])),
+                filterable=bool(data['filterable']) if 'filterable' in data.files else True,
+            )
+
+    def save(self, path: str) -> None:
+        names = sorted(self.keyword_bits)
+        nbytes = len(self.live)
+        np.savez(
+            path,
+            article_ids=self.article_ids, crawled_days=self.crawled_days,
+            age_relevant=self.age_relevant, live=self.live,
+            keyword_names=np.array(names, dtype=str),
+            keyword_bits=(np.stack([self.keyword_bits[name] for name in names])
+                          if names else np.zeros((0, nbytes), dtype='uint8')),
+            filterable=np.array(self.filterable),
+        )
+
+    def _unpack(self, bits) -> np.ndarray:
+        return np.unpackbits(bits, count=self.ntotal, bitorder='little').astype(bool)
+
+    def append(self, documents: List[Document], replaced_article_ids: Iterable[int]) -> 'ChunkMetadata':
+        """Returns the columns after tombstoning `replaced_article_ids` and appending `documents`."""
+        added = ChunkMetadata.from_documents(documents)
+        live = self._unpack(self.live) & ~np.isin(self.article_ids, list(replaced_article_ids))
+        empty_old, empty_new = np.zeros(self.ntotal, dtype=bool), np.zeros(added.ntotal, dtype=bool)
+        keyword_bits = {}
+        for keyword in set(self.keyword_bits) | set(added.keyword_bits):
+            old = self._unpack(self.keyword_bits[keyword]) if keyword in self.keyword_bits else empty_old
+            new = added._unpack(added.keyword_bits[keyword]) if keyword in added.keyword_bits else empty_new
+            keyword_bits[keyword] = _pack_bits(np.concatenate([old, new]))
+        return ChunkMetadata(
+            article_ids=np.concatenate([self.article_ids, added.article_ids]),
+            crawled_days=np.concatenate([self.crawled_days, added.crawled_days]),
+            age_relevant=_pack_bits(np.concatenate([self._unpack(self.age_relevant), added._unpack(added.age_relevant)])),
+            live=_pack_bits(np.concatenate([live, added._unpack(added.live)])),
+            keyword_bits=keyword_bits,
+            filterable=self.filterable,
+        )
+
+    def keywords(self) -> List[str]:
+        return sorted(self.keyword_bits)
+
+    def _recent_bits(self, cutoff_day: int) -> np.ndarray:
+        cached_day, bits = self._recent_cache
+        if cached_day != cutoff_day:
+            bits = _pack_bits(self.crawled_days >= cutoff_day)
+            self._recent_cache = (cutoff_day, bits)
+        return bits
+
+    def filter_bitmap(self, age_relevant_only: bool = False, recent_days: Optional[int] = None,
+                      keywords: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Bitmap of live chunks matching every given filter (any of `keywords`)."""
+        bits = self.live.copy()
+        if age_relevant_only:
+            bits &= self.age_relevant
+        if recent_days is not None:
+            bits &= self._recent_bits(date.today().toordinal() - int(recent_days))
+        if keywords:
+            keyword_bits = np.zeros_like(bits)
+            for keyword in keywords:
+                if keyword in self.keyword_bits:
+                    keyword_bits |= self.keyword_bits[keyword]
+            bits &= keyword_bits
+        return bits
+
+    @staticmethod
+    def contains(bits: np.ndarray, ids) -> np.ndarray:
+        """Vectorized membership test of FAISS ids against a packed bitmap."""
+        ids = np.asarray(ids, dtype='int64')
+        in_range = (ids >= 0) & ((ids >> 3) < len(bits))
+        safe = np.where(in_range, ids, 0)
+        return in_range & (((bits[safe >> 3] >> (safe & 7)) & 1) == 1)
+
+
+def _selector_search_params(index, selector):
+    """SearchParameters carrying `selector` plus the index's current nprobe / efSearch.
+
+    Passing params to search() replaces the values set through ParameterSpace, so they are copied over.
+    """
+    base = faiss.downcast_index(index)
+    if isinstance(base, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=base.hnsw.efSearch)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+class VectorIndex:
+    """A FAISS index paired with its SQLite docstore and the embeddings used to query it."""
+
+    def __init__(self, index, docstore: SQLiteDocstore, embeddings, version: Optional[str] = None,
+                 metadata: Optional[ChunkMetadata] = None):
+        self.index = index
+        self.docstore = docstore
+        self.embeddings = embeddings
+        self.version = version
+        self.metadata = metadata
+        # Tombstoned chunks still occupy FAISS slots, so over-fetch by that many to return k live hits.
+        self.deleted_count = docstore.deleted_count()
+
+    def vector_search_ids(self, vector, k: int = 4, id_bitmap: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """Nearest FAISS positions for `vector` as [(faiss_id, distance)].
+
+        Without `id_bitmap` tombstones are included (and over-fetched for); with one, FAISS only
+        visits ids set in the bitmap (see ChunkMetadata.filter_bitmap, which excludes tombstones).
+        """
+        if id_bitmap is None:
+            fetch_k, params = min(self.index.ntotal, k + self.deleted_count), None
+        else:
+            fetch_k = min(self.index.ntotal, k)
+            selector = faiss.IDSelectorBitmap(len(id_bitmap), faiss.swig_ptr(id_bitmap))
+            params = _selector_search_params(self.index, selector)
+        if fetch_k <= 0:
+            return []
+        distances, ids = self.index.search(np.asarray([vector], dtype='float32'), fetch_k, params=params)
+        return [(int(i), float(d)) for i, d in zip(ids[0], distances[0]) if i >= 0]
+
+    def similarity_search_with_score_by_vector(self, vector, k: int = 4) -> List[Tuple[Document, float]]:
+        hits = self.vector_search_ids(vector, k)
+        docs = self.docstore.search_many(i for i, _ in hits)
+        return [(docs[i], d) for i, d in hits if i in docs][:k]
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embeddings.embed_query(query), k)
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def as_retriever(self, k: int = 4, **kwargs) -> 'VectorIndexRetriever':
+        return VectorIndexRetriever(vector_index=self, k=k, **kwargs)
+
+
+class VectorIndexRetriever(BaseRetriever):
+    """LangChain retriever over a VectorIndex (drop-in for VectorStore.as_retriever())."""
+
+    vector_index: Any
+    k: int = 4
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.vector_index.similarity_search(query, k=self.k)
+
+
+def _ensure_docstore_schema(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chunks (
+            faiss_id INTEGER PRIMARY KEY,
+            article_id INTEGER,
+            content TEXT NOT NULL,
+            metadata TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    columns = [info[1] for info in conn.execute("PRAGMA table_info(chunks)").fetchall()]
+    if 'deleted' not in columns:
+        conn.execute("ALTER TABLE chunks ADD COLUMN deleted INTEGER NOT NULL DEFAULT 0")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_article_id ON chunks(article_id)")
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chunks_fts'"
+    ).fetchone()
+    if not has_fts:
+        conn.execute("CREATE VIRTUAL TABLE chunks_fts USING fts5(terms, tokenize = 'unicode61')")
+        # Backfill docstores copied from snapshots written before the FTS table existed.
+        conn.executemany(
+            "INSERT INTO chunks_fts (rowid, terms) VALUES (?, ?)",
+            [(faiss_id, ' '.join(lexical_terms(content)))
+             for faiss_id, content in conn.execute("SELECT faiss_id, content FROM chunks").fetchall()],
+        )
+
+
+def _insert_chunks(conn, documents: List[Document], start_id: int) -> None:
+    conn.executemany(
+        "INSERT OR REPLACE INTO chunks (faiss_id, article_id, content, metadata, deleted) VALUES (?, ?, ?, ?, 0)",
+        [
+            (start_id + i, doc.metadata.get('article_id'), doc.page_content,
+             json.dumps(doc.metadata, ensure_ascii=False, default=str))
+            for i, doc in enumerate(documents)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO chunks_fts (rowid, terms) VALUES (?, ?)",
+        [(start_id + i, ' '.join(lexical_terms(doc.page_content))) for i, doc in enumerate(documents)],
+    )
+
+
+def write_docstore(path: str, documents: List[Document], start_id: int = 0) -> None:
+    """Writes chunks to a SQLite docstore; the i-th document gets FAISS position start_id + i."""
+    conn = sqlite3.connect(path)
+    _ensure_docstore_schema(conn)
+    _insert_chunks(conn, documents, start_id)
+    conn.commit()
+    conn.close()
+
+
+def _copy_docstore(source_path: str, target_path: str) -> None:
+    """Copies a docstore through SQLite's backup API so a concurrent reader never sees a torn file."""
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    target = sqlite3.connect(target_path)
+    source.backup(target)
+    _ensure_docstore_schema(target)
+    target.commit()
+    source.close()
+    target.close()
+
+
+def _pickle_to_documents(pickle_path: str) -> List[Document]:
+    """Reads the documents out of a docstore pickled by FAISS.save_local, in FAISS position order."""
+    with open(pickle_path, 'rb') as f:
+        docstore, index_to_docstore_id = pickle.load(f)  # written by this app's own save_local
+    return [docstore.search(index_to_docstore_id[i]) for i in range(len(index_to_docstore_id))]
+
+
+class SnapshotStore:
+    """Versioned, immutable index snapshots under one root directory.
+
+    Layout:
+        <root>/snapshots/<version>/{index.faiss, docstore.sqlite, metadata.npz, manifest.json}
+        <root>/CURRENT            name of the published version
+        <root>/.staging-*         snapshots being written
+
+    A snapshot is fully written into a staging directory, renamed into snapshots/ and only
+    then published by atomically replacing CURRENT. A crash at any point leaves the
+    previously published snapshot untouched.
+    """
+
+    def __init__(self, root_dir: str, keep: int = INDEX_SNAPSHOTS_TO_KEEP, articles_db: Optional[str] = DB_PATH):
+        self.root_dir = root_dir
+        self.snapshots_dir = os.path.join(root_dir, SNAPSHOTS_DIR)
+        self.keep = keep
+        # App database used to backfill filter metadata of snapshots written before the sidecar existed
+        self.articles_db = articles_db
+
+    # --- Reading ---
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root_dir, CURRENT_FILE), encoding='utf-8') as f:
+                version = f.read().strip()
+        except FileNotFoundError:
+            return self._migrate_legacy_layout()
+        return version or None
+
+    def versions(self) -> List[str]:
+        """Complete snapshot versions, newest first."""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(
+            (v for v in os.listdir(self.snapshots_dir)
+             if os.path.exists(os.path.join(self.snapshots_dir, v, MANIFEST_FILE))),
+            reverse=True,
+        )
+
+    def path(self, version: str) -> str:
+        return os.path.join(self.snapshots_dir, version)
+
+    def manifest(self, version: Optional[str] = None) -> Optional[dict]:
+        version = version or self.current_version()
+        if not version:
+            return None
+        try:
+            with open(os.path.join(self.path(version), MANIFEST_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def load(self, embeddings, version: Optional[str] = None, mmap: bool = True) -> VectorIndex:
+        """Opens a snapshot (the published one by default) without deserializing the docstore."""
+        version = version or self.current_version()
+        if not version:
+            raise FileNotFoundError(f"No published index snapshot under {self.root_dir}")
+        snapshot_dir = self.path(version)
+        index = faiss.read_index(os.path.join(snapshot_dir, INDEX_FILE), MMAP_READ_FLAGS if mmap else 0)
+        docstore = SQLiteDocstore(os.path.join(snapshot_dir, DOCSTORE_FILE))
+        return VectorIndex(index, docstore, embeddings, version, self._load_metadata(version, docstore, index.ntotal))
+
+    def _load_metadata(self, version: str, docstore: SQLiteDocstore, ntotal: int) -> ChunkMetadata:
+        metadata_path = os.path.join(self.path(version), METADATA_FILE)
+        if os.path.exists(metadata_path):
+            return ChunkMetadata.load(metadata_path)
+        return ChunkMetadata.from_docstore(docstore._conn, ntotal, self.articles_db)
+
+    def load_latest_good(self, embeddings, mmap: bool = True) -> VectorIndex:
+        """Loads the published snapshot, falling back to older ones if it is unreadable."""
+        current = self.current_version()
+        candidates = ([current] if current else []) + [v for v in self.versions() if v != current]
+        last_error = None
+        for version in candidates:
+            try:
+                return self.load(embeddings, version, mmap)
+            except Exception as e:
+                logging.error(f"Failed to load index snapshot {version}: {e}")
+                last_error = e
+        raise FileNotFoundError(f"No loadable index snapshot under {self.root_dir}") from last_error
+
+    # --- Writing ---
+    @contextmanager
+    def writer(self):
+        """Exclusive writer section across threads and processes (index worker, admin rebuild, CLI).
+
+        Hold it from reading the articles (and the queue watermark) until the snapshot is
+        published, so a writer never publishes data older than a snapshot another writer
+        published in between. Re-entrant within a thread.
+        """
+        with _snapshot_write_lock:
+            depth = _writer_depth.get(self.root_dir, 0)
+            lock_file = None
+            if depth == 0 and fcntl is not None:
+                os.makedirs(self.root_dir, exist_ok=True)
+                lock_file = open(os.path.join(self.root_dir, WRITER_LOCK_FILE), 'a')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            _writer_depth[self.root_dir] = depth + 1
+            try:
+                yield
+            finally:
+                _writer_depth[self.root_dir] = depth
+                if lock_file is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    lock_file.close()
+
+    def write_full(self, index, documents: List[Document], manifest: dict) -> str:
+        """Writes and publishes a snapshot containing exactly `index` and `documents`."""
+        with _snapshot_write_lock:
+            staging_dir = self._new_staging_dir()
+            faiss.write_index(index, os.path.join(staging_dir, INDEX_FILE))
+            write_docstore(os.path.join(staging_dir, DOCSTORE_FILE), documents)
+            ChunkMetadata.from_documents(documents).save(os.path.join(staging_dir, METADATA_FILE))
+            return self._commit(staging_dir, {
+                **manifest, 'kind': 'full', 'parent': None,
+                'ntotal': index.ntotal, 'dim': index.d, 'chunks': len(documents), 'deleted_chunks': 0,
+            })
+
+    def write_incremental(self, vectors, documents: List[Document], replaced_article_ids: Iterable[int],
+                          manifest: Optional[dict] = None) -> str:
+        """Copies the published snapshot, appends chunks, tombstones replaced articles and publishes it."""
+        with _snapshot_write_lock:
+            parent = self.current_version()
+            if not parent:
+                raise FileNotFoundError(f"No published index snapshot under {self.root_dir}")
+            parent_dir = self.path(parent)
+            parent_manifest = self.manifest(parent) or {}
+            staging_dir = self._new_staging_dir()
+
+            index = faiss.read_index(os.path.join(parent_dir, INDEX_FILE))
+            start_id = index.ntotal
+            if documents:
+                index.add(np.ascontiguousarray(vectors, dtype='float32'))
+            faiss.write_index(index, os.path.join(staging_dir, INDEX_FILE))
+
+            docstore_path = os.path.join(staging_dir, DOCSTORE_FILE)
+            _copy_docstore(os.path.join(parent_dir, DOCSTORE_FILE), docstore_path)
+            conn = sqlite3.connect(docstore_path)
+            replaced_article_ids = [int(a) for a in replaced_article_ids]
+            if replaced_article_ids:
+                placeholders = ','.join('?' * len(replaced_article_ids))
+                conn.execute(
+                    f"UPDATE chunks SET deleted = 1 WHERE faiss_id < ? AND article_id IN ({placeholders})",
+                    [start_id, *replaced_article_ids],
+                )
+            _insert_chunks(conn, documents, start_id)
+            conn.commit()
+            chunks, deleted = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(deleted), 0) FROM chunks"
+            ).fetchone()
+            conn.close()
+
+            parent_docstore = SQLiteDocstore(os.path.join(parent_dir, DOCSTORE_FILE))
+            try:
+                parent_metadata = self._load_metadata(parent, parent_docstore, start_id)
+            finally:
+                parent_docstore.close()
+            parent_metadata.append(documents, replaced_article_ids).save(os.path.join(staging_dir, METADATA_FILE))
+
+            return self._commit(staging_dir, {
+                **parent_manifest, **(manifest or {}), 'kind': 'incremental', 'parent': parent,
+                'ntotal': index.ntotal, 'dim': index.d, 'chunks': chunks, 'deleted_chunks': deleted,
+            })
+
+    def _new_staging_dir(self) -> str:
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=self.root_dir)
+
+    def _commit(self, staging_dir: str, manifest: dict) -> str:
+        version = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        manifest = {**manifest, 'version': version, 'created_at': datetime.now().isoformat(timespec='seconds')}
+        with open(os.path.join(staging_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.rename(staging_dir, self.path(version))
+        self.publish(version)
+        self.collect_garbage()
+        logging.info(f"Published index snapshot {version} ({manifest['kind']}, {manifest['ntotal']} vectors).")
+        return version
+
+    def publish(self, version: str) -> None:
+        """Atomically points CURRENT at `version`."""
+        pointer_tmp = os.path.join(self.root_dir, CURRENT_FILE + '.tmp')
+        with open(pointer_tmp, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, os.path.join(self.root_dir, CURRENT_FILE))
+
+    def collect_garbage(self) -> None:
+        """Removes snapshots beyond the newest `keep` (never the published one) and abandoned staging dirs."""
+        current = self.current_version()
+        for version in self.versions()[self.keep:]:
+            if version != current:
+                shutil.rmtree(self.path(version), ignore_errors=True)
+        cutoff = time.time() - STAGING_MAX_AGE_SECONDS
+        for name in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, name)
+            if name.startswith(STAGING_PREFIX) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _migrate_legacy_layout(self) -> Optional[str]:
+        """Turns an index saved directly in the root (index.faiss + docstore.sqlite / index.pkl) into a snapshot."""
+        legacy_index = os.path.join(self.root_dir, INDEX_FILE)
+        legacy_docstore = os.path.join(self.root_dir, DOCSTORE_FILE)
+        legacy_pickle = os.path.join(self.root_dir, LEGACY_PICKLE_FILE)
+        if not os.path.exists(legacy_index) or not (os.path.exists(legacy_docstore) or os.path.exists(legacy_pickle)):
+            return None
+        with _snapshot_write_lock:
+            if os.path.exists(os.path.join(self.root_dir, CURRENT_FILE)):
+                return self.current_version()
+            logging.info(f"Migrating index files in {self.root_dir} to a versioned snapshot...")
+            staging_dir = self._new_staging_dir()
+            shutil.copy2(legacy_index, os.path.join(staging_dir, INDEX_FILE))
+            if os.path.exists(legacy_docstore):
+                _copy_docstore(legacy_docstore, os.path.join(staging_dir, DOCSTORE_FILE))
+            else:
+                write_docstore(os.path.join(staging_dir, DOCSTORE_FILE), _pickle_to_documents(legacy_pickle))
+            index = faiss.read_index(legacy_index, MMAP_READ_FLAGS)
+            legacy_config = os.path.join(self.root_dir, 'index_config.json')
+            manifest = {}
+            if os.path.exists(legacy_config):
+                with open(legacy_config, encoding='utf-8') as f:
+                    manifest = json.load(f)
+            version = self._commit(staging_dir, {
+                **manifest, 'kind': 'migrated', 'parent': None, 'ntotal': index.ntotal, 'dim': index.d,
+            })
+            for path in (legacy_index, legacy_docstore, legacy_pickle, legacy_config):
+                if os.path.exists(path):
+                    os.remove(path)
+            return version
@@ -0,0 +1,105 @@
+"""Background worker that folds queued article changes into the FAISS index.
+
+`save_articles` and `save_generated_article` only append article ids to the
+`index_queue` table. This thread polls the queue and, once no new item has arrived
+for INDEX_REFRESH_DEBOUNCE_SECONDS (or the oldest item has waited
+INDEX_REFRESH_MAX_DELAY_SECONDS), embeds the batch and appends it to the index.
+Embedding therefore never runs in a Streamlit request. The worker also builds
+the first index snapshot when none exists, so the chatbot never builds one inline.
+"""
+import logging
+import threading
+import time
+
+from backend.config import (
+    FAISS_INDEX_DIR,
+    INDEX_REFRESH_DEBOUNCE_SECONDS,
+    INDEX_REFRESH_MAX_DELAY_SECONDS,
+    INDEX_REFRESH_POLL_SECONDS,
+)
+from backend.database import init_db, get_index_queue_stats, fetch_index_queue, delete_index_queue_items
+from backend.index_store import SnapshotStore
+from backend.rag_processor import RAGProcessor, reset_shared_vector_store
+
+INDEX_REFRESH_BATCH_SIZE = 200
+INITIAL_BUILD_RETRY_SECONDS = 600
+
+
+class IndexRefreshWorker(threading.Thread):
+    def __init__(self, debounce_seconds=INDEX_REFRESH_DEBOUNCE_SECONDS,
+                 max_delay_seconds=INDEX_REFRESH_MAX_DELAY_SECONDS,
+                 poll_seconds=INDEX_REFRESH_POLL_SECONDS,
+                 batch_size=INDEX_REFRESH_BATCH_SIZE):
+        super().__init__(name="index-refresh-worker", daemon=True)
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._next_build_attempt = 0.0
+
+    def run(self):
+        logging.info("[Index Worker] started.")
+        while not self._stop_event.wait(self.poll_seconds):
+            try:
+                self.build_if_missing()
+                self.refresh_if_due()
+            except Exception as e:
+                logging.error(f"[Index Worker] refresh failed: {e}", exc_info=True)
+
+    def build_if_missing(self):
+        """Builds the first snapshot in the background when none has been published yet."""
+        if time.monotonic() < self._next_build_attempt or SnapshotStore(FAISS_INDEX_DIR).current_version():
+            return False
+        with self._refresh_lock:
+            self._next_build_attempt = time.monotonic() + INITIAL_BUILD_RETRY_SECONDS
+            logging.info("[Index Worker] no index snapshot found; building the initial index...")
+            RAGProcessor().build_and_save_vector_store()
+        reset_shared_vector_store()
+        return True
+
+    def stop(self):
+        self._stop_event.set()
+
+    def refresh_if_due(self, force=False):
+        """Indexes one batch if the debounce window has passed. Returns the number of articles indexed."""
+        with self._refresh_lock:
+            conn = init_db()
+            try:
+                stats = get_index_queue_stats(conn)
+                if not stats['pending']:
+                    return 0
+                quiet = stats['newest_age_seconds'] >= self.debounce_seconds
+                overdue = stats['oldest_age_seconds'] >= self.max_delay_seconds
+                if not (force or quiet or overdue):
+                    return 0
+
+                # Same writer section as full rebuilds (admin, CLI): the queue items are read, indexed
+                # and removed without a rebuild publishing older data in between.
+                with SnapshotStore(FAISS_INDEX_DIR).writer():
+                    items = fetch_index_queue(conn, self.batch_size)
+                    article_ids = sorted({article_id for _, article_id in items})
+                    if not article_ids:  # a full rebuild covered them while this worker waited
+                        return 0
+                    logging.info(f"[Index Worker] indexing {len(article_ids)} queued articles...")
+                    RAGProcessor().update_articles(article_ids)
+                    delete_index_queue_items(conn, queue_ids=[queue_id for queue_id, _ in items])
+            finally:
+                conn.close()
+        reset_shared_vector_store()
+        return len(article_ids)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_index_worker():
+    """Starts the process-wide index worker once; later calls return the running instance."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = IndexRefreshWorker()
+            _worker.start()
+        return _worker
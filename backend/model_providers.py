@@ -0,0 +1,485 @@
+"""Pluggable model providers for chat, embeddings, image generation and speech.
+
+Every OpenAI call in the app goes through get_chat_model(), get_embeddings() and
+get_image_provider(), and narration goes through get_speech_provider().
+MODEL_PROVIDER selects what they return:
+
+- openai: the live OpenAI models (needs OPENAI_API_KEY) and gTTS for speech;
+- fake:   deterministic local stand-ins, no network or key. Chat answers are built from
+          the prompt text, tool-bound models call the first tool once and then answer from
+          its result, embeddings are character n-gram hashes, images are gradients and
+          speech is a tone per sentence, with silent pauses, at a typical reading pace.
+          FAKE_MODEL_LATENCY_MS adds a fixed delay per call to approximate API latency;
+- record: live calls, with every response also stored in a cassette under
+          MODEL_CASSETTE_DIR (responses that are already recorded are served from disk);
+- replay: responses are served only from the cassettes; a request that was never
+          recorded raises CassetteMiss.
+
+Models, embeddings and image clients are created once per provider and settings and
+shared process-wide; the OpenAI ones share one pooled HTTP client.
+
+Cassette keys are hashes of the request (model, parameters, messages or text/prompt),
+so a replay is exact as long as the pipeline sends the same requests it recorded.
+"""
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Optional
+
+import numpy as np
+from PIL import Image
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage, messages_from_dict, messages_to_dict
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from backend.config import (
+    MODEL_PROVIDER,
+    MODEL_CASSETTE_DIR,
+    FAKE_MODEL_LATENCY_MS,
+    OPENAI_HTTP_MAX_CONNECTIONS,
+    OPENAI_HTTP_TIMEOUT_SECONDS,
+)
+from backend.chunking import split_sentences
+
+MODEL_PROVIDERS = ('openai', 'fake', 'record', 'replay')
+DEFAULT_CHAT_MODEL = "gpt-3.5-turbo"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-ada-002"
+DEFAULT_IMAGE_MODEL = "dall-e-3"
+# Same width as the OpenAI embeddings, so fake vectors fit indexes built with the live model.
+FAKE_EMBEDDING_DIM = 1536
+
+_active_provider = MODEL_PROVIDER
+
+
+def set_model_provider(name: str) -> None:
+    """Switches the provider for models created from now on (benchmarks, scripts)."""
+    global _active_provider
+    if name not in MODEL_PROVIDERS:
+        raise ValueError(f"Unknown model provider '{name}'. Choose one of {MODEL_PROVIDERS}.")
+    _active_provider = name
+    logging.info(f"[Model Provider] using '{name}' models.")
+
+
+def get_model_provider() -> str:
+    return _active_provider
+
+
+def _openai_api_key():
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set.")
+    return api_key
+
+
+@lru_cache(maxsize=None)
+def _http_client():
+    """One keep-alive connection pool shared by every synchronous OpenAI client in the process.
+
+    Async calls use the AsyncClient of each (cached) model instance: an httpx.AsyncClient's
+    connections belong to the event loop that opened them, so it is not shared globally.
+    """
+    import httpx
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=OPENAI_HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=OPENAI_HTTP_MAX_CONNECTIONS),
+        timeout=httpx.Timeout(OPENAI_HTTP_TIMEOUT_SECONDS, connect=10.0),
+    )
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+# --- Cassettes ---
+
+class CassetteMiss(KeyError):
+    """A replayed request has no recording."""
+
+
+class CassetteStore:
+    """Recorded responses on disk, one file per request hash: <root>/<kind>/<hh>/<hash><ext>."""
+
+    def __init__(self, root=None):
+        self.root = root or MODEL_CASSETTE_DIR
+
+    @staticmethod
+    def key(payload) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+    def _path(self, kind, key, ext):
+        return os.path.join(self.root, kind, key[:2], f"{key}{ext}")
+
+    def exists(self, kind, key, ext):
+        return os.path.exists(self._path(kind, key, ext))
+
+    def read(self, kind, key, ext) -> bytes:
+        path = self._path(kind, key, ext)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise CassetteMiss(f"No recorded {kind} response for request {key[:12]} (expected {path}).")
+
+    def write(self, kind, key, ext, data: bytes) -> None:
+        path = self._path(kind, key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def read_json(self, kind, key):
+        return json.loads(self.read(kind, key, '.json').decode('utf-8'))
+
+    def write_json(self, kind, key, value) -> None:
+        self.write(kind, key, '.json', json.dumps(value, ensure_ascii=False, indent=1).encode('utf-8'))
+
+    def read_array(self, kind, key):
+        return np.load(io.BytesIO(self.read(kind, key, '.npy')))
+
+    def write_array(self, kind, key, array) -> None:
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(array, dtype='float32'))
+        self.write(kind, key, '.npy', buffer.getvalue())
+
+
+def _canonical_messages(messages):
+    """The parts of a conversation that determine the response (no run ids or metadata)."""
+    canonical = []
+    for message in messages:
+        item = {'type': message.type, 'content': message.content}
+        if getattr(message, 'tool_calls', None):
+            item['tool_calls'] = [{'name': call['name'], 'args': call['args']} for call in message.tool_calls]
+        canonical.append(item)
+    return canonical
+
+
+# --- Chat ---
+
+class _ToolBindingMixin:
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+
+class FakeChatModel(_ToolBindingMixin, BaseChatModel):
+    """Deterministic offline chat model; the same prompt always gives the same answer."""
+
+    model_name: str = DEFAULT_CHAT_MODEL
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages, tools=None) -> AIMessage:
+        last = messages[-1]
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = _digest(prompt)
+        if tools and not isinstance(last, ToolMessage):
+            # First turn of an agent loop: call the first tool with the question as its string argument.
+            function = tools[0]['function']
+            params = function.get('parameters', {})
+            arg_name = next(iter(params.get('required') or params.get('properties') or ['query']))
+            return AIMessage(content='', tool_calls=[{
+                'name': function['name'], 'args': {arg_name: str(last.content)}, 'id': f"call_{digest.hex()[:16]}",
+            }])
+
+        # The answer reuses sentences of the last message (the tool result, or the user prompt).
+        source = str(last.content)
+        sentences = [s for s in split_sentences(source) if len(s) > 10] or [source.strip()[:200] or "답변을 준비했습니다."]
+        count = 3 + digest[0] % 6
+        start = digest[1] % len(sentences)
+        text = " ".join((sentences * 2)[start:start + min(count, len(sentences))])
+        if self.max_tokens:
+            # Roughly three UTF-8 bytes per token for Korean text.
+            text = text.encode('utf-8')[:self.max_tokens * 3].decode('utf-8', errors='ignore')
+        return AIMessage(content=text)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, kwargs.get('tools')))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        message = self._respond(messages, kwargs.get('tools'))
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content='', tool_call_chunks=[
+                {'name': call['name'], 'args': json.dumps(call['args'], ensure_ascii=False), 'id': call['id'], 'index': i}
+                for i, call in enumerate(message.tool_calls)
+            ]))
+            return
+        for word in message.content.split(' '):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + ' '))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+
+class CassetteChatModel(_ToolBindingMixin, BaseChatModel):
+    """Records the responses of `inner` (record) or serves them from the cassette (replay)."""
+
+    inner: Optional[BaseChatModel] = None
+    params: dict = {}
+    mode: str = 'replay'
+    store: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cassette-{self.mode}"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = CassetteStore.key({**self.params, 'messages': _canonical_messages(messages), 'stop': stop, **kwargs})
+        if self.mode == 'replay' or self.store.exists('chat', key, '.json'):
+            message = messages_from_dict(self.store.read_json('chat', key)['response'])[0]
+        else:
+            result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            message = result.generations[0].message
+            self.store.write_json('chat', key, {'request': {**self.params, 'messages': _canonical_messages(messages)},
+                                                'response': messages_to_dict([message])})
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def get_chat_model(model: str = DEFAULT_CHAT_MODEL, temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None) -> BaseChatModel:
+    """Returns the shared chat model for the active provider and these settings."""
+    return _chat_model(get_model_provider(), model, temperature, max_tokens)
+
+
+@lru_cache(maxsize=None)
+def _chat_model(provider, model, temperature, max_tokens):
+    if provider == 'fake':
+        return FakeChatModel(model_name=model, temperature=temperature, max_tokens=max_tokens,
+                             latency_ms=FAKE_MODEL_LATENCY_MS)
+
+    params = {'model': model, 'temperature': temperature, 'max_tokens': max_tokens}
+    inner = None
+    if provider != 'replay':
+        from langchain_openai import ChatOpenAI
+        options = {name: value for name, value in params.items() if value is not None}
+        inner = ChatOpenAI(api_key=_openai_api_key(), http_client=_http_client(), **options)
+    if provider == 'openai':
+        return inner
+    return CassetteChatModel(inner=inner, params=params, mode=provider, store=CassetteStore())
+
+
+# --- Embeddings ---
+
+class HashingEmbeddings(Embeddings):
+    """Character n-gram hashing embeddings, a key-free stand-in for OpenAIEmbeddings."""
+
+    def __init__(self, dim=1024, ngram_range=(2, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype='float32')
+        text = ''.join(text.split())
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            for i in range(len(text) - n + 1):
+                digest = hashlib.md5(text[i:i + n].encode('utf-8')).digest()
+                vector[int.from_bytes(digest[:4], 'little') % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class CassetteEmbeddings(Embeddings):
+    """Per-text recorded embeddings, so batches can be split differently on replay."""
+
+    def __init__(self, inner, store, mode, model):
+        self.inner = inner
+        self.store = store
+        self.mode = mode
+        self.model = model
+
+    def embed_documents(self, texts):
+        keys = [CassetteStore.key({'model': self.model, 'text': text}) for text in texts]
+        missing = [i for i, key in enumerate(keys) if not self.store.exists('embedding', key, '.npy')]
+        if missing and self.mode == 'replay':
+            raise CassetteMiss(f"{len(missing)} of {len(texts)} texts have no recorded embedding.")
+        if missing:
+            for i, vector in zip(missing, self.inner.embed_documents([texts[i] for i in missing])):
+                self.store.write_array('embedding', keys[i], vector)
+        return [self.store.read_array('embedding', key).tolist() for key in keys]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def get_embeddings(model: str = DEFAULT_EMBEDDING_MODEL) -> Embeddings:
+    """Returns the shared embedding model for the active provider."""
+    return _embeddings(get_model_provider(), model)
+
+
+@lru_cache(maxsize=None)
+def _embeddings(provider, model):
+    if provider == 'fake':
+        return HashingEmbeddings(dim=FAKE_EMBEDDING_DIM)
+    inner = None
+    if provider != 'replay':
+        from langchain_openai import OpenAIEmbeddings
+        inner = OpenAIEmbeddings(model=model, api_key=_openai_api_key(), http_client=_http_client())
+    if provider == 'openai':
+        return inner
+    return CassetteEmbeddings(inner, CassetteStore(), provider, model)
+
+
+# --- Images ---
+
+class OpenAIImageProvider:
+    def __init__(self):
+        from openai import OpenAI
+        self.client = OpenAI(api_key=_openai_api_key(), http_client=_http_client())
+
+    def generate(self, prompt, size="1792x1024", model=DEFAULT_IMAGE_MODEL, quality="standard") -> bytes:
+        """Generates one image and returns the downloaded file bytes."""
+        import requests
+        resp = self.client.images.generate(model=model, prompt=prompt, size=size, quality=quality, n=1)
+        r = requests.get(resp.data[0].url, timeout=60)
+        r.raise_for_status()
+        return r.content
+
+
+class FakeImageProvider:
+    """Deterministic two-color gradient per prompt, returned as PNG bytes."""
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+
+    def generate(self, prompt, size="1792x1024", model=DEFAULT_IMAGE_MODEL, quality="standard") -> bytes:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        width, height = (int(v) for v in size.split('x'))
+        digest = _digest(f"{model}|{prompt}")
+        top, bottom = np.array(list(digest[:3]), dtype='float32'), np.array(list(digest[3:6]), dtype='float32')
+        ramp = np.linspace(0.0, 1.0, height, dtype='float32')[:, None]
+        column = (top * (1 - ramp) + bottom * ramp).astype('uint8')
+        pixels = np.broadcast_to(column[:, None, :], (height, width, 3))
+        buffer = io.BytesIO()
+        Image.fromarray(np.ascontiguousarray(pixels)).save(buffer, format='PNG')
+        return buffer.getvalue()
+
+
+class CassetteImageProvider:
+    def __init__(self, inner, store, mode):
+        self.inner = inner
+        self.store = store
+        self.mode = mode
+
+    def generate(self, prompt, size="1792x1024", model=DEFAULT_IMAGE_MODEL, quality="standard") -> bytes:
+        key = CassetteStore.key({'model': model, 'prompt': prompt, 'size': size, 'quality': quality})
+        if self.mode == 'replay' or self.store.exists('image', key, '.png'):
+            return self.store.read('image', key, '.png')
+        data = self.inner.generate(prompt, size=size, model=model, quality=quality)
+        self.store.write('image', key, '.png', data)
+        return data
+
+
+def get_image_provider():
+    """Returns the shared image generator for the active provider (`generate(prompt, size) -> bytes`)."""
+    return _image_provider(get_model_provider())
+
+
+@lru_cache(maxsize=None)
+def _image_provider(provider):
+    if provider == 'fake':
+        return FakeImageProvider(latency_ms=FAKE_MODEL_LATENCY_MS)
+    inner = OpenAIImageProvider() if provider != 'replay' else None
+    if provider == 'openai':
+        return inner
+    return CassetteImageProvider(inner, CassetteStore(), provider)
+
+
+# --- Speech ---
+
+class GTTSSpeechProvider:
+    name = 'gtts'
+    ext = '.mp3'
+
+    def synthesize(self, text, lang='ko') -> bytes:
+        """Synthesizes `text` in one call and returns the MP3 bytes (gTTS splits long text internally)."""
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class FakeSpeechProvider:
+    """A soft tone per sentence at a typical Korean reading pace, with silence between sentences, as WAV."""
+    name = 'fake'
+    ext = '.wav'
+    SAMPLE_RATE = 24000
+    SECONDS_PER_CHAR = 0.12
+    PAUSE_SECONDS = 0.35
+
+    def __init__(self, latency_ms=0.0):
+        self.latency_ms = latency_ms
+
+    def synthesize(self, text, lang='ko') -> bytes:
+        import wave
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        pieces = []
+        for sentence in split_sentences(text) or [text]:
+            n_chars = len(''.join(sentence.split())) or 1
+            t = np.arange(int(n_chars * self.SECONDS_PER_CHAR * self.SAMPLE_RATE), dtype='float32') / self.SAMPLE_RATE
+            pitch = 180 + _digest(sentence)[0]
+            pieces.append(0.2 * np.sin(2 * np.pi * pitch * t))
+            pieces.append(np.zeros(int(self.PAUSE_SECONDS * self.SAMPLE_RATE), dtype='float32'))
+        samples = (np.concatenate(pieces) * 32767).astype('<i2')
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.SAMPLE_RATE)
+            w.writeframes(samples.tobytes())
+        return buffer.getvalue()
+
+
+class CassetteSpeechProvider:
+    name = 'gtts'
+    ext = '.mp3'
+
+    def __init__(self, inner, store, mode):
+        self.inner = inner
+        self.store = store
+        self.mode = mode
+
+    def synthesize(self, text, lang='ko') -> bytes:
+        key = CassetteStore.key({'provider': self.name, 'text': text, 'lang': lang})
+        if self.mode == 'replay' or self.store.exists('speech', key, self.ext):
+            return self.store.read('speech', key, self.ext)
+        data = self.inner.synthesize(text, lang=lang)
+        self.store.write('speech', key, self.ext, data)
+        return data
+
+
+def get_speech_provider():
+    """Returns the shared text-to-speech backend (`synthesize(text, lang) -> bytes`, with `name` and `ext`)."""
+    return _speech_provider(get_model_provider())
+
+
+@lru_cache(maxsize=None)
+def _speech_provider(provider):
+    if provider == 'fake':
+        return FakeSpeechProvider(latency_ms=FAKE_MODEL_LATENCY_MS)
+    inner = GTTSSpeechProvider() if provider != 'replay' else None
+    if provider == 'openai':
+        return inner
+    return CassetteSpeechProvider(inner, CassetteStore(), provider)
@@ -0,0 +1,77 @@
+"""Scene narration: one TTS request per scene, decoded to PCM in memory, with sentence timings.
+
+A scene's sentences are synthesized together (get_speech_provider) instead of one
+request and one file per sentence. The audio is decoded by a single ffmpeg process
+straight into a float32 array, so the video is assembled from arrays rather than one
+ffmpeg reader per clip. Caption timings come from align_sentences(): each sentence
+gets a share of the audio proportional to its length, and every boundary is moved to
+the quietest point near it, which is the pause the TTS puts between sentences.
+"""
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+# Narration is decoded at the rate the video's audio track is written with.
+SAMPLE_RATE = 44100
+# Boundaries are searched within this distance of the length-proportional estimate.
+ALIGN_WINDOW_SECONDS = 0.6
+ALIGN_FRAME_SECONDS = 0.02
+# Shortest quiet stretch taken as a pause between sentences, and the energy (relative to the
+# loudest frame) below which a frame counts as quiet.
+MIN_PAUSE_SECONDS = 0.1
+SILENCE_RATIO = 0.1
+
+
+def decode_audio(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Decodes encoded audio (MP3, WAV, ...) to a mono float32 array in [-1, 1]."""
+    proc = subprocess.run(
+        [get_setting("FFMPEG_BINARY"), '-v', 'error', '-i', 'pipe:0',
+         '-f', 's16le', '-acodec', 'pcm_s16le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1'],
+        input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Audio decoding failed: {proc.stderr.decode('utf-8', 'ignore').strip()}")
+    return np.frombuffer(proc.stdout, dtype='<i2').astype('float32') / 32768.0
+
+
+def scene_text(sentences) -> str:
+    """Joins split sentences back into one text; the periods make the TTS pause between them."""
+    return " ".join(f"{sentence.rstrip('.')}." for sentence in sentences)
+
+
+def align_sentences(pcm: np.ndarray, sample_rate: int, sentences):
+    """Returns contiguous (start, end) seconds for each sentence, covering the whole audio."""
+    duration = len(pcm) / sample_rate
+    if len(sentences) <= 1 or duration == 0:
+        return [(0.0, duration)] * len(sentences)
+
+    frame = max(1, int(ALIGN_FRAME_SECONDS * sample_rate))
+    n_frames = len(pcm) // frame
+    energy = np.sqrt(np.mean(pcm[:n_frames * frame].reshape(n_frames, frame) ** 2, axis=1))
+    window = int(ALIGN_WINDOW_SECONDS / ALIGN_FRAME_SECONDS)
+    min_pause = int(MIN_PAUSE_SECONDS / ALIGN_FRAME_SECONDS)
+
+    # Length-proportional estimates over the voiced part, without leading/trailing silence.
+    voiced = np.flatnonzero(energy > SILENCE_RATIO * energy.max()) if n_frames else []
+    first, last = (int(voiced[0]), int(voiced[-1]) + 1) if len(voiced) else (0, n_frames)
+    weights = np.array([max(len(''.join(sentence.split())), 1) for sentence in sentences], dtype='float64')
+    estimates = first + np.cumsum(weights)[:-1] / weights.sum() * (last - first)
+
+    boundaries, previous = [], 0
+    for estimate in estimates:
+        lo = max(previous + 1, int(estimate) - window)
+        hi = min(last, int(estimate) + window)
+        cut = min(max(int(estimate), previous + 1), n_frames - 1)
+        if lo < hi:
+            # The pause between two sentences: the quiet run nearest to the estimate.
+            segment = energy[lo:hi]
+            quiet = np.flatnonzero(segment <= segment.min() + SILENCE_RATIO * (segment.max() - segment.min()))
+            runs = np.split(quiet, np.flatnonzero(np.diff(quiet) > 1) + 1)
+            pauses = [run for run in runs if len(run) >= min_pause] or [max(runs, key=len)]
+            run = min(pauses, key=lambda r: abs(lo + r.mean() - estimate))
+            cut = lo + int(run[len(run) // 2])
+        boundaries.append(cut * frame / sample_rate)
+        previous = cut
+    edges = [0.0] + boundaries + [duration]
+    return list(zip(edges[:-1], edges[1:]))
@@ -0,0 +1,120 @@
+"""Latency and throughput of the generation pipeline with local (fake or replayed) models.
+
+With the default `--provider fake` nothing leaves the machine, so the numbers are pure
+pipeline overhead (chunking, FAISS, LangGraph, prompt building, video composition):
+
+    python -m backend.pipeline_benchmark --limit 100 --questions 30 --concurrency 4
+    FAKE_MODEL_LATENCY_MS=800 python -m backend.pipeline_benchmark --concurrency 8
+    python -m backend.pipeline_benchmark --provider replay   # responses recorded with MODEL_PROVIDER=record
+
+Stages: embed + index a throwaway snapshot of the newest articles, the chatbot agent
+sequentially and through AgentRunner with bounded concurrency, article rewriting and
+short-script generation. `--video` also renders one video (with the fake provider its
+narration is synthesized locally too).
+"""
+import argparse
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from backend.config import DB_PATH
+from backend.chunk_eval import load_articles, sample_queries
+from backend.model_providers import MODEL_PROVIDERS, set_model_provider
+
+
+def _row(stage, latencies, wall_seconds):
+    latencies = np.array(latencies, dtype='float64') * 1000
+    return {
+        'stage': stage,
+        'calls': len(latencies),
+        'wall_s': round(wall_seconds, 3),
+        'latency_ms_avg': round(float(latencies.mean()), 2) if len(latencies) else 0.0,
+        'latency_ms_p95': round(float(np.percentile(latencies, 95)), 2) if len(latencies) else 0.0,
+        'throughput_per_s': round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+def _timed(func, items):
+    latencies, start = [], time.perf_counter()
+    for item in items:
+        call_start = time.perf_counter()
+        func(item)
+        latencies.append(time.perf_counter() - call_start)
+    return latencies, time.perf_counter() - start
+
+
+def _run_concurrent(generator, questions, concurrency):
+    """Runs the agent through AgentRunner, one thread per question like concurrent chat sessions."""
+    from backend.agent_runner import AgentRunner
+    runner = AgentRunner(max_concurrency=concurrency)
+
+    def one(user_and_question):
+        user_id, question = user_and_question
+        start = time.perf_counter()
+        for _ in runner.stream(user_id, lambda: generator.astream_agent(question)):
+            pass
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(questions) or 1) as pool:
+        latencies = list(pool.map(one, enumerate(questions)))
+    return latencies, time.perf_counter() - start
+
+
+def run_pipeline_benchmark(db_path=DB_PATH, limit=100, n_questions=20, n_articles=5, concurrency=4, video=False):
+    """Runs every stage once; returns one row of latency/throughput per stage."""
+    from backend.rag_processor import RAGProcessor
+    from backend.article_generator import ArticleGenerator
+
+    articles = load_articles(db_path, limit)
+    if articles.empty:
+        raise ValueError(f"No articles in {db_path} to benchmark with.")
+    # Body sentences as questions, topped up with titles for articles made of short sentences.
+    questions = (sample_queries(articles)['query'].tolist() + articles['title'].tolist())[:n_questions]
+    rows = []
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        start = time.perf_counter()
+        RAGProcessor(db_path=db_path, index_path=index_dir).build_and_save_vector_store()
+        rows.append(_row('embed_and_index', [time.perf_counter() - start], time.perf_counter() - start))
+
+        generator = ArticleGenerator(index_path=index_dir, use_answer_cache=False)
+        rows.append(_row('agent', *_timed(generator.run_agent, questions)))
+        if concurrency > 1:
+            rows.append(_row(f'agent_x{concurrency}', *_run_concurrent(generator, questions, concurrency)))
+
+        sample = articles.head(n_articles)
+        rows.append(_row('article', *_timed(lambda row: generator.generate_new_article(row.title, row.content),
+                                            list(sample.itertuples()))))
+        scripts = []
+        rows.append(_row('script', *_timed(lambda row: scripts.append(generator.generate_short_script(row.content)),
+                                           list(sample.itertuples()))))
+
+        if video:
+            from backend.video import VideoProducer
+            producer, first = VideoProducer(), sample.iloc[0]
+            rows.append(_row('video', *_timed(
+                lambda _: producer.create_video_file(f"bench_{first['article_id']}", first['title'], scripts[0]), [None])))
+
+    for row in rows:
+        logging.info(f"[Pipeline Benchmark] {row}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the chatbot and content pipeline without live model calls.")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--provider', choices=MODEL_PROVIDERS, default='fake')
+    parser.add_argument('--limit', type=int, default=100, help="Number of most recent articles to index")
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--articles', type=int, default=5, help="Articles to rewrite / script")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--video', action='store_true', help="Also render one video")
+    args = parser.parse_args()
+
+    set_model_provider(args.provider)
+    result = run_pipeline_benchmark(args.db, args.limit, args.questions, args.articles, args.concurrency, args.video)
+    print(result.to_string(index=False))
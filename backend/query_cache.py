@@ -0,0 +1,82 @@
+"""In-process LRU + TTL caches in front of the chatbot retriever.
+
+- CachedEmbeddings: normalized query -> query embedding, so a repeated question does not
+  call the OpenAI embeddings API again.
+- SharedVectorIndex keeps a QueryCache of (index version, query, search options) -> top-k
+  FAISS ids; a hit only reads the chunks from the local docstore. Keys carry the
+  snapshot version, so results from a replaced snapshot can never be served.
+"""
+import re
+import threading
+import unicodedata
+
+import numpy as np
+from cachetools import TTLCache
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION = re.compile(r'[\s?!.~…]+$')
+
+
+def normalize_query(query: str) -> str:
+    """Folds trivial variations ('고혈압에 좋은 음식?', ' 고혈압에  좋은 음식 ') onto one cache key."""
+    query = unicodedata.normalize('NFKC', query or '').lower()
+    query = _WHITESPACE.sub(' ', query).strip()
+    return _TRAILING_PUNCTUATION.sub('', query)
+
+
+class QueryCache:
+    """Thread-safe TTLCache (least-recently-used eviction when full) that counts hits and misses."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._cache.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._cache[key] = value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'maxsize': int(self._cache.maxsize),
+                'ttl_seconds': self._cache.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+class CachedEmbeddings:
+    """Wraps an Embeddings object and caches embed_query results by normalized query."""
+
+    def __init__(self, embeddings, cache: QueryCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_query(self, text: str):
+        key = normalize_query(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(text), dtype='float32')
+            self.cache.set(key, vector)
+        return vector
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
@@ -1,41 +1,290 @@
 import os
+import json
+import math
 import sqlite3
 import pandas as pd
+import numpy as np
 import logging
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from langchain.text_splitter import CharacterTextSplitter
+import threading
+import time
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, List, Optional
+import faiss
+from backend.model_providers import get_embeddings, get_model_provider
 from langchain.docstore.document import Document
-from backend.config import DB_PATH, FAISS_INDEX_DIR
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from backend.config import (
+    DB_PATH,
+    FAISS_INDEX_DIR,
+    DEFAULT_FAISS_INDEX_PRESET,
+    DEFAULT_RAG_CHUNKER,
+    DEFAULT_RAG_RETRIEVAL_MODE,
+    DEFAULT_RAG_RERANKER,
+    RERANKER_MODEL,
+    INDEX_SWAP_CHECK_SECONDS,
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TTL_SECONDS,
+)
+from backend.chunking import CHUNKERS, CharacterChunker, get_chunker
+from backend.index_store import SnapshotStore, ChunkMetadata
+from backend.query_cache import QueryCache, CachedEmbeddings, normalize_query
+from backend.database import (
+    set_app_setting,
+    delete_index_queue_items,
+    get_index_queue_watermark,
+    delete_answer_cache_entries,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# --- FAISS index presets ---
+# 'factory' is a faiss.index_factory string; {nlist} and {pq_m} are filled in from the corpus size
+# and embedding dimension at build time. 'search_params' are the query-time defaults applied
+# through faiss.ParameterSpace and can be overridden from the admin portal.
+INDEX_PRESETS = {
+    'flat': {
+        'label': 'Flat (정확 검색)',
+        'factory': 'Flat',
+        'search_params': {},
+        'min_vectors': 0,
+    },
+    'hnsw': {
+        'label': 'HNSW32 (그래프 근사 검색)',
+        'factory': 'HNSW32,Flat',
+        'search_params': {'efSearch': 64},
+        'min_vectors': 0,
+    },
+    'ivf_flat': {
+        'label': 'IVF-Flat (클러스터 근사 검색)',
+        'factory': 'IVF{nlist},Flat',
+        'search_params': {'nprobe': 8},
+        'min_vectors': 1000,
+    },
+    'ivf_pq': {
+        'label': 'IVF-PQ (압축 근사 검색)',
+        'factory': 'IVF{nlist},PQ{pq_m}x8',
+        'search_params': {'nprobe': 16},
+        'min_vectors': 10000,
+    },
+}
+
+# Setting keys stored in the app_settings table
+INDEX_PRESET_SETTING = 'faiss_index_preset'
+SEARCH_PARAMS_SETTING = 'faiss_search_params'
+CHUNKER_SETTING = 'rag_chunker'
+RETRIEVAL_MODE_SETTING = 'rag_retrieval_mode'
+RERANKER_SETTING = 'rag_reranker'
+INDEX_REFRESHED_AT_SETTING = 'faiss_index_refreshed_at'
+TRAIN_SAMPLE_SIZE = 20000
+
+# --- Hybrid retrieval ---
+RETRIEVAL_MODES = {
+    'hybrid': '하이브리드 (BM25 + 벡터, RRF)',
+    'vector': '벡터 검색만',
+    'lexical': '키워드(BM25) 검색만',
+}
+RERANKERS = {
+    'none': '사용 안 함',
+    'cross_encoder': '로컬 Cross-Encoder 재정렬',
+}
+RRF_K = 60             # rank constant of reciprocal rank fusion (Cormack et al.)
+HYBRID_FETCH_K = 20    # candidates taken from each retriever before fusion / reranking
+LEXICAL_FILTER_OVERFETCH = 5
+
+
+def resolve_index_factory(preset_name, n_vectors, dim):
+    """Returns the faiss.index_factory string for a preset, sized for the given corpus.
+
+    Presets that need more training data than the corpus provides fall back to 'Flat'.
+    """
+    preset = INDEX_PRESETS[preset_name]
+    if n_vectors < preset['min_vectors']:
+        logging.warning(
+            f"Preset '{preset_name}' needs at least {preset['min_vectors']} vectors "
+            f"(got {n_vectors}). Falling back to Flat."
+        )
+        return 'Flat'
+    # Rule of thumb: ~4*sqrt(n) lists, with at least 39 training points per centroid.
+    nlist = max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+    # PQ sub-quantizers must divide the dimension; aim for 32 dims per code byte.
+    pq_m = next((m for m in (dim // 32, 64, 48, 32, 16, 8) if m and dim % m == 0), 8)
+    return preset['factory'].format(nlist=nlist, pq_m=pq_m)
+
+
+def build_faiss_index(vectors, factory, train_sample_size=TRAIN_SAMPLE_SIZE, seed=42):
+    """Builds a faiss index from an (n, dim) float32 matrix, training it on a random sample."""
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+    index = faiss.index_factory(vectors.shape[1], factory)
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        if len(vectors) > train_sample_size:
+            sample = vectors[rng.choice(len(vectors), train_sample_size, replace=False)]
+        else:
+            sample = vectors
+        logging.info(f"Training '{factory}' index on {len(sample)} vectors...")
+        index.train(sample)
+    index.add(vectors)
+    return index
+
+
+def apply_search_params(index, search_params):
+    """Applies query-time parameters (nprobe, efSearch) that the index type supports."""
+    space = faiss.ParameterSpace()
+    for name, value in (search_params or {}).items():
+        try:
+            space.set_index_parameter(index, name, value)
+        except RuntimeError:
+            logging.debug(f"Search parameter '{name}' does not apply to this index type; skipped.")
+
+
+def reciprocal_rank_fusion(rankings, rrf_k=RRF_K):
+    """Fuses ranked id lists by summing 1 / (rrf_k + rank); returns [(id, score)], best first."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CrossEncoderReranker:
+    """Re-scores (query, chunk) pairs with a small local cross-encoder (sentence-transformers)."""
+
+    def __init__(self, model_name=RERANKER_MODEL):
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(model_name, max_length=512)
+
+    def rerank(self, query, documents, k=4):
+        """Returns the positions in `documents` of the k best-scoring chunks, best first."""
+        if not documents:
+            return []
+        scores = self.model.predict([(query, doc.page_content) for doc in documents])
+        return [int(i) for i in np.argsort(-np.asarray(scores, dtype='float32'))[:k]]
+
+
+@lru_cache(maxsize=None)
+def get_reranker(name):
+    """Returns the process-wide reranker for `name`, or None if disabled or unavailable."""
+    if name != 'cross_encoder':
+        return None
+    try:
+        return CrossEncoderReranker()
+    except ImportError:
+        logging.warning("sentence-transformers is not installed; reranking is disabled.")
+    except Exception as e:
+        logging.error(f"Failed to load reranker model '{RERANKER_MODEL}': {e}")
+    return None
+
+
+def hybrid_search_ids(vector_index, query, k=4, mode='hybrid', reranker=None, fetch_k=HYBRID_FETCH_K, filters=None):
+    """Searches a VectorIndex with FAISS, the BM25 docstore index or both fused by RRF.
+
+    Returns the FAISS ids of the top k live chunks, best first.
+
+    `filters` takes ChunkMetadata.filter_bitmap arguments (age_relevant_only, recent_days,
+    keywords); the bitmap is applied inside the FAISS search and to the lexical hits.
+    With a reranker, the top `fetch_k` fused candidates are re-scored and the best `k` returned.
+    """
+    id_bitmap = None
+    if filters and vector_index.metadata is not None:
+        if vector_index.metadata.filterable:
+            id_bitmap = vector_index.metadata.filter_bitmap(**filters)
+        else:
+            logging.warning(f"Snapshot {vector_index.version} lacks filter metadata for some chunks; "
+                            f"searching without filters {filters}.")
+
+    rankings = []
+    if mode in ('hybrid', 'vector'):
+        vector_hits = vector_index.vector_search_ids(vector_index.embeddings.embed_query(query), fetch_k, id_bitmap)
+        rankings.append([faiss_id for faiss_id, _ in vector_hits])
+    if mode in ('hybrid', 'lexical'):
+        if id_bitmap is None:
+            lexical_ids = [faiss_id for faiss_id, _ in vector_index.docstore.lexical_search(query, fetch_k)]
+        else:
+            # FTS5 cannot see the bitmap, so over-fetch and keep the matching ids.
+            lexical_ids = [faiss_id for faiss_id, _ in vector_index.docstore.lexical_search(query, fetch_k * LEXICAL_FILTER_OVERFETCH)]
+            lexical_ids = [i for i, keep in zip(lexical_ids, ChunkMetadata.contains(id_bitmap, lexical_ids)) if keep][:fetch_k]
+        rankings.append(lexical_ids)
+
+    candidate_ids = [faiss_id for faiss_id, _ in reciprocal_rank_fusion(rankings)]
+    # Tombstoned vector hits drop out here; keep enough candidates to still return k.
+    docs = vector_index.docstore.search_many(candidate_ids)
+    live_ids = [faiss_id for faiss_id in candidate_ids if faiss_id in docs][:fetch_k]
+    if reranker is not None:
+        return [live_ids[i] for i in reranker.rerank(query, [docs[faiss_id] for faiss_id in live_ids], k)]
+    return live_ids[:k]
+
+
+def hybrid_search(vector_index, query, k=4, **kwargs):
+    """hybrid_search_ids() resolved to Documents; see there for the options."""
+    ids = hybrid_search_ids(vector_index, query, k, **kwargs)
+    docs = vector_index.docstore.search_many(ids)
+    return [docs[faiss_id] for faiss_id in ids if faiss_id in docs]
+
+
 class RAGProcessor:
-    def __init__(self, db_path=None, index_path=None):
+    def __init__(self, db_path=None, index_path=None, index_preset=None, chunker=None):
         logging.info("Initializing RAGProcessor...")
         self.db_path = db_path or DB_PATH
         self.index_path = index_path or FAISS_INDEX_DIR
+        self.snapshots = SnapshotStore(self.index_path)
+        self.index_preset = index_preset or self._read_setting(INDEX_PRESET_SETTING, DEFAULT_FAISS_INDEX_PRESET)
+        if self.index_preset not in INDEX_PRESETS:
+            logging.warning(f"Unknown FAISS index preset '{self.index_preset}'. Using 'flat'.")
+            self.index_preset = 'flat'
+        self.chunker_name = chunker or self._read_setting(CHUNKER_SETTING, DEFAULT_RAG_CHUNKER)
+        if self.chunker_name not in CHUNKERS:
+            logging.warning(f"Unknown chunker '{self.chunker_name}'. Using '{DEFAULT_RAG_CHUNKER}'.")
+            self.chunker_name = DEFAULT_RAG_CHUNKER
+        self.read_retrieval_settings()
         
         logging.info(f"Database path: {self.db_path}")
         logging.info(f"FAISS index path: {self.index_path}")
+        logging.info(f"FAISS index preset: {self.index_preset}")
+        logging.info(f"Chunker: {self.chunker_name}")
 
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            logging.error("OPENAI_API_KEY environment variable not found!")
-            raise ValueError("OPENAI_API_KEY not found")
-        else:
-            logging.info("OPENAI_API_KEY found.")
-
-        self.embeddings = OpenAIEmbeddings(api_key=api_key)
+        logging.info(f"Model provider: {get_model_provider()}")
+        self.embeddings = get_embeddings()
         logging.info("RAGProcessor initialized successfully.")
 
-    def _load_articles_from_db(self):
-        """Loads all articles from the SQLite database."""
+    def _read_setting(self, key, default=None):
+        """Reads an admin setting directly from the app_settings table."""
+        if not os.path.exists(self.db_path):
+            return default
+        try:
+            conn = sqlite3.connect(self.db_path)
+            row = conn.execute("SELECT value FROM app_settings WHERE key = ?", (key,)).fetchone()
+            conn.close()
+            return row[0] if row else default
+        except sqlite3.OperationalError:
+            return default
+
+    def read_retrieval_settings(self):
+        """(Re)reads the retrieval mode and reranker chosen in the admin portal."""
+        self.retrieval_mode = self._read_setting(RETRIEVAL_MODE_SETTING, DEFAULT_RAG_RETRIEVAL_MODE)
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            self.retrieval_mode = 'hybrid'
+        self.reranker_name = self._read_setting(RERANKER_SETTING, DEFAULT_RAG_RERANKER)
+
+    def get_search_params(self):
+        """Returns the preset's query-time parameters merged with admin overrides."""
+        params = dict(INDEX_PRESETS[self.index_preset]['search_params'])
+        overrides = self._read_setting(SEARCH_PARAMS_SETTING)
+        if overrides:
+            try:
+                params.update({k: v for k, v in json.loads(overrides).items() if k in params})
+            except (ValueError, AttributeError):
+                logging.warning(f"Ignoring malformed search params setting: {overrides}")
+        return params
+
+    def _load_articles_from_db(self, article_ids=None):
+        """Loads all articles (or only `article_ids`) from the SQLite database."""
         logging.info("Loading articles from the database...")
         if not os.path.exists(self.db_path):
             logging.error(f"Database file not found at {self.db_path}")
-            return []
+            return pd.DataFrame()
         
         try:
             conn = sqlite3.connect(self.db_path)
@@ -43,70 +292,300 @@ class RAGProcessor:
             SELECT 
                 a.id as article_id,
                 COALESCE(ga.generated_title, a.title) as title,
-                COALESCE(ga.generated_content, a.content) as content
+                COALESCE(ga.generated_content, a.content) as content,
+                a.crawled_date,
+                a.is_age_relevant,
+                a.keywords
             FROM articles a
             LEFT JOIN generated_articles ga ON a.id = ga.article_id
             """
-            df = pd.read_sql_query(query, conn)
+            params = None
+            if article_ids is not None:
+                query += f" WHERE a.id IN ({','.join('?' * len(article_ids))})"
+                params = [int(article_id) for article_id in article_ids]
+            df = pd.read_sql_query(query, conn, params=params)
             conn.close()
             logging.info(f"Loaded {len(df)} articles from the database.")
             return df
         except Exception as e:
             logging.error(f"Failed to load articles from database: {e}")
-            return []
-
-    def build_and_save_vector_store(self):
-        """Builds the FAISS vector store from articles and saves it locally."""
-        logging.info("Starting to build and save vector store.")
-        articles_df = self._load_articles_from_db()
-        if articles_df.empty:
-            logging.warning("No articles found to build the vector store. Aborting.")
-            return
+            return pd.DataFrame()
 
+    def _articles_to_chunks(self, articles_df, chunker_name=None):
+        """Converts article rows to LangChain documents and splits them with the configured chunker."""
         documents = [
             Document(
                 page_content=row['content'],
-                metadata={'title': row['title'], 'article_id': row['article_id']}
-            ) for index, row in articles_df.iterrows()
+                metadata={
+                    'title': row['title'],
+                    'article_id': int(row['article_id']),
+                    'crawled_date': str(row['crawled_date']) if row['crawled_date'] else None,
+                    'is_age_relevant': bool(row['is_age_relevant']),
+                    'keywords': [kw.strip() for kw in (row['keywords'] or '').split(',') if kw.strip()],
+                }
+            ) for index, row in articles_df.iterrows() if row['content']
         ]
         logging.info(f"Converted {len(documents)} articles to LangChain documents.")
 
-        text_splitter = CharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        doc_chunks = text_splitter.split_documents(documents)
-        logging.info(f"Split documents into {len(doc_chunks)} chunks.")
+        chunker_name = chunker_name or self.chunker_name
+        doc_chunks = get_chunker(chunker_name).split_documents(documents)
+        logging.info(f"Split documents into {len(doc_chunks)} chunks ({chunker_name}).")
+        return doc_chunks
 
-        logging.info("Building FAISS vector store from document chunks... This may take a while.")
+    def _record_refresh(self, queue_watermark=None, article_ids=None):
+        """Clears queue items covered by this (re)index, stamps the freshness time and drops
+        cached chatbot answers citing the re-indexed articles (all of them after a full build)."""
+        conn = sqlite3.connect(self.db_path)
         try:
-            vector_store = FAISS.from_documents(doc_chunks, self.embeddings)
-            logging.info("FAISS vector store built successfully.")
-        except Exception as e:
-            logging.error(f"Failed to build FAISS vector store: {e}")
-            raise
+            if queue_watermark:
+                delete_index_queue_items(conn, up_to_id=queue_watermark)
+            try:
+                if article_ids is None:
+                    delete_answer_cache_entries(conn, all_entries=True)
+                elif article_ids:
+                    delete_answer_cache_entries(conn, article_ids=article_ids)
+            except sqlite3.OperationalError as e:
+                logging.warning(f"Could not invalidate cached answers: {e}")
+            set_app_setting(conn, INDEX_REFRESHED_AT_SETTING, datetime.now().isoformat(timespec='seconds'))
+        finally:
+            conn.close()
 
-        logging.info(f"Saving vector store to {self.index_path}...")
+    def build_and_save_vector_store(self):
+        """Builds the FAISS vector store from articles and saves it locally."""
+        logging.info("Starting to build and save vector store.")
+        # Load -> embed -> publish runs as one writer section: an incremental update published
+        # meanwhile (and removed from the queue) would otherwise be overwritten by older data.
+        with self.snapshots.writer():
+            # Everything queued before this point is covered by the full rebuild.
+            queue_watermark = self._read_queue_watermark()
+            articles_df = self._load_articles_from_db()
+            if articles_df.empty:
+                logging.warning("No articles found to build the vector store. Aborting.")
+                return
+
+            doc_chunks = self._articles_to_chunks(articles_df)
+
+            logging.info("Building FAISS vector store from document chunks... This may take a while.")
+            try:
+                index = self._build_index(doc_chunks)
+                logging.info("FAISS vector store built successfully.")
+            except Exception as e:
+                logging.error(f"Failed to build FAISS vector store: {e}")
+                raise
+
+            logging.info(f"Saving vector store snapshot under {self.index_path}...")
+            try:
+                version = self.snapshots.write_full(index, doc_chunks, {
+                    'preset': self.index_preset, 'factory': self.index_factory, 'chunker': self.chunker_name,
+                })
+                logging.info(f"Vector store snapshot {version} saved successfully to {self.index_path}")
+            except Exception as e:
+                logging.error(f"Failed to save vector store: {e}")
+                raise
+            self._record_refresh(queue_watermark)
+
+    def _read_queue_watermark(self):
         try:
-            vector_store.save_local(self.index_path)
-            logging.info(f"Vector store saved successfully to {self.index_path}")
-        except Exception as e:
-            logging.error(f"Failed to save vector store: {e}")
-            raise
+            conn = sqlite3.connect(self.db_path)
+            try:
+                return get_index_queue_watermark(conn)
+            finally:
+                conn.close()
+        except sqlite3.OperationalError:
+            return None
+
+    def update_articles(self, article_ids):
+        """Re-embeds the given articles into the saved index without a full rebuild.
+
+        Older chunks of these articles are tombstoned and their current text is appended, split
+        with the chunker the snapshot was built with so one index never mixes chunk shapes.
+        Falls back to a full build when no index exists yet.
+        """
+        with self.snapshots.writer():
+            if not self.snapshots.current_version():
+                logging.info("No saved index yet; building the full vector store instead of an incremental update.")
+                self.build_and_save_vector_store()
+                return
+            # Snapshots from before chunkers were recorded were built with the character splitter.
+            chunker_name = (self.snapshots.manifest() or {}).get('chunker', CharacterChunker.name)
+            articles_df = self._load_articles_from_db(article_ids)
+            doc_chunks = self._articles_to_chunks(articles_df, chunker_name) if not articles_df.empty else []
+            vectors = None
+            if doc_chunks:
+                vectors = np.array(self.embeddings.embed_documents([doc.page_content for doc in doc_chunks]), dtype='float32')
+            version = self.snapshots.write_incremental(vectors, doc_chunks, article_ids)
+            logging.info(f"Incrementally indexed {len(article_ids)} articles ({len(doc_chunks)} chunks) into snapshot {version}.")
+            self._record_refresh(article_ids=article_ids)
+
+    def _build_index(self, doc_chunks):
+        """Embeds the chunks and builds a FAISS index from the configured preset."""
+        texts = [doc.page_content for doc in doc_chunks]
+        vectors = np.array(self.embeddings.embed_documents(texts), dtype='float32')
+        self.index_factory = resolve_index_factory(self.index_preset, len(vectors), vectors.shape[1])
+        logging.info(f"Using FAISS index factory '{self.index_factory}' for {len(vectors)} vectors.")
+        return build_faiss_index(vectors, self.index_factory)
+
+    def load_snapshot(self, version=None):
+        """Loads a published snapshot (memory-mapped) and applies the configured search parameters.
+
+        Without `version`, loads the current snapshot and falls back to older ones if it is unreadable.
+        """
+        if version:
+            vector_store = self.snapshots.load(self.embeddings, version)
+        else:
+            vector_store = self.snapshots.load_latest_good(self.embeddings)
+        apply_search_params(vector_store.index, self.get_search_params())
+        return vector_store
 
     def load_vector_store(self):
-        """Loads the FAISS vector store from a local path."""
+        """Loads the current index snapshot, building one first if none has ever been published."""
         logging.info(f"Attempting to load vector store from {self.index_path}.")
-        if not os.path.exists(self.index_path):
+        if not self.snapshots.current_version():
             logging.warning(f"Vector store index not found at {self.index_path}. Building a new one.")
             self.build_and_save_vector_store()
-        
-        logging.info(f"Loading vector store from {self.index_path}...")
-        try:
-            return FAISS.load_local(self.index_path, self.embeddings, allow_dangerous_deserialization=True)
-        except Exception as e:
-            logging.error(f"Failed to load vector store from {self.index_path}: {e}")
-            # If loading fails, maybe the index is corrupt. Try rebuilding.
-            logging.warning("Failed to load index, attempting to rebuild.")
-            self.build_and_save_vector_store()
-            return FAISS.load_local(self.index_path, self.embeddings, allow_dangerous_deserialization=True)
+        return self.load_snapshot()
+
+    def get_index_info(self):
+        """Returns the manifest of the published snapshot (version, preset, factory, vector count)."""
+        return self.snapshots.manifest()
+
+
+# --- Process-wide shared vector store ---
+class SharedVectorIndex:
+    """Process-wide handle that always searches the newest published index snapshot.
+
+    Every ArticleGenerator in the process shares one memory-mapped snapshot. The CURRENT
+    pointer is re-read at most every INDEX_SWAP_CHECK_SECONDS; when it moves, the new
+    snapshot is opened and swapped in, and in-flight searches finish on the old one.
+    Loading never builds an index, so a missing index yields empty results instead of
+    blocking the chat while the index worker builds it.
+
+    Query embeddings and top-k result ids are cached (LRU + TTL). Result keys include the
+    snapshot version, so a swap invalidates them; embeddings stay valid across snapshots.
+    """
+
+    def __init__(self, index_path=None, check_interval=INDEX_SWAP_CHECK_SECONDS,
+                 cache_size=QUERY_CACHE_MAX_ENTRIES, cache_ttl=QUERY_CACHE_TTL_SECONDS):
+        self.index_path = index_path or FAISS_INDEX_DIR
+        self.check_interval = check_interval
+        self._processor = None
+        self._vector_index = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.embedding_cache = QueryCache(cache_size, cache_ttl)
+        self.result_cache = QueryCache(cache_size, cache_ttl)
+
+    def current(self):
+        """Returns the VectorIndex for the published snapshot (None if none exists yet)."""
+        if time.monotonic() < self._next_check:
+            return self._vector_index
+        with self._lock:
+            if time.monotonic() < self._next_check:
+                return self._vector_index
+            self._next_check = time.monotonic() + self.check_interval
+            if self._processor is None:
+                self._processor = RAGProcessor(index_path=self.index_path)
+                self._processor.embeddings = CachedEmbeddings(self._processor.embeddings, self.embedding_cache)
+            else:
+                self._processor.read_retrieval_settings()
+            version = self._processor.snapshots.current_version()
+            if version and (self._vector_index is None or self._vector_index.version != version):
+                try:
+                    loaded = self._processor.load_snapshot(version)
+                    logging.info(f"Swapped in index snapshot {version}.")
+                    self._vector_index = loaded
+                    self.result_cache.clear()
+                except Exception as e:
+                    logging.error(f"Failed to hot-swap index snapshot {version}; keeping the previous one: {e}")
+                    if self._vector_index is None:
+                        self._vector_index = self._processor.load_snapshot()
+            return self._vector_index
+
+    def refresh(self):
+        """Forces the next search to re-check the CURRENT pointer."""
+        self._next_check = 0.0
+
+    @property
+    def version(self):
+        vector_index = self.current()
+        return vector_index.version if vector_index else None
+
+    def search(self, query, k=4, filters=None):
+        """Retrieves k chunks with the configured retrieval mode and reranker, optionally filtered."""
+        vector_index = self.current()
+        if vector_index is None:
+            return []
+        mode, reranker_name = self._processor.retrieval_mode, self._processor.reranker_name
+        filters_key = json.dumps(filters, sort_keys=True, ensure_ascii=False) if filters else None
+        # recent_days is relative to today, so such results must not outlive the day.
+        day_key = date.today().isoformat() if filters and filters.get('recent_days') else None
+        key = (vector_index.version, normalize_query(query), k, mode, reranker_name, filters_key, day_key)
+
+        ids = self.result_cache.get(key)
+        if ids is None:
+            ids = hybrid_search_ids(vector_index, query, k, mode=mode,
+                                    reranker=get_reranker(reranker_name), filters=filters)
+            self.result_cache.set(key, ids)
+        docs = vector_index.docstore.search_many(ids)
+        return [docs[faiss_id] for faiss_id in ids if faiss_id in docs]
+
+    def embed_query(self, text):
+        """Embeds text with the shared, cached query-embedding client."""
+        self.current()
+        return self._processor.embeddings.embed_query(text)
+
+    def cache_stats(self):
+        """Hit/miss counters of the query-embedding and result caches."""
+        return {'embedding': self.embedding_cache.stats(), 'result': self.result_cache.stats()}
+
+    def clear_caches(self):
+        self.embedding_cache.clear()
+        self.result_cache.clear()
+
+    def keywords(self):
+        """Keywords that can be used as a filter in the published snapshot."""
+        vector_index = self.current()
+        return vector_index.metadata.keywords() if vector_index is not None and vector_index.metadata else []
+
+    def similarity_search_with_score(self, query, k=4):
+        vector_index = self.current()
+        return vector_index.similarity_search_with_score(query, k) if vector_index else []
+
+    def similarity_search(self, query, k=4):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def as_retriever(self, k=4, **kwargs):
+        return HybridRetriever(vector_index=self, k=k, **kwargs)
+
+
+class HybridRetriever(BaseRetriever):
+    """LangChain retriever over a SharedVectorIndex using the configured hybrid search."""
+
+    vector_index: Any
+    k: int = 4
+    filters: Optional[dict] = None
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.vector_index.search(query, k=self.k, filters=self.filters)
+
+
+_shared_vector_stores = {}
+_shared_vector_store_lock = threading.Lock()
+
+
+def get_shared_vector_store(index_path=None):
+    """Returns the process-wide SharedVectorIndex for index_path."""
+    key = index_path or FAISS_INDEX_DIR
+    with _shared_vector_store_lock:
+        if key not in _shared_vector_stores:
+            _shared_vector_stores[key] = SharedVectorIndex(key)
+        return _shared_vector_stores[key]
+
+
+def reset_shared_vector_store(index_path=None):
+    """Makes the shared store pick up a newly published snapshot on its next search."""
+    get_shared_vector_store(index_path).refresh()
+
 
 if __name__ == '__main__':
     logging.info("Running rag_processor.py script directly to build the index.")
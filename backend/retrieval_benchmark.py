@@ -0,0 +1,95 @@
+"""Latency and recall@k of the chatbot retrieval modes (vector / lexical / hybrid).
+
+With OpenAI embeddings the published index snapshot is searched as-is:
+
+    python -m backend.retrieval_benchmark --queries data/labeled_queries.csv --k 4
+
+`--embeddings hashing` instead builds a throwaway snapshot from the article database
+with key-free hashing embeddings, which is enough to compare the lexical path and
+fusion overhead. The labeled set is a CSV with `query` and `article_id` columns (an
+article counts as found when any of its chunks is in the top k); without one, a body
+sentence is sampled per article as in backend/chunk_eval.py.
+"""
+import argparse
+import logging
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import faiss
+
+from backend.config import DB_PATH, DEFAULT_RAG_CHUNKER
+from backend.chunking import get_chunker
+from backend.chunk_eval import HashingEmbeddings, load_articles, sample_queries
+from backend.index_store import SnapshotStore
+from backend.rag_processor import RAGProcessor, RETRIEVAL_MODES, get_reranker, hybrid_search
+from langchain.docstore.document import Document
+
+
+def build_hashing_snapshot(articles_df, root_dir, chunker_name=DEFAULT_RAG_CHUNKER):
+    """Chunks and embeds articles with HashingEmbeddings into a snapshot under root_dir."""
+    embeddings = HashingEmbeddings()
+    documents = [
+        Document(page_content=row['content'], metadata={'title': row['title'], 'article_id': row['article_id']})
+        for _, row in articles_df.iterrows() if row['content']
+    ]
+    chunks = get_chunker(chunker_name).split_documents(documents)
+    vectors = np.array(embeddings.embed_documents([chunk.page_content for chunk in chunks]), dtype='float32')
+    index = faiss.IndexFlatL2(vectors.shape[1])
+    index.add(vectors)
+    store = SnapshotStore(root_dir)
+    store.write_full(index, chunks, {'preset': 'flat', 'factory': 'Flat', 'chunker': chunker_name})
+    return store.load(embeddings)
+
+
+def run_retrieval_benchmark(vector_index, queries_df, k=4, modes=None, reranker_name=None):
+    """Runs every query through each mode; returns one row of recall/MRR/latency per mode."""
+    runs = [(mode, None) for mode in modes or RETRIEVAL_MODES]
+    if reranker_name and get_reranker(reranker_name) is not None:
+        runs.append(('hybrid', reranker_name))
+
+    rows = []
+    for mode, reranker in runs:
+        latencies, hits, reciprocal_ranks = [], 0, []
+        for query, expected in zip(queries_df['query'], queries_df['article_id']):
+            start = time.perf_counter()
+            docs = hybrid_search(vector_index, query, k, mode=mode,
+                                 reranker=get_reranker(reranker) if reranker else None)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = list(dict.fromkeys(doc.metadata.get('article_id') for doc in docs))
+            if expected in found:
+                hits += 1
+                reciprocal_ranks.append(1.0 / (found.index(expected) + 1))
+            else:
+                reciprocal_ranks.append(0.0)
+        rows.append({
+            'mode': mode if not reranker else f"{mode}+{reranker}",
+            f'recall@{k}': round(hits / max(1, len(queries_df)), 4),
+            'mrr': round(float(np.mean(reciprocal_ranks)), 4),
+            'latency_ms_avg': round(float(np.mean(latencies)), 2),
+            'latency_ms_p95': round(float(np.percentile(latencies, 95)), 2),
+        })
+        logging.info(f"[Retrieval Benchmark] {rows[-1]}")
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark vector, lexical and hybrid retrieval.")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--queries', default=None, help="CSV with 'query' and 'article_id' columns")
+    parser.add_argument('--limit', type=int, default=300, help="Articles to sample queries from (and index, with hashing)")
+    parser.add_argument('--k', type=int, default=4)
+    parser.add_argument('--embeddings', choices=['openai', 'hashing'], default='openai')
+    parser.add_argument('--reranker', choices=['cross_encoder'], default=None)
+    args = parser.parse_args()
+
+    articles = load_articles(args.db, args.limit)
+    queries = pd.read_csv(args.queries) if args.queries else sample_queries(articles)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.embeddings == 'hashing':
+            index = build_hashing_snapshot(articles, tmp_dir)
+        else:
+            index = RAGProcessor(db_path=args.db).load_snapshot()
+        result = run_retrieval_benchmark(index, queries, args.k, reranker_name=args.reranker)
+        index.docstore.close()
+    print(result.to_string(index=False))
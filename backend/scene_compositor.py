@@ -0,0 +1,71 @@
+"""Frame compositor for the generated videos.
+
+A video is a sequence of scenes, each a Ken Burns background with timed captions and
+a fade-in, and the whole video fades out at the end. SceneSequenceClip produces those
+frames directly: it finds the scene for t, takes the background frame, alpha-blends
+the active caption into its box only (the caption's alpha and premultiplied color are
+computed once), and applies fades as a scalar multiplier. This replaces a
+CompositeVideoClip per scene inside concatenate_videoclips(method="compose"), which
+re-blits every layer onto a full canvas for every frame.
+"""
+import bisect
+
+import numpy as np
+from moviepy.video.VideoClip import VideoClip
+
+
+class Caption:
+    def __init__(self, rgba, position, start, end):
+        """rgba/position as returned by CaptionRenderer.render; shown from `start` to `end` (scene time)."""
+        alpha = rgba[:, :, 3:4].astype('float32') / 255.0
+        self.x, self.y = position
+        self.h, self.w = rgba.shape[:2]
+        self.start, self.end = start, end
+        self.inverse_alpha = 1.0 - alpha
+        # +0.5 so the final truncation to uint8 rounds.
+        self.premultiplied = rgba[:, :, :3].astype('float32') * alpha + 0.5
+
+    def blend(self, frame):
+        """Blends the caption into `frame` (uint8, writable) in place."""
+        region = frame[self.y:self.y + self.h, self.x:self.x + self.w]
+        region[...] = region * self.inverse_alpha + self.premultiplied
+
+
+class Scene:
+    def __init__(self, background, captions, duration, fade_in=0.0):
+        """background: a clip with get_frame(t) (e.g. KenBurnsClip) of the video size."""
+        self.background = background
+        self.captions = captions
+        self.duration = duration
+        self.fade_in = fade_in
+
+    def frame(self, t):
+        frame = np.array(self.background.get_frame(t), dtype=np.uint8)
+        for caption in self.captions:
+            if caption.start <= t < caption.end:
+                caption.blend(frame)
+        return frame
+
+
+class SceneSequenceClip(VideoClip):
+    def __init__(self, scenes, size, fade_out=0.0):
+        self.scenes = scenes
+        self.fade_out = fade_out
+        self.starts = list(np.cumsum([0.0] + [scene.duration for scene in scenes[:-1]]))
+        super().__init__(make_frame=self.make_frame, duration=sum(scene.duration for scene in scenes))
+        self.size = tuple(size)
+
+    def make_frame(self, t):
+        index = max(0, bisect.bisect_right(self.starts, t) - 1)
+        scene, local_t = self.scenes[index], t - self.starts[index]
+        frame = scene.frame(local_t)
+
+        # Fades from / to black.
+        level = 1.0
+        if scene.fade_in and local_t < scene.fade_in:
+            level = local_t / scene.fade_in
+        if self.fade_out and self.duration is not None and t > self.duration - self.fade_out:
+            level = min(level, max(0.0, (self.duration - t) / self.fade_out))
+        if level < 1.0:
+            frame = (frame * np.float32(level)).astype(np.uint8)
+        return frame
@@ -1,17 +1,17 @@
 import streamlit as st
-import requests
 import os
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
+from PIL import Image
 import sys
 from datetime import datetime
-import moviepy.editor as mp
-from gtts import gTTS
 import time
 import re
 import numpy as np
 import random
+import hashlib
 import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # Basic logging setup
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(funcName)s] %(message)s')
@@ -25,38 +25,115 @@ if not hasattr(Image, 'ANTIALIAS'):
 
 # Add the directory of the current file to the system path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from database import init_db
-from backend.config import GENERATED_VIDEOS_DIR, data_dir
-
-# OpenAI client
-from openai import OpenAI
+from database import init_db, save_video_encode_stat
+from backend.config import (
+    GENERATED_VIDEOS_DIR,
+    DB_PATH,
+    data_dir,
+    VIDEO_IMAGE_CONCURRENCY,
+    VIDEO_TTS_CONCURRENCY,
+    VIDEO_LLM_CONCURRENCY,
+    VIDEO_ENCODE_PROFILE,
+    VIDEO_ENCODE_PER_SCENE,
+)
+
+# Chat / image / speech models (OpenAI and gTTS, or the offline fake / cassettes)
+from backend.model_providers import (
+    DEFAULT_CHAT_MODEL,
+    DEFAULT_IMAGE_MODEL,
+    get_chat_model,
+    get_image_provider,
+    get_speech_provider,
+    get_model_provider,
+)
+from backend.narration import SAMPLE_RATE as NARRATION_SAMPLE_RATE, decode_audio, scene_text, align_sentences
+from backend.asset_store import get_asset_store
+from backend.captions import CaptionRenderer, find_font_path
+from backend.ken_burns import KenBurnsClip, random_motion
+from backend.scene_compositor import Caption, Scene, SceneSequenceClip
+from backend.video_encoder import (
+    ENCODE_PROFILES,
+    ENCODE_PROFILE_SETTING,
+    ENCODE_PER_SCENE_SETTING,
+    encode_video,
+    concat_segments,
+)
 
 # ===== Global output dir =====
 VIDEO_DIR = GENERATED_VIDEOS_DIR
 
+# 본문은 3문장씩 한 장면으로 묶습니다.
+SCENE_CHUNK_SIZE = 3
+IMAGE_ATTEMPTS = 3
+IMAGE_SIZE = "1792x1024"
+IMAGE_QUALITY = "standard"
+IMAGE_STYLE_PROMPT = (
+    "A clean, modern, and engaging illustration for a Korean news video. "
+    "Soft, friendly color palette. Absolutely no text in the image. "
+    "Style: Flat design, simple, clear, optimistic. "
+)
+TTS_LANG = 'ko'
+# 장면 세그먼트 캐시 키에 들어가는 렌더링 버전: 자막 스타일이나 합성 방식을 바꾸면 올려서 기존 세그먼트를 무효화합니다.
+SEGMENT_RENDER_VERSION = 1
+
+# 제공자별 동시 요청 제한 (프로세스 전체 공유: 여러 영상을 동시에 만들어도 한도를 넘지 않습니다)
+_PROVIDER_LIMITS = {
+    'image': threading.BoundedSemaphore(VIDEO_IMAGE_CONCURRENCY),
+    'tts': threading.BoundedSemaphore(VIDEO_TTS_CONCURRENCY),
+    'llm': threading.BoundedSemaphore(VIDEO_LLM_CONCURRENCY),
+}
+
 class VideoProducer:
-    def __init__(self):
-        self.api_key = os.environ.get("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set.")
-        self.client = OpenAI(api_key=self.api_key)
+    def __init__(self, encode_profile=None, per_scene=None):
+        self.image_provider = get_image_provider()
+        self.speech_provider = get_speech_provider()
+        self.intro_llm = get_chat_model(temperature=0.7, max_tokens=100)
+        self.asset_store = get_asset_store()
 
         self.W, self.H = 1280, 720   # 16:9
         self.FPS = 30
+        self.font_path = self.get_font_path(bold=True)
+        self.captions = CaptionRenderer(self.W, self.H, self.font_path)
+
+        # 인코딩 프로필/방식: 인자 > 관리자 포털 설정 > 환경 변수 기본값
+        self.encode_profile = encode_profile or self._read_setting(ENCODE_PROFILE_SETTING, VIDEO_ENCODE_PROFILE)
+        if self.encode_profile not in ENCODE_PROFILES:
+            logging.warning(f"Unknown encode profile '{self.encode_profile}'. Using 'fast'.")
+            self.encode_profile = 'fast'
+        if per_scene is None:
+            per_scene = self._read_setting(ENCODE_PER_SCENE_SETTING, str(VIDEO_ENCODE_PER_SCENE)).lower() in ('1', 'true', 'yes')
+        self.per_scene = per_scene
+        self.last_encode_stats = None
+
+    def _read_setting(self, key, default=None):
+        """Reads an admin setting directly from the app_settings table."""
+        if not os.path.exists(DB_PATH):
+            return default
+        try:
+            conn = sqlite3.connect(DB_PATH)
+            row = conn.execute("SELECT value FROM app_settings WHERE key = ?", (key,)).fetchone()
+            conn.close()
+            return row[0] if row else default
+        except sqlite3.OperationalError:
+            return default
 
     # -------------------------------
     # Public entry: 기사+스크립트 → 비디오 메타
     # -------------------------------
-    def produce_video_content(self, article, script):
+    def produce_video_content(self, article, script, on_progress=None, manifest=None):
         """
         article: {'id': int/str, 'title': str, 'crawled_date': 'YYYY-MM-DD ...'}
         script:  str (나레이션 본문)
+        on_progress(fraction, stage): 제작 단계가 바뀔 때마다 호출됩니다 (0~1, 단계 설명)
+        manifest: 완료된 단계를 기록하는 작업 매니페스트 (create_video_file 참고)
         """
         article_id   = article['id']
         title        = article['title']
         crawled_date = article['crawled_date']
 
-        video_path = self.create_video_file(article_id, title, script)
+        asset_keys = []
+        video_path = self.create_video_file(article_id, title, script, asset_keys=asset_keys,
+                                            on_progress=on_progress, manifest=manifest)
 
         video_data = {
             'article_id': article_id,
@@ -67,54 +144,57 @@ class VideoProducer:
             'video_path': video_path,
             'production_status': 'completed',
             'created_date': crawled_date,
-            'view_count': 0
+            'view_count': 0,
+            'asset_keys': asset_keys,
+            'encode_stats': self.last_encode_stats,
         }
         return video_data
 
     # -------------------------------
     # DB 저장
     # -------------------------------
-    def save_video_data(self, video_data, conn):
+    def save_video_data(self, video_data, conn, on_insert=None):
+        """
+        영상 정보를 저장하고 영상 id를 반환합니다.
+        on_insert(video_id): 같은 트랜잭션 안에서 커밋 직전에 호출됩니다 (예: 작업 매니페스트의 'saved' 단계 기록).
+        예외를 던지면 영상 행도 저장되지 않습니다.
+        """
         c = conn.cursor()
-        c.execute("""
-            INSERT INTO videos (article_id, video_title, script, thumbnail, script_image, video_path, production_status, created_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            video_data['article_id'],
-            video_data['video_title'],
-            video_data['script'],
-            video_data['thumbnail'],
-            video_data['script_image'],
-            video_data['video_path'],
-            video_data['production_status'],
-            video_data['created_date']
-        ))
-        conn.commit()
+        try:
+            c.execute("""
+                INSERT INTO videos (article_id, video_title, script, thumbnail, script_image, video_path, production_status, created_date)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                video_data['article_id'],
+                video_data['video_title'],
+                video_data['script'],
+                video_data['thumbnail'],
+                video_data['script_image'],
+                video_data['video_path'],
+                video_data['production_status'],
+                video_data['created_date']
+            ))
+            if on_insert:
+                on_insert(c.lastrowid)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        # 영상이 남아 있는 동안 사용한 에셋은 저장소 정리 대상에서 제외됩니다.
+        self.asset_store.add_references(c.lastrowid, video_data.get('asset_keys') or [])
+        if video_data.get('encode_stats'):
+            save_video_encode_stat(conn, c.lastrowid, video_data['encode_stats'])
         return c.lastrowid
 
     # -------------------------------
     # 폰트 경로 (한글 깨짐 방지: 나눔고딕/Noto 우선)
     # -------------------------------
     def get_font_path(self, bold=False):
-        candidates = []
-        if os.name == "nt":  # Windows
-            candidates += [
-                "C:/Windows/Fonts/NanumGothicBold.ttf" if bold else "C:/Windows/Fonts/NanumGothic.ttf",
-                "C:/Windows/Fonts/malgunbd.ttf" if bold else "C:/Windows/Fonts/malgun.ttf",
-            ]
-        else:  # Linux/Mac
-            candidates += [
-                "/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf" if bold else "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-                "/System/Library/Fonts/AppleSDGothicNeo.ttc",
-            ]
-
-        for p in candidates:
-            if p and os.path.exists(p):
-                return p
-        # 마지막 수단
-        st.warning("한글 폰트를 찾지 못해 기본 폰트를 사용합니다. 자막 품질이 낮아질 수 있습니다.")
-        return None
+        font_path = find_font_path(bold)
+        if font_path is None:
+            # 마지막 수단
+            st.warning("한글 폰트를 찾지 못해 기본 폰트를 사용합니다. 자막 품질이 낮아질 수 있습니다.")
+        return font_path
 
     # -------------------------------
     # 이미지 생성 (문장별 개별 생성)
@@ -125,37 +205,33 @@ class VideoProducer:
         실패 시 False 반환.
         """
         logging.info(f"--- [AI Image] PROMPT: {prompt_text[:100]} ... ---")
-        for i in range(3):
+        prompt = IMAGE_STYLE_PROMPT + f'Story focus: "{prompt_text}"'
+        for i in range(IMAGE_ATTEMPTS):
             try:
-                prompt = (
-                    "A clean, modern, and engaging illustration for a Korean news video. "
-                    "Soft, friendly color palette. Absolutely no text in the image. "
-                    "Style: Flat design, simple, clear, optimistic. "
-                    f'Story focus: "{prompt_text}"'
-                )
-                resp = self.client.images.generate(
-                    model="dall-e-3",
-                    prompt=prompt,
-                    size="1792x1024",
-                    quality="standard",
-                    n=1,
-                )
-                image_url = resp.data[0].url
-                r = requests.get(image_url, timeout=60)
-                r.raise_for_status()
+                # 동시 요청 한도는 실제 호출 동안만 점유하고, 재시도 대기 중에는 다른 장면에 양보합니다.
+                with _PROVIDER_LIMITS['image']:
+                    image_bytes = self.image_provider.generate(prompt, size=IMAGE_SIZE, quality=IMAGE_QUALITY)
                 with open(image_path, "wb") as f:
-                    f.write(r.content)
+                    f.write(image_bytes)
                 logging.info(f"[AI Image] saved: {image_path}")
                 return True
             except Exception as e:
                 logging.warning(f"[AI Image] attempt {i+1} failed: {e}")
-                time.sleep(3)
+                if i + 1 < IMAGE_ATTEMPTS:
+                    time.sleep(2 ** i + random.random())
         return False
 
-    def generate_scene_image(self, sentence, article_id, idx):
-        out_path = os.path.join(VIDEO_DIR, f"scene_{article_id}_{idx:02d}.png")
-        ok = self.generate_ai_image(sentence, out_path)
-        if ok:
+    def generate_scene_image(self, sentence, article_id, idx, asset_keys=None):
+        """
+        장면 이미지를 에셋 저장소에서 찾고, 없으면 생성해 저장합니다.
+        생성에 실패하면 저장하지 않는 단색 이미지를 반환하므로 다음 제작 때 다시 시도합니다.
+        """
+        params = {'model': DEFAULT_IMAGE_MODEL, 'size': IMAGE_SIZE, 'quality': IMAGE_QUALITY, 'style': IMAGE_STYLE_PROMPT}
+        out_path = self.asset_store.get_or_create(
+            'image', get_model_provider(), params, sentence, '.png',
+            lambda path: self.generate_ai_image(sentence, path), asset_keys,
+        )
+        if out_path:
             return out_path
         # fallback 단색
         fallback = Image.new('RGB', (self.W, self.H), color=tuple(random.randint(0, 255) for _ in range(3)))
@@ -167,64 +243,79 @@ class VideoProducer:
     # 캡션 이미지 렌더링 (반투명 박스 + 중앙 정렬)
     # -------------------------------
     def render_caption_image(self, text: str) -> np.ndarray:
-        FONT_SIZE = 36
-        MARGIN = 60
-        LINE_SPACING = 12
-        CAPTION_BOX_ALPHA = 180
-        CAPTION_BOTTOM_PAD = 80
-        CAPTION_MAX_CHARS = 30
-
-        font_path_bold = self.get_font_path(bold=True)
-        font = ImageFont.truetype(font_path_bold, FONT_SIZE) if font_path_bold else ImageFont.load_default()
-
-        # 측정용
-        dummy = Image.new("RGBA", (self.W, self.H), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(dummy)
-
-        wrapper = textwrap.TextWrapper(width=CAPTION_MAX_CHARS, break_long_words=True, replace_whitespace=False)
-        lines = [line for para in text.split("\n") for line in (wrapper.wrap(para) if para else [""])]
-
-        line_heights, max_line_w = [], 0
-        for line in lines:
-            bbox = draw.textbbox((0, 0), line, font=font)
-            lw = bbox[2] - bbox[0]
-            lh = bbox[3] - bbox[1]
-            line_heights.append(lh)
-            max_line_w = max(max_line_w, lw)
-
-        text_block_h = sum(line_heights) + LINE_SPACING * max(0, len(lines) - 1)
-        box_pad_x, box_pad_y = 28, 24
-        box_w = min(max_line_w + box_pad_x * 2, self.W - MARGIN * 2)
-        box_h = text_block_h + box_pad_y * 2
-
-        box_x = (self.W - box_w) // 2
-        box_y = self.H - CAPTION_BOTTOM_PAD - box_h
-
-        img = Image.new("RGBA", (self.W, self.H), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-        radius = 24
-        draw.rounded_rectangle([(box_x, box_y), (box_x + box_w, box_y + box_h)],
-                               radius=radius, fill=(0, 0, 0, CAPTION_BOX_ALPHA))
-        # 텍스트
-        cur_y = box_y + box_pad_y
-        for i, line in enumerate(lines):
-            lw = draw.textbbox((0, 0), line, font=font)[2] - draw.textbbox((0, 0), line, font=font)[0]
-            tx = (self.W - lw) // 2
-            draw.text((tx, cur_y), line, font=font, fill=(255, 255, 255, 255))
-            cur_y += line_heights[i] + LINE_SPACING
-
-        return np.array(img)
+        """자막을 화면 크기의 RGBA 레이어로 반환합니다 (합성에는 잘라낸 render_caption을 사용합니다)."""
+        return self.captions.render_frame(text)
+
+    def render_caption(self, text: str):
+        """자막 상자 영역만 담은 RGBA 배열과 화면 안에서의 (x, y) 위치를 반환합니다."""
+        return self.captions.render(text)
 
     # -------------------------------
     # Ken Burns (줌 + 약한 패닝 느낌)
     # -------------------------------
-    def ken_burns(self, img_path, duration):
-        base = mp.ImageClip(img_path).set_duration(duration)
-        zoom_rate = random.uniform(0.015, 0.03)  # 1.5%~3%/sec
-        scaled = base.fx(mp.vfx.resize, lambda t: 1 + zoom_rate * t)
-        return scaled.resize((self.W, self.H))
+    def ken_burns(self, img_path, duration, motion=None):
+        # 1.5%~3%/sec 줌 + 약한 패닝. 원본은 한 번만 축소해 두고 프레임마다 잘라서 축소합니다.
+        zoom_rate, pan = motion or (None, None)
+        return KenBurnsClip(img_path, duration, (self.W, self.H), zoom_rate=zoom_rate, pan=pan)
 
-    def _generate_intro_sentence(self, title: str) -> str:
+    # -------------------------------
+    # 장면 구성 / 장면 세그먼트 캐시
+    # -------------------------------
+    def scene_spec(self, image_path, pcm, duration, captions, fade_in):
+        """Everything a scene's frames and audio are made from; captions are (text, start, end)."""
+        with open(image_path, 'rb') as f:
+            image_digest = hashlib.sha256(f.read()).hexdigest()
+        return {
+            'image': image_path,
+            'image_digest': image_digest,
+            'pcm': pcm,
+            'duration': duration,
+            'captions': captions,
+            'fade_in': fade_in,
+            # 같은 이미지는 항상 같은 줌/패닝으로 움직여, 다시 만들어도 장면이 바뀌지 않습니다.
+            'motion': random_motion(random.Random(image_digest)),
+        }
+
+    def build_scene(self, spec):
+        return Scene(
+            self.ken_burns(spec['image'], spec['duration'], spec['motion']),
+            [Caption(*self.render_caption(text), start, end) for text, start, end in spec['captions']],
+            spec['duration'], fade_in=spec['fade_in'],
+        )
+
+    def encode_scene_segment(self, spec, fade_out=0.0, asset_keys=None):
+        """
+        Returns (path, stats) of the scene's MP4 segment. Segments are stored in the asset store,
+        keyed by the image, the audio, the captions and the effect and encoding parameters, so an
+        unchanged scene is reused as is; stats is None then.
+        """
+        params = {
+            'version': SEGMENT_RENDER_VERSION,
+            'size': [self.W, self.H],
+            'fps': self.FPS,
+            'encode': ENCODE_PROFILES[self.encode_profile],
+            'font': os.path.basename(self.font_path) if self.font_path else None,
+            'image': spec['image_digest'],
+            'audio': hashlib.sha256(np.asarray(spec['pcm'], dtype='float32').tobytes()).hexdigest(),
+            'duration': round(spec['duration'], 4),
+            'captions': [[text, round(start, 4), round(end, 4)] for text, start, end in spec['captions']],
+            'motion': spec['motion'],
+            'fade_in': spec['fade_in'],
+            'fade_out': fade_out,
+        }
+        encoded = []
+
+        def encode(path):
+            clip = SceneSequenceClip([self.build_scene(spec)], (self.W, self.H), fade_out=fade_out)
+            try:
+                encoded.append(encode_video(clip, spec['pcm'], NARRATION_SAMPLE_RATE, path, self.encode_profile, self.FPS))
+            finally:
+                clip.close()
+
+        path = self.asset_store.get_or_create('segment', 'ffmpeg', params, '', '.mp4', encode, asset_keys)
+        return path, (encoded[0] if encoded else None)
+
+    def _generate_intro_sentence(self, title: str, asset_keys=None) -> str:
         """Generates a friendly, natural-sounding intro sentence from a news title."""
         logging.info(f"--- [Intro Generation] Generating intro for title: {title} ---")
         try:
@@ -239,16 +330,19 @@ Example:
 
 Now, create the opening sentence for the headline provided above."""
 
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.7,
-                max_tokens=100,
-            )
-            intro_sentence = response.choices[0].message.content.strip()
+            def request_intro():
+                with _PROVIDER_LIMITS['llm']:
+                    response = self.intro_llm.invoke([
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ])
+                return response.content.strip()
+
+            # 같은 제목의 인트로 문장은 저장된 것을 재사용합니다 (다시 제작해도 내레이션이 바뀌지 않습니다).
+            params = {'model': DEFAULT_CHAT_MODEL, 'temperature': 0.7, 'system': system_prompt}
+            intro_sentence = self.asset_store.get_or_create_text(
+                'intro', get_model_provider(), params, user_prompt, request_intro, asset_keys,
+            ) or title
             logging.info(f"--- [Intro Generation] Generated intro: {intro_sentence} ---")
             return intro_sentence
         except Exception as e:
@@ -256,13 +350,104 @@ Now, create the opening sentence for the headline provided above."""
             return title # Fallback to the original title on error
 
     # -------------------------------
-    # 메인: 동기 합성 파이프라인
+    # TTS (제공자 동시 요청 한도 적용)
+    # -------------------------------
+    def synthesize_speech(self, text, asset_keys=None):
+        """
+        텍스트 전체를 한 번의 요청으로 합성해 에셋 저장소에 저장하고(있으면 재사용),
+        메모리에서 바로 디코딩한 PCM 배열(mono float32, narration.SAMPLE_RATE)을 반환합니다.
+        """
+        def request_speech(path):
+            with _PROVIDER_LIMITS['tts']:
+                data = self.speech_provider.synthesize(text, lang=TTS_LANG)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        path = self.asset_store.get_or_create(
+            'tts', self.speech_provider.name, {'lang': TTS_LANG}, text, self.speech_provider.ext,
+            request_speech, asset_keys,
+        )
+        with open(path, 'rb') as f:
+            return decode_audio(f.read())
+
+    def narrate_scene(self, sentences, asset_keys=None):
+        """장면의 문장들을 한 번에 합성하고, 자막 표시용 문장별 (시작, 끝) 시간을 함께 반환합니다."""
+        pcm = self.synthesize_speech(scene_text(sentences), asset_keys)
+        return {'pcm': pcm, 'sentence_times': align_sentences(pcm, NARRATION_SAMPLE_RATE, sentences)}
+
+    # -------------------------------
+    # 에셋 단계: 네트워크 요청을 한꺼번에 병렬 처리
+    # -------------------------------
+    def generate_scene_assets(self, article_id, title, sentence_chunks, temp_files, asset_keys=None):
+        """
+        인트로 문장·이미지·TTS와 장면별 이미지·TTS를 모두 동시에 요청합니다 (TTS는 장면당 한 번).
+        제공자별 동시 요청 수는 _PROVIDER_LIMITS로 제한되므로, 전체 소요 시간은
+        요청 시간의 합이 아니라 가장 느린 요청(과 한도에 따른 대기)에 가까워집니다.
+        에셋 저장소에 이미 있는 에셋은 요청하지 않으며, 사용한 에셋의 키는 asset_keys에 추가합니다.
+        반환값의 장면 순서는 sentence_chunks 순서와 같습니다.
+        """
+        start = time.perf_counter()
+        n_requests = 3 + 2 * len(sentence_chunks)
+        hits_before = self.asset_store.hits
+
+        def intro_text_and_audio():
+            # 인트로 TTS는 생성된 인트로 문장이 있어야 하므로 같은 작업 안에서 이어서 처리합니다.
+            intro_text = re.sub(r'\*\*', '', self._generate_intro_sentence(title, asset_keys))
+            return intro_text, self.synthesize_speech(intro_text, asset_keys)
+
+        max_workers = VIDEO_IMAGE_CONCURRENCY + VIDEO_TTS_CONCURRENCY + VIDEO_LLM_CONCURRENCY
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="video-assets") as pool:
+            intro_future = pool.submit(intro_text_and_audio)
+            intro_image_future = pool.submit(self.generate_scene_image, title, article_id, 999, asset_keys)
+            scene_futures = [
+                (pool.submit(self.generate_scene_image, " ".join(chunk), article_id, i, asset_keys),
+                 pool.submit(self.narrate_scene, [re.sub(r'\*\*', '', sentence) for sentence in chunk], asset_keys))
+                for i, chunk in enumerate(sentence_chunks)
+            ]
+
+            intro_text, intro_audio = intro_future.result()
+            assets = {
+                'intro_text': intro_text,
+                'intro_audio': intro_audio,
+                'intro_image': intro_image_future.result(),
+                'scenes': [
+                    {'image': image_future.result(), **narration_future.result()}
+                    for image_future, narration_future in scene_futures
+                ],
+            }
+        # 저장소에 넣지 않은 대체 이미지는 제작이 끝나면 삭제합니다.
+        for image_path in [assets['intro_image']] + [scene['image'] for scene in assets['scenes']]:
+            if not image_path.startswith(self.asset_store.root):
+                temp_files.append(image_path)
+        logging.info(f"--- [Video Gen] {n_requests} scene assets ready in {time.perf_counter() - start:.1f}s "
+                     f"({self.asset_store.hits - hits_before} from the asset store). ---")
+        return assets
+
+    # -------------------------------
+    # 메인: 에셋 병렬 생성 후 순서대로 합성
     # -------------------------------
-    def create_video_file(self, article_id, title, script):
+    def create_video_file(self, article_id, title, script, asset_keys=None, on_progress=None, manifest=None):
+        """
+        manifest: 작업 단위 체크포인트 (get(stage) / set(stage, result), 예: backend.worker.JobManifest).
+        에셋('assets')과 완성된 영상('video') 단계가 끝나면 기록하며, 이전 시도에서 영상까지 만들어졌으면
+        그 파일을 그대로 반환합니다. 장면별 이미지·음성·세그먼트는 만들어지는 즉시 에셋 저장소에 저장되므로,
+        중간에 실패한 작업을 다시 실행해도 이미 만든 것은 저장소에서 가져오고 다시 요청하거나 인코딩하지 않습니다.
+        """
         logging.info("--- [SYNCHRONIZED VIDEO CREATION] START ---")
         temp_files = []
         video_clips = []
-        audio_clips = []
+        video_path = None
+        report = on_progress or (lambda fraction, stage: None)
+        if asset_keys is None:
+            asset_keys = []
+
+        finished = manifest.get('video') if manifest else None
+        if finished and os.path.exists(os.path.join(VIDEO_DIR, os.path.basename(finished['video_path']))):
+            asset_keys.extend(manifest.get('assets', {}).get('asset_keys', []))
+            self.last_encode_stats = finished.get('encode_stats')
+            logging.info(f"--- [Video Gen] Reusing {finished['video_path']} from an earlier attempt. ---")
+            report(1.0, "이전 시도에서 만든 영상 사용")
+            return finished['video_path']
 
         try:
             # 1) 문장 분할
@@ -270,84 +455,35 @@ Now, create the opening sentence for the headline provided above."""
             if not sentences:
                 raise ValueError("Script could not be split into sentences.")
 
-            # 2) 인트로: 자연스러운 인트로 문장 생성 + TTS + 이미지
-            intro_text = self._generate_intro_sentence(title)
-            clean_intro_text = re.sub(r'\*\*', '', intro_text)
-            intro_audio_path = os.path.join(VIDEO_DIR, f"intro_audio_{article_id}.mp3")
-            
-            logging.info("--- [Video Gen] Generating intro TTS... ---")
-            gTTS(text=clean_intro_text, lang='ko').save(intro_audio_path)
-            temp_files.append(intro_audio_path)
-            logging.info("--- [Video Gen] Intro TTS generated. ---")
-
-            intro_audio = mp.AudioFileClip(intro_audio_path)
-            logging.info("--- [Video Gen] Intro audio clip created. ---")
-
-            intro_img_path = self.generate_scene_image(title, article_id, 999)
-            logging.info(f"--- [Video Gen] Intro image generated at: {intro_img_path} ---")
-
-            intro_bg = self.ken_burns(intro_img_path, intro_audio.duration)
-            logging.info("--- [Video Gen] Ken Burns effect applied to intro. ---")
-
-            intro_caption = mp.ImageClip(self.render_caption_image(clean_intro_text)).set_duration(intro_audio.duration)
-            logging.info("--- [Video Gen] Intro caption rendered. ---")
-
-            intro_scene = mp.CompositeVideoClip([intro_bg, intro_caption], size=(self.W, self.H)).fx(mp.vfx.fadein, 0.6)
-            logging.info("--- [Video Gen] Intro scene composited. ---")
-
-            video_clips.append(intro_scene)
-            audio_clips.append(intro_audio)
-
-            # 3) 본문: 3문장씩 묶어서 처리
-            SCENE_CHUNK_SIZE = 3
+            # 2) 에셋 단계: 인트로 문장, 모든 장면 이미지와 장면별 TTS를 동시에 요청 (저장된 에셋은 재사용)
+            report(0.05, "이미지/음성 생성 중")
             sentence_chunks = [sentences[i:i + SCENE_CHUNK_SIZE] for i in range(0, len(sentences), SCENE_CHUNK_SIZE)]
-
-            for i, chunk in enumerate(sentence_chunks):
-                # Concatenate sentences in the chunk for prompts and captions
-                chunk_text = " ".join(chunk)
-                clean_chunk_text = re.sub(r'\*\*', '', chunk_text)
-                logging.info(f"[Scene {i+1}/{len(sentence_chunks)}] Processing chunk: {chunk_text[:70]}...")
-
-                # --- Generate single image for the whole chunk ---
-                img_path = self.generate_scene_image(chunk_text, article_id, i)
-                logging.info(f"--- [Video Gen] Scene {i+1} image generated. ---")
-
-                # --- Generate TTS for each sentence and combine them ---
-                chunk_audio_clips = []
-                for j, sentence in enumerate(chunk):
-                    clean_sentence = re.sub(r'\*\*', '', sentence)
-                    scene_audio_path = os.path.join(VIDEO_DIR, f"scene_audio_{article_id}_{i}_{j}.mp3")
-                    gTTS(text=clean_sentence, lang='ko').save(scene_audio_path)
-                    temp_files.append(scene_audio_path) # Add to main temp_files for cleanup
-                    chunk_audio_clips.append(mp.AudioFileClip(scene_audio_path))
-                
-                if not chunk_audio_clips:
-                    continue
-
-                concatenated_audio = mp.concatenate_audioclips(chunk_audio_clips)
-                duration = max(1.8 * len(chunk), concatenated_audio.duration) # Ensure minimum duration
-                logging.info(f"--- [Video Gen] Scene {i+1} combined audio created with duration {duration}s. ---")
-
-                # --- Create visuals for the chunk ---
-                bg = self.ken_burns(img_path, duration)
-                logging.info(f"--- [Video Gen] Scene {i+1} Ken Burns effect applied. ---")
-
-                # Caption for the whole chunk
-                caption = mp.ImageClip(self.render_caption_image(clean_chunk_text)).set_duration(duration)
-                logging.info(f"--- [Video Gen] Scene {i+1} caption rendered. ---")
-
-                scene = mp.CompositeVideoClip([bg, caption], size=(self.W, self.H)).fx(mp.vfx.fadein, 0.25)
-                logging.info(f"--- [Video Gen] Scene {i+1} composited. ---")
-
-                video_clips.append(scene)
-                audio_clips.append(concatenated_audio)
-
-            # 4) 연결 + 오디오 세팅 + 아웃로 페이드
-            final_video = mp.concatenate_videoclips(video_clips, method="compose")
-            final_audio = mp.concatenate_audioclips(audio_clips)
-            final_video = final_video.set_audio(final_audio).fx(mp.vfx.fadeout, 0.5)
-
-            # 5) 파일명(중괄호 버그 수정) + 저장
+            assets = self.generate_scene_assets(article_id, title, sentence_chunks, temp_files, asset_keys)
+            if manifest:
+                manifest.set('assets', {'asset_keys': sorted(set(asset_keys)), 'scenes': len(sentence_chunks) + 1})
+
+            # 3) 조립 단계: 준비된 에셋으로 인트로와 장면을 순서대로 구성
+            clean_intro_text = assets['intro_text']
+            intro_duration = len(assets['intro_audio']) / NARRATION_SAMPLE_RATE
+            specs = [self.scene_spec(assets['intro_image'], assets['intro_audio'], intro_duration,
+                                     [(clean_intro_text, 0, intro_duration)], fade_in=0.6)]
+
+            for i, (chunk, scene_assets) in enumerate(zip(sentence_chunks, assets['scenes'])):
+                pcm = scene_assets['pcm']
+                duration = max(1.8 * len(chunk), len(pcm) / NARRATION_SAMPLE_RATE) # Ensure minimum duration
+
+                # 문장별 자막: 각 문장이 읽히는 동안 표시하고, 마지막 문장은 장면 끝까지 유지합니다.
+                captions = []
+                for j, (sentence, (start, end)) in enumerate(zip(chunk, scene_assets['sentence_times'])):
+                    end = duration if j == len(chunk) - 1 else end
+                    captions.append((re.sub(r'\*\*', '', sentence), start, end))
+
+                # 장면이 음성보다 길면 무음으로 채워, 다음 장면의 음성이 화면보다 먼저 시작하지 않게 합니다.
+                pcm = np.pad(pcm, (0, max(0, round(duration * NARRATION_SAMPLE_RATE) - len(pcm))))
+                specs.append(self.scene_spec(scene_assets['image'], pcm, duration, captions, fade_in=0.25))
+                logging.info(f"--- [Video Gen] Scene {i+1}/{len(sentence_chunks)} prepared ({duration:.1f}s). ---")
+
+            # 4) 파일명(중괄호 버그 수정)
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             video_filename = f"video_{article_id}_{timestamp}.mp4"
             video_path = os.path.join(VIDEO_DIR, video_filename)
@@ -355,16 +491,40 @@ Now, create the opening sentence for the headline provided above."""
             logging.info(f"Writing final video to: {video_path} ...")
             logging.info(f"Value of VIDEO_DIR is: {VIDEO_DIR}")
             logging.info(f"Value of data_dir from config is: {data_dir}")
-            
-            final_video.write_videofile(
-                video_path,
-                codec='libx264',
-                audio_codec="aac",
-                fps=self.FPS,
-                threads=4,
-                preset="ultrafast",
-                bitrate="3000k"
-            )
+
+            # 5) 인코딩: SceneSequenceClip이 합성한 프레임을 ffmpeg에 바로 전달 (아웃로 페이드는 마지막 장면에만)
+            report(0.5, "영상 인코딩 중")
+            if self.per_scene:
+                # 장면별 세그먼트는 저장소에서 재사용하고, 바뀐 장면만 인코딩한 뒤 재인코딩 없이 이어 붙입니다.
+                start = time.perf_counter()
+                segment_paths, encoded = [], []
+                for i, spec in enumerate(specs):
+                    segment_path, segment_stats = self.encode_scene_segment(
+                        spec, fade_out=0.5 if i == len(specs) - 1 else 0.0, asset_keys=asset_keys)
+                    if segment_path is None:
+                        raise RuntimeError(f"Scene {i} segment could not be encoded.")
+                    segment_paths.append(segment_path)
+                    report(0.5 + 0.45 * (i + 1) / len(specs), f"장면 {i + 1}/{len(specs)} 인코딩 완료")
+                    if segment_stats:
+                        encoded.append(segment_stats)
+                concat_segments(segment_paths, video_path)
+                frames = sum(segment['frames'] for segment in encoded)
+                seconds = time.perf_counter() - start
+                stats = {'frames': frames, 'seconds': seconds, 'fps': frames / seconds if seconds else 0.0,
+                         'size_bytes': os.path.getsize(video_path),
+                         'segments': len(specs), 'reused_segments': len(specs) - len(encoded)}
+            else:
+                final_video = SceneSequenceClip([self.build_scene(spec) for spec in specs], (self.W, self.H), fade_out=0.5)
+                video_clips.append(final_video)
+                stats = encode_video(final_video, np.concatenate([spec['pcm'] for spec in specs]),
+                                     NARRATION_SAMPLE_RATE, video_path, self.encode_profile, self.FPS)
+                stats.update(segments=0, reused_segments=0)
+            self.last_encode_stats = {'profile': self.encode_profile,
+                                      'mode': 'per_scene' if self.per_scene else 'single', **stats}
+            logging.info(f"--- [Video Gen] Encoded {stats['frames']} frames in {stats['seconds']:.1f}s "
+                         f"({stats['fps']:.1f} fps, {stats['size_bytes'] / 1048576:.1f} MB, "
+                         f"{stats['reused_segments']}/{stats['segments']} scene segments reused, "
+                         f"profile={self.encode_profile}). ---")
 
             # flush 확인
             for _ in range(10):
@@ -379,13 +539,19 @@ Now, create the opening sentence for the headline provided above."""
                 logging.warning(f"PROBLEM: Video file DOES NOT exist at {video_path} after writing.")
 
             logging.info("Final video written successfully.")
+            report(1.0, "영상 저장 완료")
 
             # Return a path relative to the data_dir for database storage
             relative_video_path = os.path.join('generated_videos', video_filename)
+            if manifest:
+                manifest.set('video', {'video_path': relative_video_path, 'encode_stats': self.last_encode_stats})
             return relative_video_path
 
         except Exception as e:
             logging.error(f"--- [SYNCHRONIZED VIDEO CREATION] ERROR: {e} ---", exc_info=True)
+            # 인코딩 중 실패하면 덜 쓰인 영상 파일이 남지 않게 지웁니다 (세그먼트는 저장소에 남아 재사용됩니다).
+            if video_path and os.path.exists(video_path):
+                os.remove(video_path)
             raise
 
         finally:
@@ -396,11 +562,6 @@ Now, create the opening sentence for the headline provided above."""
                     if clip and hasattr(clip, 'close'): clip.close()
                 except Exception:
                     pass
-            for a in audio_clips:
-                try:
-                    if a and hasattr(a, 'close'): a.close()
-                except Exception:
-                    pass
             # temp remove
             for p in temp_files:
                 try:
@@ -0,0 +1,142 @@
+"""Frame generation throughput of the video scene renderer, before and after.
+
+    python -m backend.video_benchmark
+    python -m backend.video_benchmark --image generated_scene.png --duration 8 --frames 60
+
+`ken_burns` is the background clip: the previous moviepy version (time-dependent
+vfx.resize of the full-resolution image, then a resize to the frame size) against
+KenBurnsClip. Besides frames per second, it reports how close the first frames are
+(PSNR, dB) and how much each version actually moves between the first and the last
+frame (first_to_last_psnr_db; lower means more motion). The previous version resized
+the zoomed frame back to the frame size, which cancelled its own zoom, so its
+first and last frames are nearly identical.
+
+`composite` renders two captioned scenes with fades on the same backgrounds, once
+with CompositeVideoClip + concatenate_videoclips(method="compose") as before and once
+with SceneSequenceClip; psnr_vs_legacy_db is the lowest PSNR over sampled frames.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+import moviepy.editor as mp
+
+from backend.ken_burns import KenBurnsClip
+from backend.captions import CaptionRenderer, find_font_path
+from backend.scene_compositor import Caption, Scene, SceneSequenceClip
+
+# moviepy 1.0.3's resize needs Image.ANTIALIAS, removed in Pillow 10 (same patch as backend/video.py)
+if not hasattr(Image, 'ANTIALIAS'):
+    Image.ANTIALIAS = Image.LANCZOS
+
+W, H, FPS = 1280, 720, 30
+
+
+def legacy_ken_burns(img_path, duration, size=(W, H), zoom_rate=None):
+    """The previous VideoProducer.ken_burns."""
+    base = mp.ImageClip(img_path).set_duration(duration)
+    zoom_rate = zoom_rate if zoom_rate is not None else random.uniform(0.015, 0.03)
+    scaled = base.fx(mp.vfx.resize, lambda t: 1 + zoom_rate * t)
+    return scaled.resize(size)
+
+
+def make_test_image(size=(1792, 1024), seed=0):
+    """A DALL·E-sized image with gradients and fine detail, so resampling costs are realistic."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size[1], 0:size[0]].astype('float32')
+    base = np.stack([x / size[0], y / size[1], 0.5 + 0.5 * np.sin(x / 37 + y / 53)], axis=-1) * 200
+    noise = rng.normal(0, 20, (size[1], size[0], 3))
+    return Image.fromarray(np.clip(base + noise, 0, 255).astype('uint8'))
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype('float64') - b.astype('float64')) ** 2)
+    return float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+def _frames_per_second(clip, n_frames):
+    times = np.linspace(0, clip.duration, n_frames, endpoint=False)
+    start = time.perf_counter()
+    for t in times:
+        clip.get_frame(t)
+    return n_frames / (time.perf_counter() - start)
+
+
+def run_video_benchmark(img_path, duration=8.0, n_frames=60, zoom_rate=0.03):
+    rows = []
+    legacy = legacy_ken_burns(img_path, duration, zoom_rate=zoom_rate)
+    start = time.perf_counter()
+    fast = KenBurnsClip(img_path, duration, (W, H), zoom_rate=zoom_rate, pan=(0, 0))
+    setup_s = time.perf_counter() - start
+    end = duration - 1 / FPS
+    for name, clip, setup in (('legacy', legacy, 0.0), ('fast', fast, setup_s)):
+        rows.append({
+            'stage': 'ken_burns',
+            'renderer': name,
+            'frames': n_frames,
+            'setup_ms': round(setup * 1000, 1),
+            'frames_per_s': round(_frames_per_second(clip, n_frames), 1),
+            'psnr_vs_legacy_db': round(psnr(clip.get_frame(0), legacy.get_frame(0)), 1),
+            'first_to_last_psnr_db': round(psnr(clip.get_frame(0), clip.get_frame(end)), 1),
+        })
+
+    rows += _composite_rows(img_path, duration, n_frames)
+    return pd.DataFrame(rows)
+
+
+def _composite_rows(img_path, duration, n_frames):
+    captions = CaptionRenderer(W, H, find_font_path(bold=True))
+    texts = ["하루 30분 걷기만으로도 혈압을 낮추는 데 도움이 됩니다", "정기적인 건강검진이 중요합니다"]
+    half = duration / 2
+
+    def background():
+        return KenBurnsClip(img_path, duration, (W, H), zoom_rate=0.03, pan=(0.5, -0.5))
+
+    # Before: one CompositeVideoClip per scene, joined with method="compose".
+    legacy_scenes = []
+    for fade in (0.6, 0.25):
+        layers = [background()]
+        for k, text in enumerate(texts):
+            rgba, position = captions.render(text)
+            layers.append(mp.ImageClip(rgba).set_start(k * half / 2).set_duration(half / 2).set_position(position))
+        legacy_scenes.append(mp.CompositeVideoClip(layers, size=(W, H)).set_duration(half).fx(mp.vfx.fadein, fade))
+    legacy = mp.concatenate_videoclips(legacy_scenes, method="compose").fx(mp.vfx.fadeout, 0.5)
+
+    fast = SceneSequenceClip([
+        Scene(background(), [Caption(*captions.render(text), k * half / 2, (k + 1) * half / 2)
+                             for k, text in enumerate(texts)], half, fade_in=fade)
+        for fade in (0.6, 0.25)
+    ], (W, H), fade_out=0.5)
+
+    times = np.linspace(0, duration, 16, endpoint=False)
+    worst = min(psnr(fast.get_frame(t), legacy.get_frame(t)) for t in times)
+    return [{
+        'stage': 'composite',
+        'renderer': name,
+        'frames': n_frames,
+        'setup_ms': 0.0,
+        'frames_per_s': round(_frames_per_second(clip, n_frames), 1),
+        'psnr_vs_legacy_db': round(worst, 1) if name == 'fast' else float('inf'),
+        'first_to_last_psnr_db': None,
+    } for name, clip in (('legacy', legacy), ('fast', fast))]
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+    parser = argparse.ArgumentParser(description="Benchmark scene frame generation.")
+    parser.add_argument('--image', help="Scene image (default: a synthetic 1792x1024 image)")
+    parser.add_argument('--duration', type=float, default=8.0)
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        img_path = args.image
+        if not img_path:
+            img_path = os.path.join(tmp, 'scene.png')
+            make_test_image().save(img_path)
+        result = run_video_benchmark(img_path, args.duration, args.frames)
+    print(result.to_string(index=False))
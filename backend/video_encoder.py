@@ -0,0 +1,115 @@
+"""H.264 encoding of composited video frames through an ffmpeg pipe.
+
+Frames are written as raw RGB to ffmpeg's stdin as they are produced, and the
+narration (a float PCM array) is handed over as one raw audio file, so no moviepy
+writer, temporary video or audio re-encoding pass is involved. Output uses
+`-movflags +faststart` so browsers can start playback before the download finishes.
+
+ENCODE_PROFILES trade speed for size/quality with x264's CRF (constant quality) and
+preset; `tune=stillimage` suits slow Ken Burns motion over illustrations.
+Scenes can also be encoded as separate segments with identical settings and joined
+by concat_segments() with the concat demuxer (stream copy, no re-encoding); see
+VideoProducer.encode_scene_segment, which caches them in the asset store.
+"""
+import os
+import time
+import tempfile
+import subprocess
+
+import numpy as np
+from moviepy.config import get_setting
+
+# app_settings keys for the encoding choices made in the admin portal
+ENCODE_PROFILE_SETTING = 'video_encode_profile'
+ENCODE_PER_SCENE_SETTING = 'video_encode_per_scene'
+
+ENCODE_PROFILES = {
+    'draft': {'label': '초안 (가장 빠름, 큰 파일)', 'preset': 'ultrafast', 'crf': 30, 'tune': None},
+    'fast': {'label': '빠름 (1 vCPU 권장)', 'preset': 'veryfast', 'crf': 26, 'tune': 'stillimage'},
+    'balanced': {'label': '균형', 'preset': 'medium', 'crf': 23, 'tune': 'stillimage'},
+    'quality': {'label': '고화질 (느림)', 'preset': 'slow', 'crf': 20, 'tune': 'stillimage'},
+}
+AUDIO_BITRATE = '128k'
+
+
+def _ffmpeg():
+    return get_setting("FFMPEG_BINARY")
+
+
+def _run_ffmpeg(args, **kwargs):
+    proc = subprocess.run([_ffmpeg(), '-y', '-v', 'error', *args], stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE, check=False, **kwargs)
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {proc.stderr.decode('utf-8', 'ignore').strip()}")
+
+
+def _fit_audio(pcm, n_samples):
+    """Trims or pads (with silence) mono PCM to exactly n_samples, as interleaved stereo s16le bytes."""
+    pcm = np.asarray(pcm, dtype='float32')[:n_samples]
+    pcm = np.pad(pcm, (0, n_samples - len(pcm)))
+    samples = (np.clip(pcm, -1.0, 1.0) * 32767).astype('<i2')
+    return np.repeat(samples, 2).tobytes()
+
+
+def encode_video(clip, pcm, sample_rate, path, profile='fast', fps=30):
+    """Encodes `clip` (anything with get_frame(t), duration and size) with mono `pcm` narration to `path`.
+
+    The audio is fitted to the exact length of the encoded frames. Returns stats
+    {'frames', 'seconds', 'fps', 'size_bytes'}.
+    """
+    settings = ENCODE_PROFILES[profile]
+    width, height = clip.size
+    n_frames = max(1, int(round(clip.duration * fps)))
+    start = time.perf_counter()
+
+    with tempfile.NamedTemporaryFile(suffix='.pcm', dir=os.path.dirname(path) or None, delete=False) as audio:
+        audio.write(_fit_audio(pcm, int(round(n_frames / fps * sample_rate))))
+    try:
+        args = [
+            _ffmpeg(), '-y', '-v', 'error',
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-s', f'{width}x{height}', '-r', str(fps), '-i', 'pipe:0',
+            '-f', 's16le', '-ar', str(sample_rate), '-ac', '2', '-i', audio.name,
+            '-map', '0:v', '-map', '1:a',
+            '-c:v', 'libx264', '-preset', settings['preset'], '-crf', str(settings['crf']),
+            *(['-tune', settings['tune']] if settings['tune'] else []),
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac', '-b:a', AUDIO_BITRATE,
+            '-movflags', '+faststart',
+            path,
+        ]
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+            try:
+                for i in range(n_frames):
+                    frame = clip.get_frame(i / fps)
+                    proc.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+            except BrokenPipeError:
+                pass  # ffmpeg exited; its error is reported below
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    pass
+                proc.wait()
+            if proc.returncode != 0:
+                stderr.seek(0)
+                raise RuntimeError(f"ffmpeg failed: {stderr.read().decode('utf-8', 'ignore').strip()}")
+    finally:
+        os.remove(audio.name)
+
+    seconds = time.perf_counter() - start
+    return {'frames': n_frames, 'seconds': seconds, 'fps': n_frames / seconds if seconds else 0.0,
+            'size_bytes': os.path.getsize(path)}
+
+
+def concat_segments(segment_paths, path):
+    """Joins MP4 segments encoded with identical settings into `path` without re-encoding."""
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', dir=os.path.dirname(path) or None,
+                                     delete=False, encoding='utf-8') as listing:
+        for segment_path in segment_paths:
+            escaped = os.path.abspath(segment_path).replace("'", "'\\''")
+            listing.write(f"file '{escaped}'\n")
+    try:
+        _run_ffmpeg(['-f', 'concat', '-safe', '0', '-i', listing.name, '-c', 'copy', '-movflags', '+faststart', path])
+    finally:
+        os.remove(listing.name)
@@ -0,0 +1,255 @@
+"""Video production worker: runs queued video jobs outside the Streamlit request.
+
+    python -m backend.worker              # polls the queue until interrupted
+    python -m backend.worker --once       # processes what is queued, then exits
+
+The admin portal only adds jobs to the `video_jobs` table. A worker claims the oldest
+queued job, writes the short script, produces and saves the video, and records the
+progress of each step. While a job runs, a heartbeat thread refreshes the job's
+heartbeat_at. If a worker dies, its job is put back in the queue by the next claim
+once the heartbeat is VIDEO_JOB_STALE_SECONDS old, up to VIDEO_JOB_MAX_ATTEMPTS
+attempts. A job whose attempt fails is queued again too, but is not claimed before
+VIDEO_JOB_RETRY_BACKOFF_SECONDS, doubled for each attempt, has passed. A worker that finds its job reclaimed (a heartbeat, progress update or the
+final status update no longer matches its worker id) abandons the job without saving,
+completing or failing it, so the new owner's run is the only one. Claims are atomic, so any number of worker processes can share one
+database. Run more of them for more throughput. The image/TTS/LLM limits in
+backend/video.py apply per process.
+
+Each job keeps a manifest of its completed stages: script -> assets (intro and
+scene images/narration, recorded once all are ready) -> video -> saved. Every stage
+is recorded as it completes, and a failed save stops the job. The 'saved' stage is written in the
+same transaction as the video row. A retried job reuses the stored script, an
+already encoded video and an already saved video row. Per-scene progress is not in the
+manifest: each image, narration clip and encoded scene segment is written to the asset
+store as soon as it is made, so a retry finds the finished ones there and only
+requests or encodes the rest.
+"""
+import os
+import socket
+import logging
+import argparse
+import threading
+from datetime import datetime
+
+from backend.config import (
+    VIDEO_JOB_POLL_SECONDS,
+    VIDEO_JOB_HEARTBEAT_SECONDS,
+    VIDEO_JOB_STALE_SECONDS,
+    VIDEO_JOB_RETRY_BACKOFF_SECONDS,
+)
+from backend.database import (
+    init_db,
+    claim_video_job,
+    update_video_job_progress,
+    complete_video_job,
+    fail_video_job,
+    save_video_job_manifest,
+)
+from backend.article_generator import ArticleGenerator, SCRIPT_FAILURE_MESSAGE
+from backend.video import VideoProducer
+
+# The script prompt only needs the beginning of very long articles.
+MAX_SCRIPT_SOURCE_CHARS = 300000
+
+
+class JobLost(Exception):
+    """The running job was reclaimed by another worker; its current run must stop without side effects."""
+
+
+class JobManifest:
+    """Results of a job's completed stages, saved with `save(data, conn)` whenever a stage completes.
+
+    `save` raises when the manifest cannot be stored (JobLost once the job was reclaimed);
+    the stage is then not recorded and the error stops the job.
+    """
+
+    def __init__(self, data=None, save=None):
+        self.data = dict(data or {})
+        self._save = save
+        self._lock = threading.Lock()
+
+    def get(self, stage, default=None):
+        with self._lock:
+            return self.data.get(stage, default)
+
+    def set(self, stage, result, conn=None):
+        """Records a completed stage; with `conn` the save joins that connection's open transaction."""
+        with self._lock:
+            data = {**self.data, stage: {**result, 'completed_at': datetime.now().isoformat(timespec='seconds')}}
+            if self._save:
+                self._save(data, conn)
+            self.data = data
+
+    def stages(self):
+        with self._lock:
+            return list(self.data)
+
+
+class _Heartbeat(threading.Thread):
+    """Keeps a running job's heartbeat fresh while the worker thread is busy rendering."""
+
+    def __init__(self, job_id, worker_id, interval):
+        super().__init__(name=f"video-job-{job_id}-heartbeat", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        conn = init_db()
+        try:
+            while not self._stop_event.wait(self.interval):
+                try:
+                    if not update_video_job_progress(conn, self.job_id, self.worker_id):
+                        logging.warning(f"[Video Worker] job {self.job_id} is no longer owned by {self.worker_id}.")
+                        self.lost.set()
+                        return
+                except Exception as e:
+                    logging.warning(f"[Video Worker] heartbeat for job {self.job_id} failed: {e}")
+        finally:
+            conn.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+class VideoJobWorker(threading.Thread):
+    def __init__(self, poll_seconds=VIDEO_JOB_POLL_SECONDS,
+                 heartbeat_seconds=VIDEO_JOB_HEARTBEAT_SECONDS,
+                 stale_seconds=VIDEO_JOB_STALE_SECONDS,
+                 retry_backoff_seconds=VIDEO_JOB_RETRY_BACKOFF_SECONDS,
+                 worker_id=None):
+        super().__init__(name="video-job-worker", daemon=True)
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._stop_event = threading.Event()
+
+    def run(self):
+        logging.info(f"[Video Worker] {self.worker_id} started.")
+        while not self._stop_event.is_set():
+            try:
+                if self.run_next() is not None:
+                    continue
+            except Exception as e:
+                logging.error(f"[Video Worker] polling failed: {e}", exc_info=True)
+            self._stop_event.wait(self.poll_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run_next(self):
+        """Claims and runs one queued job. Returns its id, or None when the queue is empty."""
+        conn = init_db()
+        try:
+            job = claim_video_job(conn, self.worker_id, self.stale_seconds)
+        finally:
+            conn.close()
+        if job is None:
+            return None
+
+        logging.info(f"[Video Worker] job {job['id']} (attempt {job['attempts']}/{job['max_attempts']}): {job['title']}")
+        heartbeat = _Heartbeat(job['id'], self.worker_id, self.heartbeat_seconds)
+        heartbeat.start()
+        conn = init_db()
+        try:
+            def on_progress(fraction, stage):
+                # Progress is reported between steps, so a reclaimed job stops at the next one.
+                if heartbeat.lost.is_set() or not update_video_job_progress(
+                        conn, job['id'], self.worker_id, round(fraction, 3), stage):
+                    raise JobLost(f"job {job['id']} is no longer owned by {self.worker_id}")
+
+            def save_manifest(data, transaction_conn=None):
+                if not save_video_job_manifest(transaction_conn or conn, job['id'], self.worker_id, data,
+                                               commit=transaction_conn is None):
+                    raise JobLost(f"job {job['id']} is no longer owned by {self.worker_id}")
+
+            manifest = JobManifest(job['manifest'], save=save_manifest)
+            if manifest.stages():
+                logging.info(f"[Video Worker] job {job['id']} resumes after: {', '.join(manifest.stages())}")
+            video_id = self.produce(job['article'], on_progress, manifest)
+            if complete_video_job(conn, job['id'], self.worker_id, video_id):
+                logging.info(f"[Video Worker] job {job['id']} completed (video {video_id}).")
+            else:
+                logging.warning(f"[Video Worker] job {job['id']} was reclaimed before it could be completed.")
+        except JobLost as e:
+            logging.warning(f"[Video Worker] abandoning {e}.")
+        except Exception as e:
+            logging.error(f"[Video Worker] job {job['id']} failed: {e}", exc_info=True)
+            if not fail_video_job(conn, job['id'], self.worker_id, str(e) or type(e).__name__,
+                                  self.retry_backoff_seconds):
+                logging.warning(f"[Video Worker] job {job['id']} was reclaimed; its failure is not recorded.")
+        finally:
+            heartbeat.stop()
+            conn.close()
+        return job['id']
+
+    def produce(self, article, on_progress, manifest=None):
+        """Writes the script, renders the video and saves it, skipping stages `manifest` has; returns the video id."""
+        manifest = manifest or JobManifest()
+        saved = manifest.get('saved')
+        if saved:
+            return saved['video_id']
+
+        script = manifest.get('script', {}).get('script')
+        if script:
+            on_progress(0.1, "이전 시도의 스크립트 사용")
+        else:
+            on_progress(0.02, "스크립트 요약 중")
+            script = ArticleGenerator().generate_short_script(article['content'][:MAX_SCRIPT_SOURCE_CHARS])
+            if not script or script == SCRIPT_FAILURE_MESSAGE:
+                raise RuntimeError("스크립트 생성에 실패했습니다.")
+            manifest.set('script', {'script': script})
+
+        # The producer reports 0..1 for its own steps; they take up 10%..95% of the job.
+        producer = VideoProducer()
+        video_data = producer.produce_video_content(
+            article, script, on_progress=lambda fraction, stage: on_progress(0.1 + 0.85 * fraction, stage),
+            manifest=manifest)
+        on_progress(0.97, "영상 정보 저장 중")
+        conn = init_db()
+        try:
+            # The 'saved' stage commits together with the video row (and is rolled back with it
+            # if the job was reclaimed), so a retry never inserts the video twice.
+            video_id = producer.save_video_data(
+                video_data, conn, on_insert=lambda video_id: manifest.set('saved', {'video_id': video_id}, conn))
+        finally:
+            conn.close()
+        return video_id
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def start_video_worker():
+    """Starts the in-process video worker once; later calls return the running instance."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = VideoJobWorker()
+            _worker.start()
+        return _worker
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run queued video production jobs.")
+    parser.add_argument('--once', action='store_true', help="Process the queued jobs, then exit")
+    parser.add_argument('--poll', type=float, default=VIDEO_JOB_POLL_SECONDS, help="Seconds between queue checks")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - [%(funcName)s] %(message)s')
+
+    worker = VideoJobWorker(poll_seconds=args.poll)
+    if args.once:
+        processed = 0
+        while worker.run_next() is not None:
+            processed += 1
+        print(f"processed {processed} jobs")
+    else:
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            logging.info(f"[Video Worker] {worker.worker_id} stopped.")
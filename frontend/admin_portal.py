@@ -6,6 +6,7 @@ import sys
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import time
+import json
 from datetime import datetime
 import sqlite3
 
@@ -25,11 +26,55 @@ from backend.database import (
     get_view_history_summary,
     get_top_viewed_content,
     get_chat_activity_summary,
+    get_app_setting,
+    set_app_setting,
+    enqueue_index_update,
+    get_index_queue_stats,
+    get_answer_cache_summary,
+    get_answer_cache_count,
+    get_video_encode_summary,
+    enqueue_video_job,
+    get_video_jobs,
+    get_video_job_counts,
+    retry_video_job,
 )
 from backend.crawler import DongACrawler
-from backend.video import VideoProducer, display_video_card
+from backend.video import display_video_card
+from backend.video_encoder import ENCODE_PROFILES, ENCODE_PROFILE_SETTING, ENCODE_PER_SCENE_SETTING
 from backend.article_generator import ArticleGenerator
-from backend.config import UPLOAD_DIR, data_dir
+from backend.rag_processor import (
+    RAGProcessor,
+    get_shared_vector_store,
+    reset_shared_vector_store,
+    INDEX_PRESETS,
+    INDEX_PRESET_SETTING,
+    SEARCH_PARAMS_SETTING,
+    INDEX_REFRESHED_AT_SETTING,
+    CHUNKER_SETTING,
+    RETRIEVAL_MODES,
+    RETRIEVAL_MODE_SETTING,
+    RERANKERS,
+    RERANKER_SETTING,
+)
+from backend.chunking import CHUNKERS
+from backend.answer_cache import get_answer_cache
+from backend.agent_runner import get_agent_runner
+from backend.article_batch import generate_pending_articles, count_pending_articles
+from backend.index_worker import start_index_worker
+from backend.worker import start_video_worker
+from backend.config import (
+    UPLOAD_DIR,
+    data_dir,
+    DEFAULT_FAISS_INDEX_PRESET,
+    DEFAULT_RAG_CHUNKER,
+    DEFAULT_RAG_RETRIEVAL_MODE,
+    DEFAULT_RAG_RERANKER,
+    ARTICLE_BATCH_CONCURRENCY,
+    VIDEO_ENCODE_PROFILE,
+    VIDEO_ENCODE_PER_SCENE,
+    VIDEO_JOB_MAX_ATTEMPTS,
+    VIDEO_WORKER_EMBEDDED,
+)
 
 
 def _configure_admin_environment() -> None:
@@ -109,15 +154,20 @@ def show_admin_page():
     </div>
     ''', unsafe_allow_html=True)
     
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
         " 기사 수집 및 영상 제작",
         " 영상 관리",
         " 통계",
         " 동영상 업로드",
         " 회원 관리",
+        " 검색 인덱스",
     ])
     
     with tab1:
+        if st.session_state.get('video_job_notice'):
+            st.success(st.session_state.pop('video_job_notice'))
+        _render_video_jobs_section()
+
         if st.session_state.get('video_to_produce'):
             article = st.session_state.video_to_produce
             st.markdown(f"#### 영상 제작: {article['title']}")
@@ -125,40 +175,16 @@ def show_admin_page():
             col1, col2 = st.columns([3, 1])
             with col1:
                 if st.button(" 영상 제작 시작", type="primary"):
-                    producer = VideoProducer()
-                    article_generator = ArticleGenerator()
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
+                    # 제작은 작업자 프로세스가 맡습니다. 페이지를 새로고침하거나 닫아도 계속 진행됩니다.
                     try:
-                        MAX_CHARS_FOR_AI = 300000 
-                        original_content = article['content']
-                        
-                        if len(original_content) > MAX_CHARS_FOR_AI:
-                            trimmed_content = original_content[:MAX_CHARS_FOR_AI]
-                            st.warning("⚠️ **입력 텍스트가 너무 길어 AI 모델 한도를 초과할 수 있어, 앞부분 30만 글자만 사용하여 요약합니다.**")
-                        else:
-                            trimmed_content = original_content
-                        
-                        status_text.text(" 스크립트 요약 중...")
-                        short_script = article_generator.generate_short_script(trimmed_content)
-                        st.info(f"생성된 스크립트: {short_script}")
-                        progress_bar.progress(25)
-                        
-                        status_text.text(" 썸네일 생성 중...")
-                        video_data = producer.produce_video_content(article, short_script)
-                        progress_bar.progress(100)
-
-                        conn = init_db() # Get a fresh connection right before the DB write
-                        video_id = producer.save_video_data(video_data, conn)
-                        status_text.text(" 영상 제작 완료!")
-                        st.success(f"영상이 성공적으로 제작되었습니다! (ID: {video_id})")
-                        st.markdown("###  제작 완료!")
-                        
+                        conn = init_db()
+                        job_id = enqueue_video_job(conn, article, max_attempts=VIDEO_JOB_MAX_ATTEMPTS)
+                        conn.close()
                         st.session_state.video_to_produce = None
+                        st.session_state.video_job_notice = f"영상 제작 작업을 등록했습니다. (작업 ID: {job_id})"
                         st.rerun()
-
                     except Exception as e:
-                        st.error(f"영상 제작 중 오류가 발생했습니다: {str(e)}")
+                        st.error(f"영상 제작 작업 등록 중 오류가 발생했습니다: {str(e)}")
             with col2:
                 if st.button("취소"):
                     st.session_state.video_to_produce = None
@@ -180,6 +206,8 @@ def show_admin_page():
                             st.warning("새로운 기사를 찾지 못했습니다.")
             with col2:
                 show_all = st.checkbox("전체 기사 보기", value=False)
+
+            _render_article_batch_section()
             
             st.markdown("---")
             
@@ -281,6 +309,7 @@ def show_admin_page():
                 st.info(" 크롤링된 기사가 없습니다. 위의 '크롤링 시작' 버튼을 눌러주세요!")
 
     with tab2:
+        _render_video_encode_section()
         st.markdown("###  제작된 영상 관리")
         videos_df = get_produced_videos(conn=init_db())
         if not videos_df.empty:
@@ -457,6 +486,7 @@ def show_admin_page():
                         VALUES (?, ?, ?, ?, ?, ?)
                     ''', (article_id, video_title, video_script, file_path, 'uploaded', datetime.now()))
 
+                    enqueue_index_update(conn, [article_id], commit=False)
                     conn.commit()
                     st.success(f"'{video_title}' 동영상을 성공적으로 업로드했습니다.")
                 except sqlite3.IntegrityError:
@@ -530,6 +560,329 @@ def show_admin_page():
 
         conn.close()
 
+    with tab6:
+        _render_rag_index_tab()
+
+
+def _render_article_batch_section() -> None:
+    """'AI 기사 생성 대기' 상태의 기사를 한 번에 생성하는 화면을 그립니다."""
+    conn = init_db()
+    pending_count = count_pending_articles(conn)
+    conn.close()
+
+    st.markdown("####  AI 기사 일괄 생성")
+    if not pending_count:
+        st.caption("AI 기사 생성 대기 중인 기사가 없습니다.")
+        return
+
+    batch_col1, batch_col2 = st.columns([1, 2])
+    with batch_col1:
+        concurrency = int(st.number_input(
+            "동시 요청 수", min_value=1, max_value=16, value=ARTICLE_BATCH_CONCURRENCY, step=1,
+            help="동시에 보낼 AI 요청 수입니다. 속도 제한(429)이 발생하면 자동으로 잠시 기다렸다가 다시 시도합니다.",
+        ))
+    with batch_col2:
+        st.write("")
+        start_batch = st.button(f" 대기 기사 {pending_count}개 AI 기사 일괄 생성", key="run_article_batch")
+    if not start_batch:
+        return
+
+    progress_bar = st.progress(0.0)
+    status_text = st.empty()
+
+    def on_progress(done, total, article, error):
+        progress_bar.progress(done / total)
+        result = f"실패: {error}" if error else "완료"
+        status_text.text(f"[{done}/{total}] {article['title']} - {result}")
+
+    try:
+        with st.spinner("AI가 대기 중인 기사를 생성하고 있습니다..."):
+            summary = generate_pending_articles(ArticleGenerator(), max_concurrency=concurrency, on_progress=on_progress)
+    except Exception as e:
+        st.error(f"AI 기사 일괄 생성 중 오류가 발생했습니다: {e}")
+        return
+
+    st.success(f"AI 기사 {summary['saved']}개를 저장했습니다. (대상 {summary['total']}개, 실패 {len(summary['failures'])}개)")
+    if summary['failures']:
+        st.dataframe(
+            pd.DataFrame(summary['failures'], columns=['기사 ID', '제목', '오류']),
+            use_container_width=True,
+        )
+
+
+@st.fragment(run_every=3)
+def _render_video_jobs_section() -> None:
+    """영상 제작 작업 큐의 진행 상황을 그립니다 (3초마다 갱신)."""
+    conn = init_db()
+    counts = get_video_job_counts(conn)
+    jobs_df = get_video_jobs(conn, limit=10)
+    conn.close()
+    if jobs_df.empty:
+        return
+
+    st.markdown("####  영상 제작 작업")
+    count_cols = st.columns(4)
+    count_cols[0].metric("대기 중", f"{counts.get('queued', 0):,}건")
+    count_cols[1].metric("제작 중", f"{counts.get('running', 0):,}건")
+    count_cols[2].metric("완료", f"{counts.get('completed', 0):,}건")
+    count_cols[3].metric("실패", f"{counts.get('failed', 0):,}건")
+    if counts.get('queued') and not counts.get('running') and not VIDEO_WORKER_EMBEDDED:
+        st.caption("실행 중인 작업자가 없으면 작업이 시작되지 않습니다. `python -m backend.worker`로 작업자를 실행하세요.")
+
+    failed_ids = jobs_df.loc[jobs_df['state'] == 'failed', 'id'].tolist()
+    state_labels = {'queued': '대기', 'running': '제작 중', 'completed': '완료', 'failed': '실패'}
+    stage_labels = {'script': '스크립트', 'assets': '이미지/음성', 'video': '영상', 'saved': '저장'}
+    jobs_df['state'] = jobs_df['state'].map(state_labels).fillna(jobs_df['state'])
+    jobs_df['attempts'] = jobs_df['attempts'].astype(str) + ' / ' + jobs_df['max_attempts'].astype(str)
+    jobs_df['stages'] = jobs_df['manifest'].map(
+        lambda manifest: ', '.join(stage_labels.get(stage, stage) for stage in json.loads(manifest or '{}')))
+    st.dataframe(
+        jobs_df[['id', 'title', 'state', 'progress', 'stage', 'stages', 'attempts', 'not_before', 'video_id', 'error', 'created_at']],
+        column_config={
+            'id': '작업 ID',
+            'title': '기사 제목',
+            'state': '상태',
+            'progress': st.column_config.ProgressColumn('진행률', min_value=0.0, max_value=1.0, format="percent"),
+            'stage': '단계',
+            'stages': '완료된 단계',
+            'attempts': '시도',
+            'not_before': '다음 시도 시각',
+            'video_id': '영상 ID',
+            'error': '오류',
+            'created_at': '등록 시각',
+        },
+        use_container_width=True,
+    )
+
+    if failed_ids:
+        retry_col1, retry_col2, retry_col3 = st.columns([1, 1, 1])
+        with retry_col1:
+            retry_id = st.selectbox("실패한 작업", failed_ids, key="retry_video_job_id")
+        with retry_col2:
+            st.write("")
+            reset_manifest = st.checkbox(
+                "처음부터 다시 제작", key="retry_video_job_reset",
+                help="완료된 단계 기록을 지우고 스크립트부터 다시 만듭니다. 저장소에 남은 이미지/음성/장면은 같은 내용이면 재사용됩니다.",
+            )
+        with retry_col3:
+            st.write("")
+            if st.button("다시 시도", key="retry_video_job", help="완료된 단계(스크립트, 이미지/음성, 장면 인코딩)는 다시 하지 않고 이어서 제작합니다."):
+                conn = init_db()
+                retried = retry_video_job(conn, retry_id, reset_manifest=reset_manifest)
+                conn.close()
+                if retried:
+                    st.rerun(scope="fragment")
+                st.warning("이 기사는 이미 대기 중이거나 제작 중인 작업이 있습니다.")
+
+
+def _render_video_encode_section() -> None:
+    """영상 인코딩 프로필 선택과 프로필별 인코딩 속도/파일 크기 화면을 그립니다."""
+    conn = init_db()
+    with st.expander(" 영상 인코딩 설정", expanded=False):
+        profile_names = list(ENCODE_PROFILES)
+        current_profile = get_app_setting(conn, ENCODE_PROFILE_SETTING, VIDEO_ENCODE_PROFILE)
+        selected_profile = st.selectbox(
+            "인코딩 프로필",
+            profile_names,
+            index=profile_names.index(current_profile) if current_profile in profile_names else 0,
+            format_func=lambda name: f"{ENCODE_PROFILES[name]['label']} - preset {ENCODE_PROFILES[name]['preset']}, CRF {ENCODE_PROFILES[name]['crf']}",
+            help="CRF가 낮을수록 화질이 좋아지고 파일이 커집니다. 느린 preset은 같은 화질을 더 작은 파일로 만들지만 인코딩 시간이 늘어납니다.",
+        )
+        current_per_scene = get_app_setting(conn, ENCODE_PER_SCENE_SETTING, str(VIDEO_ENCODE_PER_SCENE)).lower() in ('1', 'true', 'yes')
+        per_scene = st.checkbox(
+            "장면별 인코딩 후 이어 붙이기 (장면 세그먼트 재사용)",
+            value=current_per_scene,
+            help="장면마다 따로 인코딩한 세그먼트를 저장해 두고 재인코딩 없이(stream copy) 하나의 파일로 합칩니다. "
+                 "같은 기사를 다시 만들면 바뀐 장면만 인코딩합니다.",
+        )
+        if st.button("인코딩 설정 저장", key="save_encode_settings"):
+            set_app_setting(conn, ENCODE_PROFILE_SETTING, selected_profile)
+            set_app_setting(conn, ENCODE_PER_SCENE_SETTING, str(per_scene))
+            st.success("인코딩 설정을 저장했습니다. 다음에 제작하는 영상부터 적용됩니다.")
+
+        summary_df = get_video_encode_summary(conn)
+        if summary_df.empty:
+            st.caption("아직 인코딩 기록이 없습니다. 영상을 제작하면 프로필별 인코딩 속도와 파일 크기가 표시됩니다.")
+        else:
+            summary_df['mode'] = summary_df['mode'].map({'single': '한 번에', 'per_scene': '장면별'}).fillna(summary_df['mode'])
+            st.dataframe(
+                summary_df.rename(columns={
+                    'profile': '프로필', 'mode': '방식', 'videos': '영상 수', 'encode_fps': '인코딩 속도(fps)',
+                    'avg_seconds': '평균 인코딩 시간(초)', 'avg_size_mb': '평균 파일 크기(MB)',
+                    'reused_segments': '재사용 장면 / 전체 장면', 'last_encoded': '최근 인코딩',
+                }),
+                use_container_width=True,
+            )
+    conn.close()
+
+
+def _render_rag_index_tab() -> None:
+    """FAISS 인덱스 구성 선택, 재구축, 벤치마크 화면을 그립니다."""
+    st.markdown("###  챗봇 검색 인덱스 설정")
+    conn = init_db()
+
+    index_info = None
+    try:
+        index_info = RAGProcessor().get_index_info()
+    except ValueError as e:
+        st.warning(f"인덱스 정보를 불러올 수 없습니다: {e}")
+    if index_info:
+        info_cols = st.columns(4)
+        info_cols[0].metric("현재 프리셋", index_info.get('preset', '-'))
+        info_cols[1].metric("인덱스 구성", index_info.get('factory', '-'))
+        info_cols[2].metric("벡터 수", f"{index_info.get('ntotal', 0):,}")
+        info_cols[3].metric("삭제 표시된 청크", f"{index_info.get('deleted_chunks', 0):,}")
+        st.caption(
+            f"스냅샷 버전: {index_info.get('version', '-')} ({index_info.get('kind', '-')}, {index_info.get('created_at', '-')})"
+            f" · 청킹 방식: {index_info.get('chunker', 'character')}"
+        )
+    else:
+        st.info("저장된 인덱스 구성 정보가 없습니다. 아래에서 프리셋을 선택하고 인덱스를 재구축하세요.")
+
+    st.markdown("####  검색 데이터 최신성")
+    queue_stats = get_index_queue_stats(conn)
+    refreshed_at = get_app_setting(conn, INDEX_REFRESHED_AT_SETTING)
+    pending = int(queue_stats['pending'] or 0)
+    oldest_age = queue_stats['oldest_age_seconds'] if pending else None
+    fresh_cols = st.columns(3)
+    fresh_cols[0].metric("반영 대기 기사", f"{pending:,}개")
+    fresh_cols[1].metric("가장 오래된 대기", f"{oldest_age / 60:.1f}분" if oldest_age is not None else "-")
+    fresh_cols[2].metric("마지막 인덱스 갱신", refreshed_at.replace('T', ' ') if refreshed_at else "-")
+    if pending and st.button("대기 중인 기사 지금 반영", key="flush_index_queue"):
+        with st.spinner("대기 중인 기사를 임베딩하여 인덱스에 추가하는 중입니다..."):
+            try:
+                indexed = start_index_worker().refresh_if_due(force=True)
+                st.success(f"기사 {indexed}개를 인덱스에 반영했습니다.")
+            except Exception as e:
+                st.error(f"인덱스 반영 중 오류가 발생했습니다: {e}")
+
+    st.markdown("####  검색 캐시")
+    cache_stats = get_shared_vector_store().cache_stats()
+    cache_cols = st.columns(4)
+    for col, (name, label) in zip(cache_cols[:2], [('embedding', "질문 임베딩 캐시"), ('result', "검색 결과 캐시")]):
+        stats = cache_stats[name]
+        col.metric(f"{label} 적중률", f"{stats['hit_rate'] * 100:.1f}%",
+                   help=f"적중 {stats['hits']:,}회 / 미적중 {stats['misses']:,}회")
+    cache_cols[2].metric("캐시 항목 수", f"{cache_stats['result']['size']:,} / {cache_stats['result']['maxsize']:,}")
+    cache_cols[3].metric("캐시 유효 시간", f"{cache_stats['result']['ttl_seconds'] / 60:.0f}분")
+    if st.button("검색 캐시 비우기", key="clear_query_cache"):
+        get_shared_vector_store().clear_caches()
+        st.success("검색 캐시를 비웠습니다.")
+
+    st.markdown("####  챗봇 답변 캐시")
+    st.caption("비슷한 질문에는 이전에 기사 검색으로 만든 답변을 재사용합니다. 근거 기사가 다시 색인되면 해당 답변은 자동으로 삭제됩니다.")
+    answer_cache = get_answer_cache()
+    answer_stats = answer_cache.stats()
+    answer_summary = get_answer_cache_summary(conn)
+    answer_cols = st.columns(4)
+    answer_cols[0].metric("저장된 답변", f"{get_answer_cache_count(conn):,}개")
+    answer_cols[1].metric("답변 캐시 적중률", f"{answer_stats['hit_rate'] * 100:.1f}%",
+                          help=f"적중 {answer_stats['hits']:,}회 / 미적중 {answer_stats['misses']:,}회 (이 서버 프로세스 기준)")
+    answer_cols[2].metric("유사도 기준", f"{answer_stats['threshold']:.2f}")
+    answer_cols[3].metric("유효 시간", f"{answer_stats['ttl_hours']:.0f}시간")
+    if not answer_summary.empty:
+        st.dataframe(
+            answer_summary.rename(columns={
+                'question': '질문', 'hit_count': '재사용 횟수', 'created_at': '생성 시각',
+                'last_hit_at': '마지막 재사용', 'index_version': '인덱스 버전',
+            }).drop(columns=['id']),
+            use_container_width=True,
+        )
+    if st.button("답변 캐시 전체 삭제", key="purge_answer_cache"):
+        deleted = answer_cache.purge()
+        st.success(f"캐시된 답변 {deleted}개를 삭제했습니다.")
+
+    st.markdown("####  챗봇 요청 대기열")
+    runner_stats = get_agent_runner().stats()
+    runner_cols = st.columns(4)
+    runner_cols[0].metric("처리 중", f"{runner_stats['running']} / {runner_stats['max_concurrency']}")
+    runner_cols[1].metric("대기 중", f"{runner_stats['queued']:,}건")
+    runner_cols[2].metric("평균 대기 시간", f"{runner_stats['wait_avg_seconds']:.1f}초",
+                          help=f"최근 요청 기준 95% 대기 시간 {runner_stats['wait_p95_seconds']:.1f}초")
+    runner_cols[3].metric("시간 초과 / 취소", f"{runner_stats['timed_out']:,} / {runner_stats['cancelled']:,}",
+                          help=f"완료 {runner_stats['completed']:,}건, 오류 {runner_stats['failed']:,}건 "
+                               f"(이 서버 프로세스 기준, 제한 시간 {runner_stats['timeout_seconds']:.0f}초)")
+
+    preset_names = list(INDEX_PRESETS)
+    current_preset = get_app_setting(conn, INDEX_PRESET_SETTING, DEFAULT_FAISS_INDEX_PRESET)
+    selected_preset = st.selectbox(
+        "인덱스 프리셋",
+        preset_names,
+        index=preset_names.index(current_preset) if current_preset in preset_names else 0,
+        format_func=lambda name: INDEX_PRESETS[name]['label'],
+    )
+
+    chunker_labels = {'korean_sentence': '한국어 문장 단위 (토큰 기준)', 'character': '글자 수 기준 (기존 방식)'}
+    chunker_names = list(CHUNKERS)
+    current_chunker = get_app_setting(conn, CHUNKER_SETTING, DEFAULT_RAG_CHUNKER)
+    selected_chunker = st.selectbox(
+        "청킹 방식",
+        chunker_names,
+        index=chunker_names.index(current_chunker) if current_chunker in chunker_names else 0,
+        format_func=lambda name: chunker_labels.get(name, name),
+        help="변경한 청킹 방식은 인덱스를 재구축해야 적용됩니다. 비교는 `python -m backend.chunk_eval`로 실행할 수 있습니다.",
+    )
+
+    mode_names = list(RETRIEVAL_MODES)
+    current_mode = get_app_setting(conn, RETRIEVAL_MODE_SETTING, DEFAULT_RAG_RETRIEVAL_MODE)
+    selected_mode = st.selectbox(
+        "검색 방식",
+        mode_names,
+        index=mode_names.index(current_mode) if current_mode in mode_names else 0,
+        format_func=lambda name: RETRIEVAL_MODES[name],
+        help="하이브리드는 질환명 같은 정확한 용어를 찾는 키워드 검색과 의미 기반 벡터 검색 결과를 순위 융합(RRF)으로 합칩니다.",
+    )
+    reranker_names = list(RERANKERS)
+    current_reranker = get_app_setting(conn, RERANKER_SETTING, DEFAULT_RAG_RERANKER)
+    selected_reranker = st.selectbox(
+        "재정렬(Reranker)",
+        reranker_names,
+        index=reranker_names.index(current_reranker) if current_reranker in reranker_names else 0,
+        format_func=lambda name: RERANKERS[name],
+        help="Cross-Encoder 재정렬은 sentence-transformers가 설치된 경우에만 동작하며, 검색 지연 시간이 늘어납니다.",
+    )
+
+    search_params = {}
+    for param_name, default_value in INDEX_PRESETS[selected_preset]['search_params'].items():
+        search_params[param_name] = int(st.number_input(
+            f"검색 파라미터 ({param_name})", min_value=1, max_value=1024, value=default_value, step=1,
+            help="값이 클수록 재현율(recall)이 높아지고 검색 지연 시간이 늘어납니다.",
+        ))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("설정 저장", key="save_index_settings"):
+            set_app_setting(conn, INDEX_PRESET_SETTING, selected_preset)
+            set_app_setting(conn, SEARCH_PARAMS_SETTING, json.dumps(search_params))
+            set_app_setting(conn, CHUNKER_SETTING, selected_chunker)
+            set_app_setting(conn, RETRIEVAL_MODE_SETTING, selected_mode)
+            set_app_setting(conn, RERANKER_SETTING, selected_reranker)
+            st.success("인덱스 설정을 저장했습니다. 검색 방식은 곧바로, 검색 파라미터는 다음 스냅샷부터 적용됩니다.")
+    with col2:
+        if st.button("인덱스 재구축", key="rebuild_index", type="primary"):
+            with st.spinner("기사를 임베딩하고 새 인덱스 스냅샷을 만드는 중입니다... (기존 인덱스로 챗봇은 계속 동작합니다)"):
+                try:
+                    RAGProcessor(index_preset=selected_preset, chunker=selected_chunker).build_and_save_vector_store()
+                    reset_shared_vector_store()
+                    st.success("인덱스를 재구축했습니다.")
+                except Exception as e:
+                    st.error(f"인덱스 재구축 중 오류가 발생했습니다: {e}")
+
+    st.markdown("---")
+    st.markdown("####  프리셋 벤치마크 (합성 데이터)")
+    st.caption("임의로 생성한 군집형 벡터로 각 프리셋의 재현율과 검색 지연 시간, 인덱스 크기를 비교합니다. API 호출은 발생하지 않습니다.")
+    bench_cols = st.columns(2)
+    n_vectors = bench_cols[0].number_input("벡터 수", min_value=1000, max_value=100000, value=10000, step=1000)
+    dim = bench_cols[1].selectbox("임베딩 차원", [384, 768, 1536], index=2)
+    if st.button("벤치마크 실행", key="run_index_benchmark"):
+        from backend.index_benchmark import run_benchmark
+        with st.spinner("인덱스를 구축하고 검색 성능을 측정하는 중입니다..."):
+            st.session_state['index_benchmark_result'] = run_benchmark(n_vectors=int(n_vectors), dim=int(dim), n_queries=100)
+    if st.session_state.get('index_benchmark_result') is not None:
+        st.dataframe(st.session_state['index_benchmark_result'], use_container_width=True)
+
+    conn.close()
+
 
 ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin0326')
 
@@ -537,6 +890,9 @@ ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD', 'admin0326')
 def render_admin_portal() -> None:
     _configure_admin_environment()
     _ensure_admin_state()
+    start_index_worker()
+    if VIDEO_WORKER_EMBEDDED:
+        start_video_worker()
 
     password = st.text_input('관리자 비밀번호를 입력하세요', type='password')
 
@@ -18,6 +18,8 @@ from backend.database import init_db, get_user, save_chat_message, get_chat_hist
 from frontend.utils import set_background, render_theme_selector
 from frontend.auth import is_logged_in
 from backend.article_generator import ArticleGenerator # Import our new Agent
+from backend.index_worker import start_index_worker
+from backend.agent_runner import get_agent_runner
 
 # --- PAGE SETUP AND AUTH CHECK ---
 st.set_page_config(page_title="AI 건강 비서", layout="centered")
@@ -56,6 +58,8 @@ def get_voice_input():
             st.error(f"음성 인식 중 오류가 발생했습니다: {e}")
     return None
 
+start_index_worker()
+
 # --- Cache the Agent ---
 @st.cache_resource
 def get_article_agent():
@@ -108,23 +112,40 @@ if prompt:
         st.markdown(prompt)
 
     with st.chat_message("assistant"):
-        with st.spinner("Agent가 생각하고 검색하는 중..."):
-            try:
-                agent_history = []
-                for msg in st.session_state.chat_messages:
-                    if msg['role'] == 'user':
-                        agent_history.append(("user", msg['content']))
-                    elif msg['role'] == 'assistant':
-                        agent_history.append(("ai", msg['content']))
-
-                response = agent.run_agent(user_input=prompt, chat_history=agent_history)
-                st.markdown(response)
-                
-                st.session_state.chat_messages.append({"role": "assistant", "content": response})
-                save_chat_message(conn, user_id, "assistant", response)
-
-            except Exception as e:
-                error_message = f"오류가 발생했습니다: {e}"
-                st.error(error_message)
-                st.session_state.chat_messages.append({"role": "assistant", "content": error_message})
-                save_chat_message(conn, user_id, "assistant", error_message)
+        try:
+            status = st.status("Agent가 생각하고 검색하는 중...", expanded=False)
+            final = {}
+
+            def answer_tokens():
+                # 검색 진행 상황은 상태 박스에, 답변 토큰은 바로 화면에 표시합니다.
+                # 이전 대화는 DB에서 최근 대화 + 요약으로 불러옵니다.
+                # 요청은 공용 실행기에서 비동기로 처리되며, 페이지를 떠나면 자동으로 취소됩니다.
+                events = get_agent_runner().stream(
+                    user_id, lambda: agent.astream_agent(user_input=prompt, user_id=user_id)
+                )
+                for event in events:
+                    if event['type'] == 'error':
+                        raise RuntimeError(event['text'])
+                    if event['type'] == 'status':
+                        status.update(label=event['text'])
+                        status.write(event['text'])
+                    elif event['type'] == 'token':
+                        yield event['text']
+                    elif event['type'] == 'done':
+                        final['answer'] = event['answer']
+
+            streamed = st.write_stream(answer_tokens())
+            status.update(label="답변 완료", state="complete")
+            response = final.get('answer') or (streamed if isinstance(streamed, str) else "")
+
+            st.session_state.chat_messages.append({"role": "assistant", "content": response})
+            save_chat_message(conn, user_id, "assistant", response)
+
+        except Exception as e:
+            error_message = f"오류가 발생했습니다: {e}"
+            st.error(error_message)
+            st.session_state.chat_messages.append({"role": "assistant", "content": error_message})
+            save_chat_message(conn, user_id, "assistant", error_message)
+
+    # 답변이 저장된 뒤에 오래된 대화를 백그라운드에서 요약합니다.
+    agent.on_answer_saved(user_id)
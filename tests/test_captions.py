@@ -0,0 +1,60 @@
+"""Pixel equality of the cropped caption renderer and compositor against full-frame compositing.
+
+The reference is the previous renderer (backend.caption_benchmark.render_caption_legacy),
+which draws every caption onto a transparent full-frame layer that is then alpha-blended
+over the whole frame.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from backend.captions import CaptionRenderer
+from backend.caption_benchmark import W, H, render_caption_legacy
+from backend.scene_compositor import Caption
+
+BUNDLED_FONT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fonts', 'NanumGothic-Regular.ttf')
+FONTS = [pytest.param(BUNDLED_FONT, id='nanum'), pytest.param(None, id='pillow_default')]
+CAPTIONS = [
+    pytest.param("짧은 자막", id='short'),
+    pytest.param("하루 30분 걷기만으로도 혈압을 낮추는 데 도움이 됩니다", id='one_line'),
+    pytest.param("안녕하세요! 오늘은 사과가 심장 건강에 어떤 도움을 주는지 함께 알아보겠습니다. "
+                 "전문가들은 정기적인 건강검진이 당뇨 예방에 중요하다고 강조합니다", id='several_lines'),
+    pytest.param("줄바꿈이\n있는 자막", id='newline'),
+    pytest.param("띄어쓰기없이아주길게이어지는문장은단어중간에서줄이바뀌어야합니다그래도상자밖으로나가면안됩니다", id='long_word'),
+    pytest.param("", id='empty'),
+]
+
+
+@pytest.fixture(scope='module', params=FONTS)
+def font_path(request):
+    if request.param and not os.path.exists(request.param):
+        pytest.skip(f"font not found: {request.param}")
+    return request.param
+
+
+@pytest.fixture(scope='module')
+def renderer(font_path):
+    return CaptionRenderer(W, H, font_path)
+
+
+def _composite_full_frame(background, layer):
+    """Blends a full-frame RGBA layer over the whole background (the previous compositing)."""
+    alpha = layer[:, :, 3:4].astype('float32') / 255.0
+    return (background * (1.0 - alpha) + (layer[:, :, :3].astype('float32') * alpha + 0.5)).astype(np.uint8)
+
+
+@pytest.mark.parametrize('text', CAPTIONS)
+def test_cropped_caption_matches_full_frame_layer(renderer, font_path, text):
+    rgba, (x, y) = renderer.render(text)
+    assert 0 <= x and x + rgba.shape[1] <= W and 0 <= y and y + rgba.shape[0] <= H
+    np.testing.assert_array_equal(renderer.render_frame(text), render_caption_legacy(text, font_path))
+
+
+@pytest.mark.parametrize('text', CAPTIONS)
+def test_caption_blend_matches_full_frame_compositing(renderer, font_path, text):
+    background = np.random.default_rng(0).integers(0, 256, (H, W, 3), dtype=np.uint8)
+    rgba, position = renderer.render(text)
+    frame = background.copy()
+    Caption(rgba, position, 0.0, 1.0).blend(frame)
+    np.testing.assert_array_equal(frame, _composite_full_frame(background, render_caption_legacy(text, font_path)))